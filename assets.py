@@ -0,0 +1,379 @@
+import collections
+import os
+import queue
+import threading
+import time
+import types
+
+import pygame
+
+from levelfile import CHUNK_SIZE, open_level
+from movers import make_movers
+from world import World
+
+# Asset states
+LOADING = 0
+READY = 1
+FAILED = 2
+
+POLL_BUDGET = 0.002  # Seconds a frame spends finishing loaded assets, at most (one piece of work always gets done)
+CONVERT_BAND = 256 * 1024  # Pixels of an image converted to the display's format at a time, about a millisecond
+PREFETCH_MARGIN = 2 * CHUNK_SIZE  # Level chunks read into memory on each side of the start
+
+_mixer_lock = threading.Lock()  # So two workers loading sounds don't both initialise the mixer
+
+
+class Asset:
+    """
+    One thing being loaded (or loaded) by an AssetManager, shared by everyone who asked for it.
+
+    Only progress is written by the worker thread; state, value and error change on
+    the main thread, in AssetManager.poll.
+
+    Attributes:
+        kind (str): Which loader it uses ("level", "image", "sound"...).
+        path (str): Absolute path of the file.
+        state (int): LOADING, READY or FAILED.
+        value: What was loaded, once READY.
+        error (Exception or None): Why it FAILED.
+        progress (float): 0 to 1, how far the loading has got.
+        refs (int): How many users hold it; at 0 it may be evicted.
+    """
+    def __init__(self, kind, path):
+        self.kind = kind
+        self.path = path
+        self.state = LOADING
+        self.value = None
+        self.error = None
+        self.progress = 0.0
+        self.refs = 0
+        self.loaded = threading.Event()  # Set by the worker once it is done with it
+        self.evicted = False
+
+    @property
+    def key(self):
+        return self.kind, self.path
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    @property
+    def failed(self):
+        return self.state == FAILED
+
+    def report(self, fraction):
+        """Record how far loading has got (called by the loader on the worker thread)"""
+        self.progress = fraction
+
+    def __repr__(self):
+        state = ("loading", "ready", "failed")[self.state]
+        return f"Asset({self.kind!r}, {self.path!r}, {state}, {self.progress:.0%}, refs={self.refs})"
+
+
+class Loader:
+    """
+    How to load one kind of asset.
+
+    Args:
+        load (callable): load(path, report) on a worker thread, returning the decoded
+            asset; report(fraction) records progress.
+        finish (callable or None): finish(value) on the main thread, for the part that has
+            to happen there (e.g. converting an image to the display's pixel format). Rather
+            than the finished value it may return a generator that does the work in pieces,
+            yielding in between, and returns the value; poll runs it a piece at a time within
+            its budget, over several frames if need be.
+        dispose (callable or None): dispose(value) when the asset is evicted, to free what
+            garbage collection wouldn't (open files...).
+    """
+    def __init__(self, load, finish=None, dispose=None):
+        self.load = load
+        self.finish = finish
+        self.dispose = dispose
+
+
+class LevelData:
+    """
+    A level opened and ready to play: its LevelFile, with the chunks around the start already
+    in memory, and the description of its moving platforms.
+
+    Args:
+        path (str): The level's path (JSON description or compiled .lvl).
+        level_file (LevelFile): The opened level.
+        mover_entries (list): Its moving platforms' descriptions (see movers.make_movers).
+    """
+    def __init__(self, path, level_file, mover_entries):
+        self.path = path
+        self.level_file = level_file
+        self.mover_entries = mover_entries
+
+    @property
+    def start(self):
+        return self.level_file.start
+
+    def make_world(self, physics=None):
+        """A new World at the start of the level, with fresh moving platforms and no static ones (stream those)"""
+        level_file = self.level_file
+        world = World([], level_file.start[0], level_file.start[1], level_file.ground_level, physics)
+        for platform, awake in make_movers(self.mover_entries, self.path):
+            world.movers.add(platform, awake)
+        return world
+
+    def close(self):
+        self.level_file.close()
+
+
+def load_level_data(path, report):
+    """Open a level (compiling its JSON if the .lvl is stale), read in the chunks around the start"""
+    level_file = open_level(path)
+    report(0.6)
+    try:
+        start_x = level_file.start[0]
+        level_file.prefetch(level_file.chunks_between(start_x - PREFETCH_MARGIN, start_x + PREFETCH_MARGIN))
+        report(0.9)
+        return LevelData(path, level_file, level_file.read_movers())
+    except BaseException:
+        level_file.close()
+        raise
+
+
+def load_image(path, report):
+    return pygame.image.load(path)
+
+
+def finish_image(surface):
+    """
+    Convert to the display's pixel format, which needs the display (so the main thread).
+
+    pygame holds the GIL while it converts, so a worker thread doing it would stall the
+    frame just the same; big images are converted a band of rows at a time instead.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    width, height = surface.get_size()
+    rows = max(1, CONVERT_BAND // max(1, width))
+    if height <= rows:
+        return surface.convert_alpha()
+    return convert_in_bands(surface, rows)
+
+
+def convert_in_bands(surface, rows):
+    """Generator converting a surface like convert_alpha, rows at a time, yielding between bands"""
+    width, height = surface.get_size()
+    converted = pygame.Surface((width, height), pygame.SRCALPHA, pygame.Surface((1, 1)).convert_alpha())
+    for top in range(0, height, rows):
+        band = surface.subsurface(0, top, width, min(rows, height - top)).convert_alpha()
+        band.set_alpha(None)  # Copy the band's pixels, alpha and all, rather than blending them in
+        converted.blit(band, (0, top))
+        yield
+    return converted
+
+
+def load_sound(path, report):
+    """Decode a sound, initialising the mixer first if nothing has yet (the game only needs it once it has sounds)"""
+    with _mixer_lock:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+    return pygame.mixer.Sound(path)
+
+
+LOADERS = {
+    "level": Loader(load_level_data, dispose=LevelData.close),
+    "image": Loader(load_image, finish_image),
+    "sound": Loader(load_sound),
+}
+
+
+class AssetManager:
+    """
+    Loads levels, images and sounds on a pool of worker threads, so the frame loop never waits for a file.
+
+    load() returns an Asset straight away and a worker starts reading and decoding
+    it. A finished asset goes into a deque that only the workers append to and only
+    the main thread pops from (both atomic in CPython, so neither side takes a lock
+    or ever waits); poll(), once a frame, takes them off, finishes them on the main
+    thread within a time budget and marks them ready.
+
+    Assets are shared and reference counted: asking for one that is loaded or loading
+    returns the same Asset. When release() drops the last reference the asset stays
+    cached, in case it is wanted again (like switching back to the last level), until
+    more than keep assets are unreferenced; the least recently released goes first.
+    Failed assets are dropped as soon as nobody holds them, so asking again retries.
+
+    Args:
+        workers (int): Worker threads.
+        keep (int): Unreferenced assets kept cached.
+        loaders (dict): kind -> Loader, LOADERS for levels, images and sounds.
+    """
+    def __init__(self, workers=2, keep=8, loaders=LOADERS):
+        self.loaders = dict(loaders)
+        self.keep = keep
+        self.assets = {}  # (kind, path) -> Asset, for every asset loading or cached
+        self.unused = collections.OrderedDict()  # (kind, path) -> Asset without references, oldest first
+        self.finished = collections.deque()  # (asset, value, error) from the workers, for poll
+        self.finishing = None  # (asset, generator) whose finish poll is part way through
+        # Plain threads on a job queue rather than concurrent.futures, whose import alone costs more
+        # than the game's time to first frame can spare
+        self.jobs = queue.SimpleQueue()  # Assets to load, None to stop a worker
+        self.workers = [threading.Thread(target=self._work, name=f"assets-{i}", daemon=True) for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def __contains__(self, key):
+        """Whether a (kind, path) asset is loading or cached"""
+        kind, path = key
+        return (kind, os.path.abspath(path)) in self.assets
+
+    def __len__(self):
+        return len(self.assets)
+
+    def load(self, kind, path):
+        """
+        Take a reference to an asset, starting to load it if it isn't loading or cached already.
+
+        Returns:
+            Asset: The shared asset; release() it when done with it.
+        """
+        if kind not in self.loaders:
+            raise ValueError(f"no loader for {kind!r} assets, expected one of {', '.join(self.loaders)}")
+        key = (kind, os.path.abspath(path))
+        asset = self.assets.get(key)
+        if asset is None:
+            asset = Asset(*key)
+            self.assets[key] = asset
+            self.jobs.put(asset)
+        else:
+            self.unused.pop(key, None)
+        asset.refs += 1
+        return asset
+
+    def _work(self):
+        # On a worker thread: everything an asset needs that doesn't need the display
+        while True:
+            asset = self.jobs.get()
+            if asset is None:
+                return
+            if asset.evicted:
+                asset.loaded.set()  # Released and pushed out of the cache before its turn came
+                continue
+            try:
+                value = self.loaders[asset.kind].load(asset.path, asset.report)
+                error = None
+            except Exception as exc:
+                value = None
+                error = exc
+            self.finished.append((asset, value, error))
+            asset.loaded.set()
+
+    def poll(self, budget=POLL_BUDGET):
+        """
+        Finish assets the workers are done with, for up to budget seconds (call once a frame).
+
+        Returns:
+            list[Asset]: The assets that became ready or failed.
+        """
+        done = []
+        finished = self.finished
+        start = time.perf_counter()
+        while self.finishing is not None or finished:
+            if self.finishing is not None:
+                asset, steps = self.finishing
+                if asset.evicted:
+                    steps.close()
+                    self.finishing = None
+                    continue
+                try:
+                    next(steps)
+                except StopIteration as stop:
+                    self.finishing = None
+                    self._settle(asset, stop.value, None, done)
+                except Exception as exc:
+                    self.finishing = None
+                    self._settle(asset, None, exc, done)
+            else:
+                asset, value, error = finished.popleft()
+                loader = self.loaders[asset.kind]
+                if asset.evicted:
+                    # Released and pushed out of the cache while it was loading
+                    if error is None and loader.dispose is not None:
+                        loader.dispose(value)
+                    continue
+                if error is None and loader.finish is not None:
+                    try:
+                        value = loader.finish(value)
+                    except Exception as exc:
+                        error = exc
+                if error is None and isinstance(value, types.GeneratorType):
+                    self.finishing = (asset, value)  # Run a piece per round of this loop from here on
+                else:
+                    self._settle(asset, value, error, done)
+            if time.perf_counter() - start >= budget:
+                break
+        return done
+
+    @staticmethod
+    def _settle(asset, value, error, done):
+        # The asset is finished: ready with its value, or failed with the error
+        if error is None:
+            asset.value = value
+            asset.state = READY
+            asset.progress = 1.0
+        else:
+            asset.error = error
+            asset.state = FAILED
+        done.append(asset)
+
+    def wait(self, asset):
+        """
+        Block until an asset is ready or failed (for startup and headless tools, not mid-game).
+
+        Raises ValueError if the asset was evicted before it finished, as then it never will.
+        """
+        asset.loaded.wait()
+        while asset.state == LOADING and not asset.evicted:
+            self.poll(budget=float("inf"))
+        if asset.state == LOADING:
+            raise ValueError(f"{asset} was evicted before it finished loading")
+        return asset
+
+    def release(self, asset):
+        """Drop a reference taken by load(); unreferenced assets stay cached until more than keep are"""
+        if asset.refs <= 0:
+            raise ValueError(f"{asset} released more often than it was loaded")
+        asset.refs -= 1
+        if asset.refs:
+            return
+        if asset.state == FAILED:
+            self._evict(asset)  # Nothing worth keeping, and the next load() tries again
+            return
+        self.unused[asset.key] = asset
+        while len(self.unused) > self.keep:
+            _, oldest = self.unused.popitem(last=False)
+            self._evict(oldest)
+
+    def _evict(self, asset):
+        del self.assets[asset.key]
+        asset.evicted = True
+        if asset.state == READY:
+            dispose = self.loaders[asset.kind].dispose
+            if dispose is not None:
+                dispose(asset.value)
+        asset.value = None
+
+    def progress(self, assets):
+        """How far (0 to 1) a group of assets has got loading, e.g. everything a level needs"""
+        assets = list(assets)
+        if not assets:
+            return 1.0
+        return sum(1.0 if asset.state != LOADING else asset.progress for asset in assets) / len(assets)
+
+    def close(self):
+        """Stop the workers (dropping what they haven't started) and dispose of every asset"""
+        for asset in list(self.assets.values()):
+            self._evict(asset)
+        self.unused.clear()
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.poll(budget=float("inf"))  # Disposes of whatever was mid-load
@@ -0,0 +1,214 @@
+import argparse
+import itertools
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+from movers import make_movers
+from replay import pack_inputs, RESTART, UNPACKED
+from spatial import shape_rect
+from world import World, Inputs, Physics
+
+STANDING_REACH = 20  # How far below the feet a platform can be and still count as stood on when landing
+
+
+def random_inputs(count, seed=1):
+    """
+    Button mashing that changes every few ticks, roughly like a person playing.
+
+    Returns:
+        bytes: One packed byte of buttons per tick (see replay.pack_inputs).
+    """
+    rng = random.Random(seed)
+    inputs = bytearray()
+    while len(inputs) < count:
+        held = Inputs(left=rng.random() < 0.3, right=rng.random() < 0.5, jump=rng.random() < 0.2,
+                      roll=rng.random() < 0.05, restart=rng.random() < 0.01)
+        inputs += bytes((pack_inputs(held),)) * rng.randrange(1, 20)
+    return bytes(inputs[:count])
+
+
+class Run:
+    """
+    One headless simulation to do: a level, the physics to play it with and the buttons to press.
+
+    Runs are sent to worker processes, so they only hold plain data.
+
+    Args:
+        level_path (str): Level to play, as for replay.world_for.
+        physics (Physics): Movement constants.
+        inputs (bytes or None): One packed byte of buttons per tick, None for random_inputs(ticks, seed).
+        ticks (int): How long to simulate when inputs is None.
+        seed (int): Seed for the random inputs.
+        goal (tuple or None): (x, y, width, height) of the platform to reach, None for the level's rightmost.
+    """
+    def __init__(self, level_path, physics, inputs=None, ticks=3600, seed=0, goal=None):
+        self.level_path = level_path
+        self.physics = physics
+        self.inputs = inputs
+        self.ticks = ticks
+        self.seed = seed
+        self.goal = goal
+
+
+_levels = {}  # level path -> (platforms, start, ground level, mover entries), loaded once per worker process
+
+
+def _load_level(level_path):
+    level = _levels.get(level_path)
+    if level is None:
+        from levelfile import open_level
+
+        with open_level(os.path.join(os.path.dirname(os.path.abspath(__file__)), level_path)) as level_file:
+            level = _levels[level_path] = ([tuple(platform) for platform in level_file.read_all()], level_file.start,
+                                           level_file.ground_level, level_file.read_movers())
+    return level
+
+
+def simulate(run):
+    """
+    Play one Run to the end.
+
+    Returns:
+        dict: "seed", "ticks", "max_jump_height" (pixels risen above the last standing height),
+        "platforms_reached" (set of (x, y, width, height) of the static platforms landed on) and
+        "time_to_goal" (tick of the first landing on the goal, or None).
+    """
+    platforms, start, ground_level, mover_entries = _load_level(run.level_path)
+    # Built like replay.world_for, moving platforms and all, so runs play the level the game does
+    world = World([pygame.Rect(platform) for platform in platforms], start[0], start[1], ground_level, run.physics)
+    for platform, awake in make_movers(mover_entries, run.level_path):
+        world.movers.add(platform, awake)
+    goal = run.goal if run.goal is not None else max(platforms, key=lambda platform: (platform[0], -platform[1]))
+    inputs = run.inputs if run.inputs is not None else random_inputs(run.ticks, run.seed)
+
+    player = world.player
+    tick = world.tick
+    level = world.level
+    movers = world.movers
+    reached = set()
+    time_to_goal = None
+    max_jump_height = 0.0
+    standing_y = top_y = player.y
+    was_on_ground = player.on_ground
+    for bits in inputs:
+        tick(UNPACKED[bits])
+        if bits & RESTART:
+            standing_y = top_y = player.y  # Teleported back to the start, not a jump
+        if player.on_ground:
+            if not was_on_ground:
+                # Landed: note the jump's height and which platform broke the fall
+                max_jump_height = max(max_jump_height, standing_y - top_y)
+                feet = player.y + player.height
+                for shape in level.query_box(player.x, feet, player.width, STANDING_REACH):
+                    if shape in movers:
+                        continue  # Somewhere different every time; only the level's fixed layout counts
+                    rect = shape_rect(shape)
+                    if rect.top >= feet - 1:
+                        reached.add(tuple(rect))
+                if time_to_goal is None and tuple(goal) in reached:
+                    time_to_goal = world.time
+            standing_y = top_y = player.y
+        elif player.y < top_y:
+            top_y = player.y
+        was_on_ground = player.on_ground
+
+    return {"seed": run.seed, "ticks": len(inputs), "max_jump_height": max_jump_height,
+            "platforms_reached": reached, "time_to_goal": time_to_goal}
+
+
+def run_batch(runs, processes=None, chunksize=None):
+    """
+    Simulate many Runs across worker processes.
+
+    Args:
+        runs (list[Run]): What to simulate.
+        processes (int or None): Worker processes, None for one per core; 1 runs everything in this process.
+        chunksize (int or None): Runs handed to a worker at a time, None to split them evenly.
+
+    Returns:
+        list[dict]: simulate's result for each run, in order.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        return [simulate(run) for run in runs]
+    if chunksize is None:
+        chunksize = max(1, len(runs) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(simulate, runs, chunksize=chunksize))
+
+
+def sweep(level_path, seeds=range(10), ticks=3600, **values):
+    """
+    Runs for every combination of physics values, each played with every seed's random inputs.
+
+    Args:
+        level_path (str): Level to play.
+        seeds (iterable): One run per seed for each combination.
+        ticks (int): Length of each run.
+        **values: Physics argument name -> list of values to try, e.g. gravity=[0.6, 0.8, 1.0].
+
+    Returns:
+        list[Run]: The runs, grouped by physics.
+    """
+    names = list(values)
+    runs = []
+    for combination in itertools.product(*(values[name] for name in names)):
+        physics = Physics(**dict(zip(names, combination)))
+        runs.extend(Run(level_path, physics, ticks=ticks, seed=seed) for seed in seeds)
+    return runs
+
+
+def summarize(runs, results):
+    """
+    Aggregate results per physics.
+
+    Returns:
+        dict: Physics -> {"runs", "max_jump_height", "mean_jump_height", "platforms_reached" (landed on in any
+        run), "goal_rate" (fraction of runs that reached the goal), "median_time_to_goal" (ticks, or None)}.
+    """
+    groups = {}
+    for run, result in zip(runs, results):
+        groups.setdefault(run.physics, []).append(result)
+
+    summary = {}
+    for physics, group in groups.items():
+        heights = [result["max_jump_height"] for result in group]
+        times = [result["time_to_goal"] for result in group if result["time_to_goal"] is not None]
+        summary[physics] = {
+            "runs": len(group),
+            "max_jump_height": max(heights),
+            "mean_jump_height": statistics.fmean(heights),
+            "platforms_reached": len(set().union(*(result["platforms_reached"] for result in group))),
+            "goal_rate": len(times) / len(group),
+            "median_time_to_goal": statistics.median(times) if times else None,
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    # python batch.py levels/level1.json --gravity 0.6 0.8 1.0 --jump-force -12 -15 --runs 20
+    parser = argparse.ArgumentParser(description="Sweep physics constants over headless runs of a level")
+    parser.add_argument("level", help="level file, relative to the game folder")
+    parser.add_argument("--gravity", type=float, nargs="+")
+    parser.add_argument("--jump-force", type=float, nargs="+")
+    parser.add_argument("--player-speed", type=float, nargs="+")
+    parser.add_argument("--roll-speed", type=float, nargs="+")
+    parser.add_argument("--runs", type=int, default=10, help="random input runs per combination")
+    parser.add_argument("--ticks", type=int, default=3600, help="ticks per run")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    values = {name: getattr(args, name) for name in ("gravity", "jump_force", "player_speed", "roll_speed")
+              if getattr(args, name)}
+    runs = sweep(args.level, range(args.runs), args.ticks, **values)
+    summary = summarize(runs, run_batch(runs, args.processes))
+    print(f"{'physics':<40} {'jump max':>9} {'mean':>6} {'platforms':>10} {'goal':>5} {'ticks':>6}")
+    for physics, stats in summary.items():
+        label = ", ".join(f"{name}={getattr(physics, name)}" for name in values) or "default"
+        time_to_goal = "-" if stats["median_time_to_goal"] is None else f"{stats['median_time_to_goal']:.0f}"
+        print(f"{label:<40} {stats['max_jump_height']:>9.1f} {stats['mean_jump_height']:>6.1f} "
+              f"{stats['platforms_reached']:>10} {stats['goal_rate']:>5.0%} {time_to_goal:>6}")
@@ -0,0 +1,177 @@
+"""
+Heap allocations per frame of the player, roll and animator state, measured with tracemalloc.
+
+Many worlds are stepped through a scripted 12 s of walking, jumping and
+rolling (inputs from one InputBuffer per world, and every roll re-posed on the
+shared RollAnimator as the fallback drawing path does). After a warm-up the
+script measures:
+
+- retained: heap blocks and bytes allocated by the end of the run that weren't
+  at the start, a whole number of script loops earlier (so the same input
+  events are waiting in the queues). Anything kept per frame would pile up
+  until the garbage collector has to stop the game to walk it.
+- transient: the peak heap use during the frame above where it started, for
+  the state updates alone (inputs, roll timers and transitions, animator pose)
+  and for whole World ticks (whose collision queries build short lists of
+  nearby platforms and free them again before the tick ends).
+- collections: garbage collector runs during the measured frames.
+
+Steady-state frames must retain nothing, stay under MAX_TRANSIENT_BYTES of
+transient heap and never set off the garbage collector; otherwise the run fails.
+
+It also compares the size of one player's state (Player plus RollState) with
+the same attributes in ordinary dict-backed instances.
+
+Run from the repo root with: python -m benchmarks.allocations
+"""
+import gc
+import sys
+import tracemalloc
+
+import pygame
+from controls import InputBuffer
+from player import roll_animator
+from specialmoves import handle_roll
+from world import World, Player
+
+WORLDS = 100
+SCRIPT_FRAMES = 240  # The input script repeats every 4 s
+FRAMES = SCRIPT_FRAMES * 3
+WARM_UP_FRAMES = 300  # Past the first rolls, and past the tick counts Python keeps as shared small ints
+MAX_TRANSIENT_BYTES = 4096  # Per frame of 100 worlds; a tick's few short-lived query lists come to well under 1 KB
+GROUND = 500
+KEYS = {"right": pygame.K_RIGHT, "left": pygame.K_LEFT, "jump": pygame.K_UP, "roll": pygame.K_SPACE}
+
+
+def script(frame, offset):
+    """(action, pressed) changes for a frame of walking right and left, jumping every second and rolling every 2 s"""
+    frame = (frame + offset) % SCRIPT_FRAMES
+    changes = []
+    if frame == 0:
+        changes += [("left", False), ("right", True)]
+    elif frame == 120:
+        changes += [("right", False), ("left", True)]
+    if frame % 60 == 5:
+        changes.append(("jump", True))
+    elif frame % 60 == 15:
+        changes.append(("jump", False))
+    if frame % 120 == 40:
+        changes.append(("roll", True))
+    elif frame % 120 == 42:
+        changes.append(("roll", False))
+    return changes
+
+
+def press(controls, changes):
+    for action, pressed in changes:
+        controls.handle_event(pygame.event.Event(pygame.KEYDOWN if pressed else pygame.KEYUP, key=KEYS[action]), 0.0)
+
+
+def make_worlds():
+    worlds = []
+    for i in range(WORLDS):
+        world = World([pygame.Rect(-5000, GROUND + 20, 10000, 40)], 100 + i * 3, GROUND - 50, GROUND)
+        worlds.append((world, InputBuffer(), i * 7))
+    return worlds
+
+
+def pose(world):
+    roll = world.player.roll_state
+    if roll.is_rolling:
+        roll_animator.reset(world.player.x, world.player.y, world.player.width, world.player.height,
+                            roll.roll_direction)
+        roll_animator.update(roll.current_phase, 1 - roll.phase_timer / roll.phase_durations[roll.current_phase])
+
+
+def state_frame(worlds, frame):
+    # Just the state records: inputs, roll timers and phase transitions, animator pose
+    for world, controls, offset in worlds:
+        press(controls, script(frame, offset))
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    for world, controls, offset in worlds:
+        inputs = controls.next_tick()
+        player = world.player
+        handle_roll(inputs.roll, player.roll_state, inputs.left, inputs.right)
+        pose(world)
+    return tracemalloc.get_traced_memory()[1] - start
+
+
+def world_frame(worlds, frame):
+    for world, controls, offset in worlds:
+        press(controls, script(frame, offset))
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    for world, controls, offset in worlds:
+        world.tick(controls.next_tick())
+        pose(world)
+    return tracemalloc.get_traced_memory()[1] - start
+
+
+def measure(step):
+    worlds = make_worlds()
+    collections = 0
+    counting = False
+
+    def count_collections(phase, info):
+        nonlocal collections
+        if counting and phase == "start":
+            collections += 1
+
+    # A full collection also empties CPython's free lists, so it goes before the warm-up refills them
+    gc.collect()
+    tracemalloc.start()
+    for frame in range(WARM_UP_FRAMES):
+        step(worlds, frame)
+    gc.callbacks.append(count_collections)
+    before = tracemalloc.take_snapshot()
+    counting = True  # Only now: taking the snapshot makes enough tuples to set off a run itself
+    worst_transient = 0
+    for frame in range(WARM_UP_FRAMES, WARM_UP_FRAMES + FRAMES):
+        worst_transient = max(worst_transient, step(worlds, frame))
+    gc.callbacks.remove(count_collections)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Only what the game's own code allocated; tracemalloc's bookkeeping lives in its own files
+    game_files = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>")]
+    diff = after.filter_traces(game_files).compare_to(before.filter_traces(game_files), "lineno")
+    blocks = sum(stat.count_diff for stat in diff)
+    size = sum(stat.size_diff for stat in diff)
+    return blocks, size, worst_transient, collections
+
+
+def state_size(obj):
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+    return sys.getsizeof(obj)
+
+
+def dict_backed(obj):
+    """An ordinary instance with the same attribute values as a slotted one"""
+    copy = type("Plain" + type(obj).__name__, (), {})()
+    for name in type(obj).__slots__:
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def main():
+    pygame.init()
+    print(f"{WORLDS} worlds, {FRAMES} frames after a {WARM_UP_FRAMES}-frame warm-up")
+    print(f"{'':<34} {'retained blocks':>16} {'retained bytes':>15} {'worst transient B':>18} {'GC runs':>8}")
+    for label, step in (("state (inputs, roll, animator)", state_frame), ("whole World ticks", world_frame)):
+        blocks, size, transient, collections = measure(step)
+        print(f"{label:<34} {blocks:>16} {size:>15} {transient:>18} {collections:>8}")
+        assert blocks == 0 and size == 0, f"{label}: {blocks} blocks ({size} bytes) kept from frame to frame"
+        assert transient <= MAX_TRANSIENT_BYTES, f"{label}: {transient} bytes in flight in one frame"
+        assert collections == 0, f"{label}: the garbage collector ran {collections} times"
+
+    player = Player(0, 0)
+    slotted = state_size(player) + state_size(player.roll_state)
+    plain = state_size(dict_backed(player)) + state_size(dict_backed(player.roll_state))
+    print()
+    print(f"one player's state: {slotted} bytes slotted, {plain} bytes as dict-backed instances")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Frame times through a level switch: loading on the main thread vs the AssetManager's worker threads.
+
+A big level (compiled to .lvl, as shipped), three 2048x2048 images and a sound
+are loaded while the game loop runs at 60 FPS: the player walks, level chunks
+stream around the camera and the screen is drawn through the DirtyRectRenderer.
+A third of the way in the next level and its assets are asked for:
+
+- blocking: everything is loaded on the main thread inside that frame.
+- streamed: an AssetManager loads it all on worker threads; every frame polls
+  it (converting the images to the display's format a band at a time) and the
+  game switches level as soon as everything is ready.
+- streamed, stale: the same, but the level's JSON is newer than its .lvl, so
+  the worker compiles it first. json's parser holds the GIL while it works
+  through the whole file, so on a huge level that still stalls the main thread.
+
+Each frame's work (everything but waiting for the next frame) is timed. The
+second table switches from one level to another and back, to show that an
+unreferenced level stays cached (and switching back is instant) unless more
+than keep assets have been released since.
+
+Run from the repo root with: python -m benchmarks.asset_streaming
+"""
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import wave
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy
+import pygame
+from assets import AssetManager, load_image, load_level_data, load_sound
+from camera import Camera
+from levelfile import LevelStreamer, open_level
+from player import draw_player, player_bounds
+from renderer import DirtyRectRenderer
+from world import Inputs
+
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 600
+FPS = 60
+BUDGET = 1 / FPS
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+FRAMES = 240
+SWITCH_FRAME = 80
+PLATFORMS = 100000
+MOVERS = 200
+IMAGES = 3
+IMAGE_SIZE = 2048
+SOUND_SECONDS = 2
+
+
+def write_level_json(path, seed):
+    """A long level: a floor to walk along, platforms scattered above it and some moving ones"""
+    rng = random.Random(seed)
+    width = PLATFORMS * 40
+    platforms = [[x, 500, 200, 20] for x in range(0, width, 200)]
+    platforms += [[rng.randrange(width), rng.randrange(100, 420), rng.randrange(20, 200), rng.randrange(10, 40)]
+                  for _ in range(PLATFORMS - len(platforms))]
+    movers = [{"type": "path", "rect": [0, 0, 80, 15], "path": [[x, 300], [x + 200, 250]], "speed": 2, "pause": 30}
+              for x in (rng.randrange(width) for _ in range(MOVERS))]
+    with open(path, "w") as file:
+        json.dump({"start": [50, 440], "ground_level": 520, "platforms": platforms, "movers": movers}, file)
+
+
+def write_image(path, seed):
+    """Noise, which compresses about as badly as a detailed background does"""
+    pixels = numpy.random.default_rng(seed).integers(0, 256, (IMAGE_SIZE, IMAGE_SIZE, 3), dtype=numpy.uint8)
+    pygame.image.save(pygame.surfarray.make_surface(pixels), path)
+
+
+def write_sound(path):
+    rate = 44100
+    samples = (numpy.sin(numpy.arange(rate * SOUND_SECONDS) * 440 * 2 * numpy.pi / rate) * 8000).astype("<i2")
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(rate)
+        file.writeframes(samples.tobytes())
+
+
+def make_files(directory):
+    """Two levels (plus a stale copy of the second) and the images and sound that go with the second"""
+    first = os.path.join(directory, "first.json")
+    second = os.path.join(directory, "second.json")
+    stale = os.path.join(directory, "stale.json")
+    write_level_json(first, 1)
+    write_level_json(second, 2)
+    for path in (first, second):
+        open_level(path).close()  # Compiled ahead, as shipped levels are
+    shutil.copy(second, stale)  # No .lvl, so it gets compiled when it loads
+    images = [os.path.join(directory, f"image{i}.png") for i in range(IMAGES)]
+    for i, path in enumerate(images):
+        write_image(path, i)
+    sound = os.path.join(directory, "sound.wav")
+    write_sound(sound)
+    return first, second, stale, images, sound
+
+
+class Game:
+    """Just enough of main.py's loop to play a level: simulation, streaming, camera and dirty-rect drawing"""
+    def __init__(self, screen, level_data):
+        self.screen = screen
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, min_x=0, min_y=0, max_y=0)
+        self.renderer = DirtyRectRenderer(screen, WHITE, [], BLACK)
+        self.images = []
+        self.enter(level_data, [])
+
+    def enter(self, level_data, images):
+        self.world = level_data.make_world()
+        self.images = images
+        self.camera.snap(*level_data.start)
+        self.streamer = LevelStreamer(level_data.level_file, self.world.level)
+        self.streamer.update(self.camera.x, self.camera.x + SCREEN_WIDTH)
+        self.view_offset = self.camera.offset()
+        self.renderer.set_level(self.static_platforms(), self.view_offset)
+
+    def static_platforms(self):
+        return [shape for shape in self.camera.visible(self.world.level) if shape not in self.world.movers]
+
+    def frame(self, dt, inputs):
+        world = self.world
+        player = world.player
+        world.step(dt, inputs)
+        draw_x, draw_y = world.render_position()
+        self.camera.follow(draw_x, draw_y, dt)
+        level_changed = self.streamer.update(self.camera.x, self.camera.x + SCREEN_WIDTH)
+        if level_changed or self.camera.offset() != self.view_offset:
+            self.view_offset = self.camera.offset()
+            self.renderer.set_level(self.static_platforms(), self.view_offset)
+        self.renderer.begin_frame()
+        for image in self.images:
+            self.renderer.mark_dirty(self.screen.blit(image, (0, 0), (0, 0, 64, 64)))
+        screen_x, screen_y = self.camera.world_to_screen(draw_x, draw_y)
+        draw_player(self.screen, screen_x, screen_y, player.height, 0, player.is_walking_left, player.width,
+                    world.time, player.is_walking_right, player.on_ground, player.roll_state)
+        self.renderer.mark_dirty(player_bounds(screen_x, screen_y, player.width, player.height))
+        self.renderer.end_frame()
+
+
+def ignore(fraction):
+    pass
+
+
+def load_blocking(level_path, images, sound):
+    """Everything loaded on the main thread, there and then"""
+    level_data = load_level_data(level_path, ignore)
+    surfaces = [load_image(path, ignore).convert_alpha() for path in images]
+    if sound is not None:
+        load_sound(sound, ignore)
+    return level_data, surfaces
+
+
+def play(screen, first, level_path, images, sound, streamed):
+    """
+    Play FRAMES frames, switching to another level and its assets from SWITCH_FRAME on.
+
+    Returns:
+        tuple: Each frame's work in seconds, and the frames from asking for the level until playing it.
+    """
+    manager = AssetManager() if streamed else None
+    game = Game(screen, first)
+    clock = pygame.time.Clock()
+    inputs = Inputs(right=True)
+    wanted = []
+    switched = None
+    work = []
+    clock.tick(FPS)
+    for frame in range(FRAMES):
+        dt = clock.tick(FPS) / 1000
+        start = time.perf_counter()
+        if frame == SWITCH_FRAME:
+            if streamed:
+                wanted = [manager.load("level", level_path)] + [manager.load("image", path) for path in images]
+                if sound is not None:
+                    wanted.append(manager.load("sound", sound))
+            else:
+                level_data, surfaces = load_blocking(level_path, images, sound)
+                game.enter(level_data, surfaces)
+                switched = 0
+        if wanted:
+            manager.poll()
+            if all(asset.ready for asset in wanted):
+                game.enter(wanted[0].value, [asset.value for asset in wanted[1:1 + len(images)]])
+                switched = frame - SWITCH_FRAME
+                wanted = []
+            elif any(asset.failed for asset in wanted):
+                raise next(asset.error for asset in wanted if asset.failed)
+        game.frame(dt, inputs)
+        work.append(time.perf_counter() - start)
+    if streamed:
+        manager.close()
+    else:
+        level_data.close()
+    return work, switched
+
+
+def frames_to_ready(manager, path, clock):
+    """Frames from asking for a level (polling once a frame) until it is ready"""
+    asset = manager.load("level", path)
+    frames = 0
+    while True:
+        manager.poll()
+        if asset.ready:
+            return asset, frames
+        clock.tick(FPS)
+        frames += 1
+
+
+def switch_back(first, second, keep):
+    """Frames to switch to the second level, then back to the first, with keep unreferenced assets cached"""
+    manager = AssetManager(keep=keep)
+    clock = pygame.time.Clock()
+    current, _ = frames_to_ready(manager, first, clock)
+    other, there = frames_to_ready(manager, second, clock)
+    manager.release(current)
+    current, back = frames_to_ready(manager, first, clock)
+    manager.release(other)
+    cached = len(manager)
+    manager.close()
+    return there, back, cached
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        pass  # No audio device: the sound is left out
+
+    directory = tempfile.mkdtemp()
+    try:
+        first_path, second_path, stale_path, images, sound = make_files(directory)
+        if not pygame.mixer.get_init():
+            sound = None
+        first = load_level_data(first_path, ignore)
+
+        print(f"{PLATFORMS:,} platforms and {MOVERS} moving ones a level, {IMAGES} {IMAGE_SIZE}x{IMAGE_SIZE} images"
+              f"{', a sound' if sound else ''}; {FRAMES} frames at {FPS} FPS, switching level at frame {SWITCH_FRAME}")
+        print(f"{'loading':>16} {'p50 ms':>7} {'p99 ms':>7} {'worst ms':>9} {'over budget':>12} "
+              f"{'frames to switch':>17}")
+        for name, path, streamed in (("blocking", second_path, False), ("streamed", second_path, True),
+                                     ("streamed, stale", stale_path, True)):
+            work, switched = play(screen, first, path, images, sound, streamed)
+            work_ms = sorted(seconds * 1e3 for seconds in work)
+            over = sum(seconds > BUDGET for seconds in work)
+            print(f"{name:>16} {statistics.median(work_ms):>7.2f} {work_ms[int(len(work_ms) * 0.99)]:>7.2f} "
+                  f"{work_ms[-1]:>9.2f} {over:>12} {switched:>17}")
+
+        print()
+        print(f"{'keep':>5} {'frames to load':>15} {'frames back':>12} {'cached after':>13}")
+        for keep in (0, 8):
+            there, back, cached = switch_back(first_path, second_path, keep)
+            print(f"{keep:>5} {there:>15} {back:>12} {cached:>13}")
+        first.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Batch simulator throughput: simulated ticks per second, in total and per core, as worker processes are added.
+
+Every process count plays the same runs (a small physics sweep with random inputs
+on level 1), and the results must match the single-process ones exactly.
+
+Run from the repo root with: python -m benchmarks.batch_sim
+"""
+import os
+import time
+
+from batch import run_batch, sweep
+
+LEVEL_PATH = os.path.join("levels", "level1.json")
+TICKS = 3600  # A minute of play per run
+SEEDS = range(8)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    runs = sweep(LEVEL_PATH, SEEDS, TICKS, gravity=[0.6, 0.8, 1.0], jump_force=[-12, -15])
+    total_ticks = len(runs) * TICKS
+
+    counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    print(f"{len(runs)} runs of {TICKS} ticks, {cores} core(s) available")
+    print(f"{'processes':>9} {'seconds':>8} {'ticks/s':>11} {'ticks/s/core':>13} {'scaling':>8}")
+    baseline = None
+    expected = None
+    for processes in counts:
+        start = time.perf_counter()
+        results = run_batch(runs, processes)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = results
+        assert results == expected  # Same inputs, same physics: worker processes must agree exactly
+
+        ticks_per_second = total_ticks / elapsed
+        baseline = baseline or ticks_per_second
+        print(f"{processes:>9} {elapsed:>8.2f} {ticks_per_second:>11,.0f} {ticks_per_second / processes:>13,.0f} "
+              f"{ticks_per_second / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
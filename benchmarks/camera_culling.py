@@ -0,0 +1,58 @@
+"""
+Frame time of drawing a scrolling level: every platform vs only what the camera sees.
+
+The camera pans across levels of growing size; the culled path asks the level's
+SpatialGrid for the platforms in view, so its cost should not grow with the level.
+
+Run from the repo root with: python -m benchmarks.camera_culling
+"""
+import random
+import time
+
+import pygame
+from camera import Camera
+from spatial import SpatialGrid
+
+VIEW_WIDTH = 1400
+VIEW_HEIGHT = 600
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+FRAMES = 200
+DRAW_ALL_LIMIT = 10000  # Drawing every platform of bigger levels takes too long to be worth timing
+
+
+def make_level(count, seed=1):
+    rng = random.Random(seed)
+    level_width = count * 150
+    return level_width, [pygame.Rect(rng.randrange(level_width), rng.randrange(100, VIEW_HEIGHT), rng.randrange(20, 200),
+                                     rng.randrange(10, 80)) for _ in range(count)]
+
+
+def time_frames(surface, camera, level_width, draw):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        camera.snap(frame * level_width / FRAMES, VIEW_HEIGHT / 2)
+        offset_x, offset_y = camera.offset()
+        surface.fill(WHITE)
+        for platform in draw():
+            pygame.draw.rect(surface, BLACK, platform.move(-offset_x, -offset_y))
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    surface = pygame.Surface((VIEW_WIDTH, VIEW_HEIGHT))
+    print(f"{'platforms':>10} {'culled (us)':>12} {'draw all (us)':>14}")
+    for count in (100, 1000, 10000, 100000):
+        level_width, platforms = make_level(count)
+        grid = SpatialGrid(platforms)
+        camera = Camera(VIEW_WIDTH, VIEW_HEIGHT, min_x=0, min_y=0, max_y=0)
+        culled = time_frames(surface, camera, level_width, lambda: camera.visible(grid))
+        if count <= DRAW_ALL_LIMIT:
+            draw_all = f"{time_frames(surface, camera, level_width, lambda: platforms) * 1e6:14.1f}"
+        else:
+            draw_all = f"{'-':>14}"
+        print(f"{count:>10} {culled * 1e6:>12.1f} {draw_all}")
+
+
+if __name__ == "__main__":
+    main()
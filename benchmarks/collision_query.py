@@ -0,0 +1,70 @@
+"""
+Cost per collision query: the old screen.get_at pixel sampler vs the geometric check.
+
+Run from the repo root with: python -m benchmarks.collision_query
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from collisions import move_box
+from spatial import SpatialGrid
+
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 600
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+QUERIES = 20000
+
+
+def pixel_check_collision(player_x, player_y, player_width, player_height, move_x, move_y, screen):
+    """The pixel sampler collision checks used before they worked on geometry (kept for comparison)"""
+    new_left = player_x + move_x
+    new_right = player_x + player_width + move_x
+    new_top = player_y + move_y
+    new_bottom = player_y + player_height + move_y
+
+    for x in range(int(new_left), int(new_right) + 1, player_width // 2):
+        for y in range(int(new_top), int(new_bottom) + 1, player_height // 2):
+            if 0 <= x < screen.get_width() and 0 <= y < screen.get_height():
+                if screen.get_at((x, y)) == (0, 0, 0):
+                    return False
+    return True
+
+
+def make_platforms():
+    return [
+        pygame.Rect(100, SCREEN_HEIGHT - 50, 50, 50),
+        pygame.Rect(250, SCREEN_HEIGHT - 100, 50, 100),
+        pygame.Rect(400, SCREEN_HEIGHT - 150, 50, 150),
+        pygame.Rect(550, SCREEN_HEIGHT - 200, 50, 200),
+    ]
+
+
+def time_queries(check, level, width, height):
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        x = (i * 7) % (SCREEN_WIDTH - width)
+        y = (i * 13) % (SCREEN_HEIGHT - height)
+        check(x, y, width, height, 5, 0, level)
+    return (time.perf_counter() - start) / QUERIES
+
+
+def main():
+    platforms = make_platforms()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen.fill(WHITE)
+    for platform in platforms:
+        pygame.draw.rect(screen, BLACK, platform)
+
+    print(f"{'player size':>12} {'pixels (us)':>12} {'geometry (us)':>14} {'speedup':>8}")
+    for width, height in ((7, 50), (14, 100), (28, 200), (56, 400)):
+        pixel_time = time_queries(pixel_check_collision, screen, width, height)
+        geometry_time = time_queries(move_box, SpatialGrid(platforms), width, height)
+        print(f"{width:>5}x{height:<6} {pixel_time * 1e6:>12.2f} {geometry_time * 1e6:>14.2f} {pixel_time / geometry_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
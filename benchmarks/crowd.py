@@ -0,0 +1,111 @@
+"""
+Limb kinematics for crowds of stick figures: one figure at a time vs one NumPy batch.
+
+For 1, 100 and 10,000 figures at random positions, facings and points in the
+walk cycle, this times working out every limb endpoint with
+player.limb_segments per figure against crowd.limb_endpoints for all of them
+at once, then whole frames drawn with draw_standing_pose per figure against
+draw_crowd (one blit call of pose sprites, reused from frame to frame). The
+batch has to give bit-identical endpoints, and frames of 100 and 10,000 figures
+clear of the screen's edges (where draw_crowd clips whole sprites) have to come
+out pixel for pixel the same.
+
+Run from the repo root with: python -m benchmarks.crowd
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from crowd import draw_crowd, limb_endpoints
+from player import draw_standing_pose, limb_segments, pose_reach
+
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 600
+WHITE = (255, 255, 255)
+MIN_SECONDS = 0.5  # Each measurement repeats for at least this long
+
+
+def make_crowd(count, seed=1, margin=(0, 0)):
+    """Figures' x, y, width, height, facing and time, positioned at least margin (x, y) inside the screen"""
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(margin[0], SCREEN_WIDTH - margin[0], count),
+            rng.uniform(margin[1], SCREEN_HEIGHT - margin[1], count), np.full(count, 7),
+            np.full(count, 50), rng.integers(-1, 2, count), rng.integers(0, 3600, count))
+
+
+def per_call(function):
+    """Seconds per call of function, repeated for at least MIN_SECONDS"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    print(f"{'figures':>8} {'scalar FK ms':>13} {'batched FK ms':>14} {'speedup':>8} "
+          f"{'scalar frame ms':>16} {'batched frame ms':>17} {'speedup':>8}")
+    for count in (1, 100, 10000):
+        x, y, width, height, facing, ticks = make_crowd(count)
+        # The scalar path gets plain Python numbers, as the game passes them
+        figures = list(zip(x.tolist(), y.tolist(), width.tolist(), height.tolist(), facing.tolist(), ticks.tolist()))
+
+        def scalar_kinematics():
+            for fx, fy, _, fh, ff, ft in figures:
+                limb_segments(fx, fy, fh, ff, ft)
+
+        def batched_kinematics():
+            limb_endpoints(x, y, height, facing, ticks)
+
+        def scalar_frame():
+            screen.fill(WHITE)
+            for fx, fy, fw, fh, ff, ft in figures:
+                draw_standing_pose(screen, fx, fy, fh, ff == -1, fw, ft, ff == 1)
+
+        poses = {}  # Kept between frames, as a game would
+
+        def batched_frame():
+            screen.fill(WHITE)
+            draw_crowd(screen, x, y, width, height, facing, ticks, poses)
+
+        scalar_fk = per_call(scalar_kinematics)
+        batched_fk = per_call(batched_kinematics)
+        scalar_draw = per_call(scalar_frame)
+        batched_draw = per_call(batched_frame)
+        print(f"{count:>8} {scalar_fk * 1000:>13.3f} {batched_fk * 1000:>14.3f} {scalar_fk / batched_fk:>7.1f}x "
+              f"{scalar_draw * 1000:>16.3f} {batched_draw * 1000:>17.3f} {scalar_draw / batched_draw:>7.1f}x")
+
+    # Same numbers, same pixels
+    x, y, width, height, facing, ticks = make_crowd(10000, seed=2)
+    scalar = np.array([limb_segments(fx, fy, fh, ff, ft) for fx, fy, fh, ff, ft
+                       in zip(x.tolist(), y.tolist(), height.tolist(), facing.tolist(), ticks.tolist())])
+    exact = np.array_equal(scalar, limb_endpoints(x, y, height, facing, ticks))
+
+    same_pixels = []
+    for count in (100, 10000):
+        x, y, width, height, facing, ticks = make_crowd(count, seed=3, margin=pose_reach(7, 50))
+        screen.fill(WHITE)
+        for fx, fy, fw, fh, ff, ft in zip(x.tolist(), y.tolist(), width.tolist(), height.tolist(), facing.tolist(),
+                                          ticks.tolist()):
+            draw_standing_pose(screen, fx, fy, fh, ff == -1, fw, ft, ff == 1)
+        expected = pygame.image.tobytes(screen, "RGB")
+        screen.fill(WHITE)
+        draw_crowd(screen, x, y, width, height, facing, ticks)
+        same_pixels.append(pygame.image.tobytes(screen, "RGB") == expected)
+    print()
+    print(f"endpoints of 10,000 figures bit-identical: {exact}; frames of 100 and 10,000 figures pixel-identical: "
+          f"{same_pixels[0]}, {same_pixels[1]}")
+    assert exact and all(same_pixels), "the batch doesn't match drawing one figure at a time"
+
+
+if __name__ == "__main__":
+    main()
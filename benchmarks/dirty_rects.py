@@ -0,0 +1,75 @@
+"""
+Frame time of full-screen redraws (fill + every platform + flip) vs the DirtyRectRenderer.
+
+The player walks across the screen while both pipelines draw it. The final frames
+are compared to make sure the dirty-rect path leaves the same picture behind.
+
+Run from the repo root with: python -m benchmarks.dirty_rects
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from player import draw_player, player_bounds
+from renderer import DirtyRectRenderer
+
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 600
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+FRAMES = 1000
+
+
+def make_platforms(count, seed=1):
+    rng = random.Random(seed)
+    return [pygame.Rect(rng.randrange(SCREEN_WIDTH), rng.randrange(100, SCREEN_HEIGHT), rng.randrange(20, 120),
+                        rng.randrange(10, 60)) for _ in range(count)]
+
+
+def player_at(frame):
+    return 100 + (frame * 5) % 1200, 420
+
+
+def full_redraw(screen, platforms):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        screen.fill(WHITE)
+        for platform in platforms:
+            pygame.draw.rect(screen, BLACK, platform)
+        x, y = player_at(frame)
+        draw_player(screen, x, y, 50, 0, False, 7, frame, True, True)
+        pygame.display.flip()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def dirty_redraw(screen, platforms):
+    renderer = DirtyRectRenderer(screen, WHITE, platforms, BLACK)
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        renderer.begin_frame()
+        x, y = player_at(frame)
+        draw_player(screen, x, y, 50, 0, False, 7, frame, True, True)
+        renderer.mark_dirty(player_bounds(x, y, 7, 50))
+        renderer.end_frame()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f"{'platforms':>10} {'full (us)':>10} {'dirty (us)':>11} {'speedup':>8} {'same picture':>13}")
+    for count in (4, 100, 1000):
+        platforms = make_platforms(count)
+        full_time = full_redraw(screen, platforms)
+        expected = pygame.image.tobytes(screen, "RGB")
+        dirty_time = dirty_redraw(screen, platforms)
+        same = pygame.image.tobytes(screen, "RGB") == expected
+        print(f"{count:>10} {full_time * 1e6:>10.1f} {dirty_time * 1e6:>11.1f} {full_time / dirty_time:>7.1f}x {str(same):>13}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Vectorized EntityStore step time for thousands of bodies against a platform array.
+
+Run from the repo root with: python -m benchmarks.entity_physics
+"""
+import time
+
+import numpy as np
+import pygame
+from entities import EntityStore, PlatformArray
+
+LEVEL_WIDTH = 150000
+GROUND_LEVEL = 520
+TICKS = 120
+FRAME_BUDGET_MS = 16
+
+
+def make_platforms(count, rng):
+    return [pygame.Rect(int(rng.integers(LEVEL_WIDTH)), int(rng.integers(200, 550)), int(rng.integers(20, 200)),
+                        int(rng.integers(10, 80))) for _ in range(count)]
+
+
+def main():
+    rng = np.random.default_rng(1)
+    platforms = PlatformArray(make_platforms(1000, rng))
+    print(f"{'bodies':>8} {'ms/step':>8} {'within 16 ms':>13}")
+    for count in (1000, 10000, 50000, 100000):
+        store = EntityStore()
+        for _ in range(count):
+            store.spawn(rng.uniform(0, LEVEL_WIDTH), rng.uniform(0, 500), velocity_x=rng.choice((-5, 0, 5)))
+
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            store.jump(rng.integers(0, count, count // 20))
+            store.step(platforms, GROUND_LEVEL)
+        per_step = (time.perf_counter() - start) / TICKS * 1e3
+        print(f"{count:>8} {per_step:>8.2f} {str(per_step < FRAME_BUDGET_MS):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Headless simulation throughput: how many World ticks per second with no display.
+
+Run from the repo root with: python -m benchmarks.headless_ticks
+"""
+import time
+
+import pygame
+from batch import random_inputs
+from replay import UNPACKED
+from world import World, TICK_RATE
+
+SCREEN_HEIGHT = 600
+TICKS = 60000
+
+
+def make_world():
+    platforms = [
+        pygame.Rect(100, SCREEN_HEIGHT - 50, 50, 50),
+        pygame.Rect(250, SCREEN_HEIGHT - 100, 50, 100),
+        pygame.Rect(400, SCREEN_HEIGHT - 150, 50, 150),
+        pygame.Rect(550, SCREEN_HEIGHT - 200, 50, 200),
+    ]
+    return World(platforms, 50, SCREEN_HEIGHT - 300, SCREEN_HEIGHT - 80)
+
+
+def main():
+    world = make_world()
+    inputs = [UNPACKED[bits] for bits in random_inputs(TICKS)]
+    start = time.perf_counter()
+    for tick_inputs in inputs:
+        world.tick(tick_inputs)
+    elapsed = time.perf_counter() - start
+
+    ticks_per_second = TICKS / elapsed
+    print(f"{TICKS} ticks in {elapsed:.3f} s: {ticks_per_second:,.0f} ticks/s "
+          f"({ticks_per_second / TICK_RATE:,.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Short taps and input latency through InputBuffer, compared with polling pygame.key.get_pressed each frame.
+
+A minute of quick jump taps (5 to 40 ms each, at random moments) is played into
+a loop running at several frame rates. The old way only sees a key that is
+down at the moment a frame starts. The buffer queues the events and hands them
+to the simulation tick by tick. Latency is the time from a key going down to
+the tick that sees it, both in total (including waiting for the next frame to
+poll events) and from the poll. From the poll it is at most one tick, except when
+several taps of the same key fall between two ticks: each tick takes one change
+per action, so they queue up rather than merge away.
+
+Run from the repo root with: python -m benchmarks.input_buffer
+"""
+import random
+
+import pygame
+from benchmarks.headless_ticks import make_world
+from controls import InputBuffer
+from profiler import percentile
+
+SECONDS = 60
+TAP_EVERY = 0.25  # Seconds between taps, on average
+
+
+def make_taps(rng):
+    taps = []
+    released = 0.0
+    while released < SECONDS:
+        # A key has to come up before it can go down again
+        down = released + max(0.002, rng.expovariate(1 / TAP_EVERY))
+        released = down + rng.uniform(0.005, 0.04)
+        taps.append((down, released))
+    return taps
+
+
+def run(fps, taps):
+    frame_time = 1 / fps
+    events = sorted([(down, pygame.KEYDOWN) for down, _ in taps] + [(up, pygame.KEYUP) for _, up in taps])
+    world = make_world()
+    controls = InputBuffer()
+    presses = []  # (time pressed, time polled) of key presses not yet seen by a tick
+    seen_by_tick = 0
+    total_latency = []
+    poll_latency = []
+    polled = 0
+    key_down = was_down = False
+
+    now = 0.0
+    next_event = 0
+    previous_jump = False
+
+    def next_tick():
+        nonlocal seen_by_tick, previous_jump
+        inputs = controls.next_tick()
+        if inputs.jump and not previous_jump:
+            seen_by_tick += 1
+            pressed, polled_at = presses.pop(0)
+            total_latency.append(now - pressed)
+            poll_latency.append(now - polled_at)
+        previous_jump = inputs.jump
+        return inputs
+
+    while now < SECONDS + 1:
+        now += frame_time
+        # Events that happened during the last frame are polled now, as the frame starts
+        while next_event < len(events) and events[next_event][0] <= now:
+            timestamp, kind = events[next_event]
+            key_down = kind == pygame.KEYDOWN
+            if key_down:
+                presses.append((timestamp, now))
+            controls.handle_event(pygame.event.Event(kind, key=pygame.K_w), timestamp)
+            next_event += 1
+        # The old loop polled get_pressed here: it only sees a key down right now
+        if key_down and not was_down:
+            polled += 1
+        was_down = key_down
+        world.step(frame_time, next_tick)  # Ticks run now, so a tick's latency is measured to now
+    return polled, seen_by_tick, total_latency, poll_latency
+
+
+def main():
+    pygame.init()
+    taps = make_taps(random.Random(1))
+    print(f"{len(taps)} taps of 5-40 ms over {SECONDS} s")
+    print(f"{'FPS':>5} {'polling saw':>12} {'buffer saw':>11} {'total p50 ms':>13} {'max ms':>7} "
+          f"{'from poll max ms':>17}")
+    for fps in (30, 60, 144, 240):
+        polled, seen, total_latency, poll_latency = run(fps, taps)
+        total_latency.sort()
+        poll_latency.sort()
+        print(f"{fps:>5} {polled:>12} {seen:>11} {percentile(total_latency, 0.5) * 1000:>13.1f} "
+              f"{total_latency[-1] * 1000:>7.1f} {poll_latency[-1] * 1000:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
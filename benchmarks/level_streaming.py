@@ -0,0 +1,103 @@
+"""
+Startup time and resident memory of a 1M-tile level with the memory-mapped chunk streamer.
+
+The level file is written once, then a fresh process opens it, streams chunks
+around a camera sweeping the whole level, and reports how long opening took and
+how much (anonymous) memory it used. Loading the same level as a JSON list of rects is
+measured the same way for comparison.
+
+Run from the repo root with: python -m benchmarks.level_streaming
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TILES = 1000000
+TILE_SIZE = 32
+ROWS = 4  # The level is a long strip, TILES / ROWS tiles wide
+VIEW_WIDTH = 1400
+
+
+def current_rss_kb():
+    """Anonymous resident memory; clean mmap pages of the level file are page cache the OS can drop"""
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1])
+    return 0
+
+
+def make_tiles():
+    for column in range(TILES // ROWS):
+        for row in range(ROWS):
+            yield column * TILE_SIZE, 400 + row * TILE_SIZE, TILE_SIZE, TILE_SIZE
+
+
+def measure_streamed(path):
+    from levelfile import LevelFile, LevelStreamer
+    from spatial import SpatialGrid
+
+    baseline = current_rss_kb()
+    start = time.perf_counter()
+    level = LevelFile(path)
+    grid = SpatialGrid()
+    streamer = LevelStreamer(level, grid)
+    streamer.update(0, VIEW_WIDTH)
+    startup = time.perf_counter() - start
+
+    peak_loaded = 0
+    level_width = TILES // ROWS * TILE_SIZE
+    worst_update = 0
+    for view_left in range(0, level_width, 64):
+        update_start = time.perf_counter()
+        streamer.update(view_left, view_left + VIEW_WIDTH)
+        worst_update = max(worst_update, time.perf_counter() - update_start)
+        peak_loaded = max(peak_loaded, len(grid))
+    return startup, current_rss_kb() - baseline, peak_loaded, worst_update
+
+
+def measure_json(path):
+    import pygame
+
+    baseline = current_rss_kb()
+    start = time.perf_counter()
+    with open(path) as file:
+        platforms = [pygame.Rect(platform) for platform in json.load(file)["platforms"]]
+    startup = time.perf_counter() - start
+    return startup, current_rss_kb() - baseline, len(platforms), 0
+
+
+def main():
+    if len(sys.argv) == 3:
+        # Child process: measure one loader from a clean start
+        kind, path = sys.argv[1], sys.argv[2]
+        result = measure_streamed(path) if kind == "streamed" else measure_json(path)
+        print(json.dumps(result))
+        return
+
+    from levelfile import write_level
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = os.path.join(directory, "huge.lvl")
+        json_path = os.path.join(directory, "huge.json")
+        tiles = list(make_tiles())
+        write_level(binary_path, tiles, (0, 300), 520)
+        with open(json_path, "w") as file:
+            json.dump({"start": [0, 300], "ground_level": 520, "platforms": tiles}, file)
+        del tiles
+
+        print(f"{TILES:,} tiles, binary file {os.path.getsize(binary_path) / 1e6:.1f} MB, "
+              f"JSON {os.path.getsize(json_path) / 1e6:.1f} MB")
+        print(f"{'loader':>9} {'startup (ms)':>13} {'RSS growth (MB)':>16} {'platforms held':>15} {'worst update (ms)':>18}")
+        for kind, path in (("streamed", binary_path), ("json", json_path)):
+            output = subprocess.run([sys.executable, "-m", "benchmarks.level_streaming", kind, path],
+                                    capture_output=True, text=True, check=True).stdout
+            startup, rss_kb, held, worst = json.loads(output.strip().splitlines()[-1])
+            print(f"{kind:>9} {startup * 1e3:>13.2f} {rss_kb / 1024:>16.1f} {held:>15,} {worst * 1e3:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Thousands of moving platforms: refiling only the ones that moved vs rebuilding the grid every tick.
+
+A level of static platforms gets path-following platforms (waiting up to a
+second and a half at each waypoint) and crumbling platforms, some of them set
+off at the start. The player rides a platform of their own through the whole
+run, with the swept move_box against everything. Each tick is timed two
+ways:
+
+- incremental: the level's SpatialGrid refiles a platform only when it moved
+  into other cells, and only awake platforms are stepped at all.
+- rebuild: the same World, but its grid is rebuilt from every platform's
+  current rect each tick before the first query.
+
+Both runs have to move the player along exactly the same path, the rider has
+to stay on its platform the whole time, and the incrementally updated grid has
+to end up filed exactly like a freshly built one.
+
+The second table shows sleeping platforms cost nothing: the time of a tick of
+100 awake platforms stays the same with up to 100k asleep alongside them.
+
+Run from the repo root with: python -m benchmarks.movers
+"""
+import random
+import time
+
+import pygame
+from movers import CARRY_PROBE, CrumblingPlatform, Movers, PathPlatform
+from spatial import SpatialGrid
+from world import Inputs, World
+
+TICKS = 600
+REPEATS = 5  # The sleeping platforms' cost is the best of this many runs, to see past scheduler noise
+STATIC_PLATFORMS = 1000
+CRUMBLING_SHARE = 0.2  # Of the movers, the rest follow paths
+SET_OFF_SHARE = 0.25  # Of the crumbling platforms, stood on at the start
+RIDER_X = -2000  # The player's platform, out of everything else's way
+RIDER_Y = 400
+GROUND = 5000
+
+
+class CountingGrid(SpatialGrid):
+    """A SpatialGrid that counts how often a move made it refile a platform"""
+    def __init__(self, shapes=()):
+        super().__init__(shapes)
+        self.refiles = 0
+
+    def update(self, shape):
+        refiled = super().update(shape)
+        self.refiles += refiled
+        return refiled
+
+
+class RebuiltGrid:
+    """Stands in for a SpatialGrid that is built from scratch whenever the platforms changed"""
+    def __init__(self, shapes):
+        self.shapes = {id(shape): shape for shape in shapes}
+        self.grid = SpatialGrid(shapes)
+        self.stale = False
+
+    def __contains__(self, shape):
+        return id(shape) in self.shapes
+
+    def insert(self, shape):
+        self.shapes[id(shape)] = shape
+        self.stale = True
+
+    def remove(self, shape):
+        del self.shapes[id(shape)]
+        self.stale = True
+
+    def update(self, shape):
+        self.stale = True
+        return False
+
+    def rebuilt(self):
+        if self.stale:
+            self.grid = SpatialGrid(self.shapes.values())
+            self.stale = False
+        return self.grid
+
+    def query_box(self, left, top, width, height):
+        return self.rebuilt().query_box(left, top, width, height)
+
+    def query_swept_box(self, left, top, width, height, move_x, move_y):
+        return self.rebuilt().query_swept_box(left, top, width, height, move_x, move_y)
+
+
+def make_level(movers, seed=1):
+    """Static platform rects and (platform, awake, set off) for movers, scattered at a constant density"""
+    rng = random.Random(seed)
+    width = (STATIC_PLATFORMS + movers) * 150
+    static = [pygame.Rect(rng.randrange(width), rng.randrange(100, 600), rng.randrange(20, 200), rng.randrange(10, 40))
+              for _ in range(STATIC_PLATFORMS)]
+    moving = []
+    for _ in range(movers):
+        x = rng.randrange(width)
+        y = rng.randrange(100, 600)
+        if rng.random() < CRUMBLING_SHARE:
+            moving.append((CrumblingPlatform((x, y, rng.randrange(40, 120), 15)), False,
+                           rng.random() < SET_OFF_SHARE))
+        else:
+            path = [(x, y)] + [(x + rng.randrange(-300, 300), y + rng.randrange(-150, 150))
+                               for _ in range(rng.randrange(1, 4))]
+            moving.append((PathPlatform((0, 0, rng.randrange(40, 160), 15), path, rng.uniform(0.5, 4),
+                                        pause=rng.randrange(0, 90), loop=rng.random() < 0.5), True, False))
+    rider = PathPlatform((0, 0, 120, 15), [(RIDER_X, RIDER_Y), (RIDER_X + 300, RIDER_Y - 150),
+                                           (RIDER_X + 300, RIDER_Y + 100)], 2, pause=20)
+    moving.append((rider, True, False))
+    return static, moving, rider
+
+
+def make_world(movers, rebuild):
+    static, moving, rider = make_level(movers)
+    world = World([], RIDER_X + 50, RIDER_Y - 50, GROUND)
+    grid = RebuiltGrid(static) if rebuild else CountingGrid(static)
+    world.level = grid
+    world.movers = Movers(grid)
+    for platform, awake, set_off in moving:
+        world.movers.add(platform, awake)
+        if set_off:
+            world.movers.touch(platform)
+    return world, rider
+
+
+def run(world, rider):
+    """Seconds per tick, awake platforms per tick, the player's path and whether they rode the whole way"""
+    inputs = Inputs()
+    player = world.player
+    path = []
+    awake = 0
+    on_board = True
+    elapsed = 0.0
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        world.tick(inputs)
+        elapsed += time.perf_counter() - start
+        awake += len(world.movers.awake)
+        path.append((player.x, player.y))
+        feet = player.y + player.height
+        on_board &= (abs(feet - rider.rect.top) <= CARRY_PROBE and rider.rect.left <= player.x
+                     and player.x + player.width <= rider.rect.right)
+    return elapsed / TICKS, awake / TICKS, path, on_board
+
+
+def filed_like_new(grid):
+    """Whether a grid kept up to date incrementally files every platform where a new one would"""
+    fresh = SpatialGrid(grid)
+    return ({cell: set(bucket) for cell, bucket in grid.cells.items()}
+            == {cell: set(bucket) for cell, bucket in fresh.cells.items()})
+
+
+def sleeping_cost(asleep, awake=100, seed=3):
+    """Microseconds per Movers.update with awake path platforms and asleep crumbling ones (best of REPEATS)"""
+    rng = random.Random(seed)
+    movers = Movers(SpatialGrid())
+    for _ in range(awake):
+        x = rng.randrange(awake * 300)
+        movers.add(PathPlatform((0, 0, 80, 15), [(x, 300), (x + 200, 200)], 2))
+    for _ in range(asleep):
+        movers.add(CrumblingPlatform((rng.randrange(-10 ** 6, 0), rng.randrange(100, 600), 80, 15)), awake=False)
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            movers.update()
+        best = min(best, time.perf_counter() - start)
+    return best / TICKS * 1e6
+
+
+def main():
+    print(f"{STATIC_PLATFORMS} static platforms, {TICKS} ticks, the player riding a platform the whole time")
+    print(f"{'movers':>7} {'awake/tick':>11} {'refiles/tick':>13} {'incremental ms':>15} {'rebuild ms':>11} "
+          f"{'speedup':>8} {'same path':>10} {'rode':>5} {'grid exact':>11}")
+    for count in (1000, 5000, 10000):
+        world, rider = make_world(count, rebuild=False)
+        incremental, awake, path, rode = run(world, rider)
+        rebuilt_world, rebuilt_rider = make_world(count, rebuild=True)
+        rebuild, _, rebuilt_path, _ = run(rebuilt_world, rebuilt_rider)
+        print(f"{count:>7} {awake:>11.0f} {world.level.refiles / TICKS:>13.1f} {incremental * 1e3:>15.3f} "
+              f"{rebuild * 1e3:>11.3f} {rebuild / incremental:>7.1f}x {'yes' if path == rebuilt_path else 'NO':>10} "
+              f"{'yes' if rode else 'NO':>5} {'yes' if filed_like_new(world.level) else 'NO':>11}")
+
+    print()
+    sleeping_cost(0)  # Warm-up: the first run on a fresh process is slow however long it goes on
+    print(f"{'asleep':>7} {'update us/tick (100 awake)':>27}")
+    for asleep in (0, 1000, 10000, 100000):
+        print(f"{asleep:>7} {sleeping_cost(asleep):>27.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Frame time of the walking/idle stick figure: immediate-mode pygame.draw vs the pose sprite cache.
+
+Also counts how many pixels of a whole walk cycle differ between the two, with
+the figure at whole and fractional positions. Both put the figure on the nearest
+whole pixel and round its limbs relative to that, so they should match exactly;
+more than MAX_DIFFERENT_PIXELS in any state fails the run.
+
+Run from the repo root with: python -m benchmarks.pose_cache
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from player import draw_player, PoseCache, RED, WALK_CYCLE_FRAMES
+
+FRAMES = 6000
+PLAYER_WIDTH = 7
+PLAYER_HEIGHT = 50
+WHITE = (255, 255, 255)
+POSITIONS = ((200, 200), (200.25, 199.6), (199.5, 200.5), (199.6, 200.7))  # Where the figure is checked
+MAX_DIFFERENT_PIXELS = 4  # Per state, over every position and frame of the cycle
+
+STATES = {
+    "idle": (False, False),
+    "walking left": (True, False),
+    "walking right": (False, True),
+}
+
+
+def time_drawing(screen, walking_left, walking_right, cache):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        draw_player(screen, 200, 300, PLAYER_HEIGHT, 0, walking_left, PLAYER_WIDTH, frame,
+                    walking_right, True, None, pose_cache=cache)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def count_different_pixels(walking_left, walking_right, cache):
+    direct = pygame.Surface((400, 400))
+    cached = pygame.Surface((400, 400))
+    different = 0
+    for x, y in POSITIONS:
+        for frame in range(WALK_CYCLE_FRAMES):
+            direct.fill(WHITE)
+            cached.fill(WHITE)
+            draw_player(direct, x, y, PLAYER_HEIGHT, 0, walking_left, PLAYER_WIDTH, frame, walking_right, True, None,
+                        pose_cache=None)
+            draw_player(cached, x, y, PLAYER_HEIGHT, 0, walking_left, PLAYER_WIDTH, frame, walking_right, True, None,
+                        pose_cache=cache)
+            direct_mask = pygame.mask.from_threshold(direct, RED, (1, 1, 1, 255))
+            cached_mask = pygame.mask.from_threshold(cached, RED, (1, 1, 1, 255))
+            different += direct_mask.count() + cached_mask.count() - 2 * direct_mask.overlap_area(cached_mask, (0, 0))
+    return different
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((1400, 600))
+    print(f"{'state':>14} {'direct (us)':>12} {'cached (us)':>12} {'speedup':>8} {'diff px':>14}")
+    for name, (walking_left, walking_right) in STATES.items():
+        cache = PoseCache()
+        direct_time = time_drawing(screen, walking_left, walking_right, None)
+        cached_time = time_drawing(screen, walking_left, walking_right, cache)
+        different = count_different_pixels(walking_left, walking_right, cache)
+        print(f"{name:>14} {direct_time * 1e6:>12.2f} {cached_time * 1e6:>12.2f} "
+              f"{direct_time / cached_time:>7.1f}x {different:>14}")
+        assert different <= MAX_DIFFERENT_PIXELS, f"{name}: cached poses differ from direct drawing by {different} px"
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Cost of the FrameProfiler's scoped stage timers, switched off and on.
+
+Each "frame" enters five stages around a trivial body, like the main loop does.
+
+Run from the repo root with: python -m benchmarks.profiler_overhead
+"""
+import time
+
+from profiler import FrameProfiler
+
+FRAMES = 200000
+STAGES = ("events", "simulation", "level", "draw", "present")
+
+
+def bare_frames():
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for _ in STAGES:
+            pass
+    return time.perf_counter() - start
+
+
+def profiled_frames(profiler):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        profiler.begin_frame()
+        for name in STAGES:
+            with profiler.stage(name):
+                pass
+        profiler.end_frame()
+    return time.perf_counter() - start
+
+
+def main():
+    bare = bare_frames()
+    disabled = profiled_frames(FrameProfiler(enabled=False))
+    enabled_profiler = FrameProfiler(enabled=True)
+    enabled = profiled_frames(enabled_profiler)
+
+    print(f"{'profiler':>9} {'overhead per frame (us)':>24} {'of a 16.7 ms frame':>19}")
+    for name, elapsed in (("disabled", disabled), ("enabled", enabled)):
+        per_frame = (elapsed - bare) / FRAMES
+        print(f"{name:>9} {per_frame * 1e6:>24.2f} {per_frame / (1 / 60) * 100:>18.3f}%")
+    summary = enabled_profiler.summary()["frame"]
+    print(f"enabled frame p50/p95/p99: {summary['p50'] * 1000:.2f}/{summary['p95'] * 1000:.2f}/"
+          f"{summary['p99'] * 1000:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Reachability graph build time on large random levels, cached lookups, and agreement with real jumps.
+
+The agreement check puts a player on the edge of one platform, jumps towards a
+second one at some gap and height, and plays the jump out in a World. The landing
+is compared with what the envelope predicted. The two only disagree within a few
+pixels of the edge of the envelope.
+
+Run from the repo root with: python -m benchmarks.reachability
+"""
+import random
+import time
+
+import pygame
+import reachability
+from reachability import Reachability, FALL, WALK, envelope_for
+from replay import UNPACKED, RIGHT, JUMP
+from world import World, Physics
+
+GROUND_LEVEL = 2000
+LEVEL_HEIGHT = 2000
+
+
+def make_platforms(count, rng):
+    width = count * 60  # Roughly as dense as a hand-built level
+    return [pygame.Rect(rng.randrange(width), rng.randrange(100, LEVEL_HEIGHT), rng.randrange(30, 200),
+                        rng.randrange(10, 40)) for _ in range(count)]
+
+
+def time_build(count, rng):
+    level = Reachability(make_platforms(count, rng), GROUND_LEVEL)
+    reachability._envelopes.clear()
+    start = time.perf_counter()
+    graph = level.graph()
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    level.graph()
+    cached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    level.graph(Physics(gravity=0.9))  # Different constants, so a new envelope and graph
+    changed = time.perf_counter() - start
+    edges = sum(len(edges) for edges in graph.values())
+    return cold * 1e3, cached * 1e6, changed * 1e3, edges
+
+
+def lands_on_target(source, target):
+    """Jump right off the edge of source, steering for the near edge of target, and report whether it lands there"""
+    world = World([source, target], source.right - 1, source.top - 50, GROUND_LEVEL)
+    player = world.player
+    player.on_ground = True
+    speed = world.physics.player_speed
+
+    def steer():
+        # Keep going right until over the target, then drop straight onto it; while still below its top,
+        # stop short of going under it, or the jump only bumps into its underside
+        right = player.x + player.width
+        below = player.y + player.height > target.top
+        return RIGHT if right <= target.left and (not below or right + speed <= target.left) else 0
+
+    world.tick(UNPACKED[steer() | JUMP])
+    while not player.on_ground:
+        world.tick(UNPACKED[steer()])
+    return player.x + player.width > target.left and player.x < target.right and player.y < GROUND_LEVEL
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'platforms':>9} {'build ms':>9} {'cached us':>10} {'new physics ms':>15} {'edges':>8}")
+    for count in (1000, 5000, 20000):
+        cold, cached, changed, edges = time_build(count, rng)
+        print(f"{count:>9} {cold:>9.1f} {cached:>10.1f} {changed:>15.1f} {edges:>8}")
+
+    envelope = envelope_for(Physics())
+    checked = agreed = 0
+    near_miss = []
+    for gap in range(10, 300, 10):
+        for drop in range(-140, 400, 20):
+            source = pygame.Rect(0, 1000, 100, 20)
+            target = pygame.Rect(source.right + gap, source.top + drop, 100, 20)
+            predicted = Reachability([source, target], GROUND_LEVEL).graph()[tuple(source)].get(tuple(target))
+            actual = lands_on_target(source, target)
+            checked += 1
+            if (predicted in (FALL, WALK)) == actual:
+                agreed += 1
+            else:
+                reach = envelope.reach(WALK, drop)
+                near_miss.append(abs(gap - 7 - reach) if reach is not None else abs(drop + envelope.apex(WALK)))
+    print()
+    print(f"walking jumps: graph agrees with simulation on {agreed}/{checked} gap/height pairs"
+          + (f", disagreements within {max(near_miss):.1f} px of the envelope" if near_miss else ""))
+
+
+if __name__ == "__main__":
+    main()
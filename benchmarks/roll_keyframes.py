@@ -0,0 +1,82 @@
+"""
+Drawing a full roll: a fresh RollAnimator per frame vs the baked RollKeyframes tables.
+
+Also checks that both draw exactly the same pixels for every frame of the roll, in
+both directions, at whole and fractional player positions; any difference fails the run.
+
+Run from the repo root with: python -m benchmarks.roll_keyframes
+"""
+import time
+
+import pygame
+from player import draw_player, RollKeyframes
+from specialmoves import RollState
+
+PLAYER_WIDTH = 7
+PLAYER_HEIGHT = 50
+WHITE = (255, 255, 255)
+ROLLS = 500
+POSITIONS = ((200, 200), (200.5, 199.25), (123.37, 251.8))
+
+
+def roll_frames(direction):
+    """(phase, phase_timer) for every frame a roll is drawn, the way the game loop steps it"""
+    roll_state = RollState()
+    roll_state.start_roll(facing_left=direction < 0)
+    frames = []
+    while roll_state.is_rolling:
+        frames.append((roll_state.current_phase, roll_state.phase_timer))
+        roll_state.update()
+    return roll_state, frames
+
+
+def draw_roll(screen, roll_state, frames, x, y, keyframes):
+    roll_state.is_rolling = True
+    for phase, phase_timer in frames:
+        roll_state.current_phase = phase
+        roll_state.phase_timer = phase_timer
+        draw_player(screen, x, y, PLAYER_HEIGHT, 0, False, PLAYER_WIDTH, 0, False, True, roll_state,
+                    roll_keyframes=keyframes)
+
+
+def pixels_match(keyframes):
+    animated = pygame.Surface((400, 400))
+    baked = pygame.Surface((400, 400))
+    for direction in (1, -1):
+        roll_state, frames = roll_frames(direction)
+        roll_state.roll_direction = direction
+        for x, y in POSITIONS:
+            for frame in frames:
+                animated.fill(WHITE)
+                baked.fill(WHITE)
+                draw_roll(animated, roll_state, [frame], x, y, None)
+                draw_roll(baked, roll_state, [frame], x, y, keyframes)
+                if pygame.image.tobytes(animated, "RGB") != pygame.image.tobytes(baked, "RGB"):
+                    return False
+    return True
+
+
+def main():
+    screen = pygame.Surface((1400, 600))
+    keyframes = RollKeyframes()
+    roll_state, frames = roll_frames(1)
+    roll_state.roll_direction = 1
+
+    results = {}
+    for name, tables in (("RollAnimator", None), ("RollKeyframes", keyframes)):
+        draw_roll(screen, roll_state, frames, 300, 300, tables)  # Warm up (bakes the tables)
+        start = time.perf_counter()
+        for _ in range(ROLLS):
+            draw_roll(screen, roll_state, frames, 300, 300, tables)
+        results[name] = (time.perf_counter() - start) / (ROLLS * len(frames))
+
+    for name, per_frame in results.items():
+        print(f"{name:>14}: {per_frame * 1e6:7.2f} us per roll frame")
+    print(f"{'speedup':>14}: {results['RollAnimator'] / results['RollKeyframes']:7.1f}x")
+    identical = pixels_match(keyframes)
+    print(f"{'pixels':>14}: {'identical' if identical else 'DIFFERENT'} over {len(frames)} frames x 2 directions")
+    assert identical, "RollKeyframes draws the roll differently from RollAnimator"
+
+
+if __name__ == "__main__":
+    main()
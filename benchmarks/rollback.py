@@ -0,0 +1,141 @@
+"""
+Rollback netcode for 4 players over a loopback stand-in for the network.
+
+Four peers each run a RollbackSession of the same 4-player match on level 1,
+each supplying one player's button mashing and exchanging inputs through a
+LoopbackNetwork. With a one-way latency of 8 frames every remote input arrives
+8 frames late, so each misprediction restores a snapshot and simulates the
+last 8 frames of all 4 players again; the 99th percentile of those rollbacks
+is checked against the 2 ms budget. A second match adds jitter, so inputs also
+arrive out of order. Afterwards every peer has to end up in exactly the state
+of a plain run of the same inputs. Level 2 is then played with latencies from
+0 to 8 frames, to check that its moving and crumbling platforms roll back
+along with the players.
+
+The second part shows the snapshot format: bytes per snapshot, what delta
+compression gets them down to, and the cost of saving and restoring them.
+
+Run from the repo root with: python -m benchmarks.rollback
+"""
+import time
+
+from batch import random_inputs
+from profiler import percentile
+from replay import UNPACKED, world_for
+from rollback import LoopbackNetwork, RollbackSession, SnapshotRing, decode_delta, encode_delta
+
+LEVEL_PATH = "levels/level1.json"
+MOVERS_LEVEL_PATH = "levels/level2.json"  # Has moving and crumbling platforms
+PLAYERS = 4
+FRAMES = 60 * 30
+MAX_ROLLBACK = 8
+BUDGET = 0.002  # Seconds a rollback may take
+
+
+def make_worlds(level_path=LEVEL_PATH):
+    return [world_for(level_path) for _ in range(PLAYERS)]
+
+
+def final_state(worlds):
+    ring = SnapshotRing(1, worlds)
+    ring.save(0, worlds)
+    return ring.get(0)
+
+
+def reference(inputs, level_path=LEVEL_PATH):
+    """The match simulated with every input known up front"""
+    worlds = make_worlds(level_path)
+    for frame in range(FRAMES):
+        for player, world in enumerate(worlds):
+            world.tick(UNPACKED[inputs[player][frame]])
+    return final_state(worlds)
+
+
+def run_match(inputs, latency, jitter, level_path=LEVEL_PATH):
+    network = LoopbackNetwork(PLAYERS, latency, jitter, seed=1)
+    sessions = [RollbackSession(make_worlds(level_path), player, network.endpoint(player), MAX_ROLLBACK)
+                for player in range(PLAYERS)]
+    rollback_times = {}  # Frames simulated again -> seconds each rollback took
+    while any(session.frame < FRAMES for session in sessions):
+        for player, session in enumerate(sessions):
+            start = time.perf_counter()
+            depth = session.poll()
+            if depth:
+                rollback_times.setdefault(depth, []).append(time.perf_counter() - start)
+            if session.frame < FRAMES:
+                session.advance(UNPACKED[inputs[player][session.frame]])
+        network.tick()
+
+    # Let the last inputs arrive
+    for _ in range(latency + jitter + 1):
+        network.tick()
+        for session in sessions:
+            session.poll()
+    return sessions, rollback_times
+
+
+def main():
+    inputs = [random_inputs(FRAMES, seed=player + 1) for player in range(PLAYERS)]
+    expected = reference(inputs)
+
+    print(f"{PLAYERS} peers x {PLAYERS} players, {FRAMES} frames, max rollback {MAX_ROLLBACK} frames")
+    print(f"{'latency':>8} {'jitter':>7} {'rollbacks':>10} {'resimulated':>12} {'stalls':>7} "
+          f"{'8-frame p50 ms':>15} {'p99 ms':>7} {'max ms':>7} {'in sync':>8}")
+    for latency, jitter in ((MAX_ROLLBACK, 0), (5, 3)):
+        sessions, rollback_times = run_match(inputs, latency, jitter)
+        in_sync = all(final_state(session.worlds) == expected for session in sessions)
+        full = sorted(rollback_times.get(MAX_ROLLBACK, [0.0]))
+        print(f"{latency:>8} {jitter:>7} {sum(s.rollbacks for s in sessions):>10} "
+              f"{sum(s.frames_resimulated for s in sessions):>12} {sum(s.stalls for s in sessions):>7} "
+              f"{percentile(full, 0.5) * 1000:>15.3f} {percentile(full, 0.99) * 1000:>7.3f} {full[-1] * 1000:>7.3f} "
+              f"{'yes' if in_sync else 'NO':>8}")
+        if latency == MAX_ROLLBACK:
+            slow = sum(seconds >= BUDGET for seconds in full)
+            verdict = "within" if percentile(full, 0.99) < BUDGET else "OVER"
+            print(f"{'':>8} p99 {verdict} the {BUDGET * 1000:.0f} ms budget; {slow} of {len(full)} "
+                  f"{MAX_ROLLBACK}-frame rollbacks over it (the slowest are at the scheduler's mercy)")
+
+    # Moving platforms have to roll back with the players, or peers carry them from the wrong place
+    expected = reference(inputs, MOVERS_LEVEL_PATH)
+    print()
+    print(f"{MOVERS_LEVEL_PATH} (moving and crumbling platforms):")
+    print(f"{'latency':>8} {'jitter':>7} {'rollbacks':>10} {'in sync':>8}")
+    for latency, jitter in ((0, 0), (MAX_ROLLBACK, 0), (5, 3)):
+        sessions, _ = run_match(inputs, latency, jitter, MOVERS_LEVEL_PATH)
+        in_sync = all(final_state(session.worlds) == expected for session in sessions)
+        print(f"{latency:>8} {jitter:>7} {sum(s.rollbacks for s in sessions):>10} {'yes' if in_sync else 'NO':>8}")
+        assert in_sync, f"peers on {MOVERS_LEVEL_PATH} desynced from the reference run at latency {latency}"
+
+    # Snapshot format
+    worlds = make_worlds()
+    ring = SnapshotRing(FRAMES, worlds)
+    for frame in range(FRAMES):
+        ring.save(frame, worlds)
+        for player, world in enumerate(worlds):
+            world.tick(UNPACKED[inputs[player][frame]])
+    snapshots = [ring.get(frame) for frame in range(FRAMES)]
+
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        ring.save(frame, worlds)
+    save_us = (time.perf_counter() - start) / FRAMES * 1e6
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        ring.load(frame, worlds)
+    load_us = (time.perf_counter() - start) / FRAMES * 1e6
+
+    print()
+    print(f"snapshot of {PLAYERS} players: {ring.size} bytes, saved in {save_us:.1f} us, restored in {load_us:.1f} us")
+    for apart in (1, MAX_ROLLBACK, 60):
+        start = time.perf_counter()
+        deltas = [encode_delta(snapshots[frame - apart], snapshots[frame]) for frame in range(apart, FRAMES)]
+        encode_us = (time.perf_counter() - start) / len(deltas) * 1e6
+        assert all(decode_delta(snapshots[frame - apart], delta) == snapshots[frame]
+                   for frame, delta in zip(range(apart, FRAMES), deltas))
+        average = sum(map(len, deltas)) / len(deltas)
+        print(f"  delta against {apart:>2} frame(s) earlier: {average:5.1f} bytes on average "
+              f"({average / ring.size:.0%}), encoded in {encode_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
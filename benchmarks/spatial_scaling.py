@@ -0,0 +1,61 @@
+"""
+Per-frame collision query time as the level grows from 10 to 100k platforms.
+
+Platforms are scattered at a constant density, so a bigger level is a wider level,
+the way real levels grow. Each "frame" makes the two move_box calls World.tick
+makes (horizontal then vertical).
+
+Run from the repo root with: python -m benchmarks.spatial_scaling
+"""
+import random
+import time
+
+import pygame
+from collisions import collide_box, move_box
+from spatial import SpatialGrid
+
+PLAYER_WIDTH = 7
+PLAYER_HEIGHT = 50
+FRAMES = 2000
+LINEAR_SCAN_LIMIT = 10000  # Above this the brute-force scan takes too long to be worth timing
+
+
+def make_level(count, seed=1):
+    rng = random.Random(seed)
+    level_width = count * 150  # About one platform every 150 px, like the current level
+    return [pygame.Rect(rng.randrange(level_width), rng.randrange(100, 600), rng.randrange(20, 200), rng.randrange(10, 80))
+            for _ in range(count)]
+
+
+def linear_check(player_x, player_y, player_width, player_height, move_x, move_y, platforms):
+    return not collide_box(player_x + move_x, player_y + move_y, player_width, player_height, platforms)
+
+
+def time_frames(check, level, level_width, seed=2):
+    rng = random.Random(seed)
+    positions = [(rng.uniform(0, level_width), rng.uniform(0, 550)) for _ in range(FRAMES)]
+    start = time.perf_counter()
+    for x, y in positions:
+        check(x, y, PLAYER_WIDTH, PLAYER_HEIGHT, 5, 0, level)
+        check(x, y, PLAYER_WIDTH, PLAYER_HEIGHT, 0, 10, level)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    print(f"{'platforms':>10} {'build (ms)':>11} {'grid (us/frame)':>16} {'scan (us/frame)':>16}")
+    for count in (10, 100, 1000, 10000, 100000):
+        platforms = make_level(count)
+        start = time.perf_counter()
+        grid = SpatialGrid(platforms)
+        build_time = time.perf_counter() - start
+
+        grid_time = time_frames(move_box, grid, count * 150)
+        if count <= LINEAR_SCAN_LIMIT:
+            scan = f"{time_frames(linear_check, platforms, count * 150) * 1e6:16.2f}"
+        else:
+            scan = f"{'-':>16}"
+        print(f"{count:>10} {build_time * 1e3:>11.2f} {grid_time * 1e6:>16.2f} {scan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Startup time: process start to first frame, and what warming the pose cache takes off the first frames.
+
+Each command is run as a fresh process with the SDL dummy video driver. The game
+runs with --frames 1, so its time is from spawning the process to exiting right
+after the first frame is presented, which bounds the time to first frame from
+above. The bare interpreter and a plain pygame import are timed the same way,
+to show how much of that is outside the game's control.
+
+The second part times the first walk cycle (one new pose per frame) with a cold
+pose cache against one that adopted a background-warmed cache.
+
+Run from the repo root with: python -m benchmarks.startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import pygame
+from player import PoseCache, WALK_CYCLE_FRAMES
+
+RUNS = 7
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_process(arguments):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=GAME_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+
+def time_walk_cycle(screen, cache):
+    frame_times = []
+    for frame in range(WALK_CYCLE_FRAMES):
+        start = time.perf_counter()
+        cache.draw(screen, 300, 300, 7, 50, frame, False, True)
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return sum(frame_times), max(frame_times)
+
+
+def main():
+    print(f"{'to first frame':<36} {'min ms':>7} {'median ms':>10}")
+    for label, arguments in (("python (bare interpreter)", ["-c", "pass"]),
+                             ("python -c 'import pygame'", ["-c", "import pygame"]),
+                             ("+ pygame.init()", ["-c", "import pygame; pygame.init()"]),
+                             ("+ pygame.display.init()", ["-c", "import pygame; pygame.display.init()"]),
+                             ("main.py --frames 1", ["main.py", "--frames", "1"])):
+        fastest, median = time_process(arguments)
+        print(f"{label:<36} {fastest:>7.1f} {median:>10.1f}")
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen = pygame.display.set_mode((1400, 600))
+    cold_total, cold_worst = time_walk_cycle(screen, PoseCache())
+
+    warmed = PoseCache()
+    start = time.perf_counter()
+    warmed.prerender(screen, 7, 50)
+    warm_up_ms = (time.perf_counter() - start) * 1000
+    cache = PoseCache()
+    cache.adopt(warmed)
+    warm_total, warm_worst = time_walk_cycle(screen, cache)
+    print()
+    print(f"first walk cycle, cold pose cache:   {cold_total:6.2f} ms in all, worst frame {cold_worst:.3f} ms")
+    print(f"first walk cycle, warmed pose cache: {warm_total:6.2f} ms in all, worst frame {warm_worst:.3f} ms "
+          f"({warm_up_ms:.1f} ms of rendering moved to the warm-up thread)")
+
+
+if __name__ == "__main__":
+    main()
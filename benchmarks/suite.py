@@ -0,0 +1,368 @@
+"""
+The benchmark suite: the game's hot paths timed the same way every run, saved as JSON baselines.
+
+It runs headless on SDL's dummy video driver, so it needs no display or GPU and
+can run on CI. The cases:
+
+- move_box/<size>/<where>: the horizontal and vertical moves of one
+  tick for player boxes from the stick figure up to 200x120, in open air,
+  standing on a platform and in a dense cluster of platforms.
+- draw_player/<state>: one figure drawn walking, idle and mid-roll the way
+  main.py draws it (pose cache, roll keyframes), and walking drawn line by line.
+- roll_update/cycle: RollState.update over one whole roll and its cooldown.
+- main_loop/<n>_platforms: frames of the game loop (simulation tick, camera,
+  background rebakes, dirty-rect drawing and display update) on synthetic
+  levels of 100 to 10,000 platforms.
+
+Every case is deterministic: fixed levels, seeded inputs, and stateful cases
+start over from the same state each call. Each is timed in REPEATS runs of
+enough calls to last MIN_RUN_SECONDS, spread over the whole suite and with
+the garbage collector off (as timeit does). The best run is what gets
+compared: load on the machine only ever adds time, so the best is what
+reproduces. The median is saved too.
+
+A saved file holds the timings plus the Python, pygame and machine they came
+from. compare times the suite again (or reads a second file) and flags every
+case more than --threshold slower than the baseline, exiting with status 1 if
+any are, so a CI job fails on a regression. A case flagged while timing is
+timed again first, and only counts if it is still slow. Baselines only mean
+something on the machine they were made on; compare says so when the machines
+differ.
+
+Run from the repo root with:
+    python -m benchmarks.suite run [--save FILE] [--only TEXT]
+    python -m benchmarks.suite compare BASELINE [CURRENT] [--threshold 0.15] [--only TEXT]
+"""
+import argparse
+import copy
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from batch import random_inputs
+from camera import Camera
+from collisions import move_box
+from player import draw_player, player_bounds
+from renderer import DirtyRectRenderer
+from replay import UNPACKED
+from specialmoves import RollState
+from world import World, TICK_DT
+
+FORMAT = 1  # Version of the saved JSON layout
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REPEATS = 7
+MIN_RUN_SECONDS = 0.05
+THRESHOLD = 0.15  # Fraction slower than the baseline that counts as a regression (runs vary by up to ~10%)
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 600
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+PLAYER_SIZES = {"7x50": (7, 50), "40x40": (40, 40), "200x120": (200, 120)}
+LEVEL_SIZES = (100, 1000, 10000)
+LOOP_FRAMES = 120  # Frames per main_loop call, from the level's start each time
+
+
+def make_level(count, seed=1):
+    """Platforms scattered at a constant density, so a bigger level is a wider one"""
+    rng = random.Random(seed)
+    level_width = count * 150
+    return [pygame.Rect(rng.randrange(level_width), rng.randrange(100, 550), rng.randrange(20, 200),
+                        rng.randrange(10, 80)) for _ in range(count)]
+
+
+def collision_cases():
+    platforms = make_level(1000)
+    # A landing spot with nothing else near it, and a tight cluster of small platforms
+    platforms.append(pygame.Rect(-3000, 400, 300, 20))
+    rng = random.Random(2)
+    platforms += [pygame.Rect(-6000 + rng.randrange(0, 300), 100 + rng.randrange(0, 300), 24, 12) for _ in range(60)]
+    world = World(platforms, 0, 0, 10 ** 6)
+    level = world.level
+
+    for label, (width, height) in PLAYER_SIZES.items():
+        positions = {
+            "open_air": (-9000, -500),
+            "on_platform": (-2900, 400 - height),
+            "cluster": (-5900, 150),
+        }
+        for where, (x, y) in positions.items():
+            def tick_moves(x=x, y=y, width=width, height=height):
+                move_box(x, y, width, height, 5, 0, level)
+                move_box(x, y, width, height, 0, 0.8, level)
+            yield f"move_box/{label}/{where}", tick_moves
+
+
+def roll_states():
+    """A RollState at every tick of one roll, from the start to the last rolling tick"""
+    roll = RollState()
+    roll.start_roll(False)
+    states = []
+    while roll.is_rolling:
+        states.append(copy.copy(roll))
+        roll.update()
+    return states
+
+
+def draw_cases(screen):
+    width, height = 7, 50
+    x, y = 700, 300
+    ticks = itertools.count()
+
+    def walking():
+        draw_player(screen, x, y, height, 0, False, width, next(ticks), True, True)
+
+    def idle():
+        draw_player(screen, x, y, height, 0, False, width, next(ticks), False, True)
+
+    states = itertools.cycle(roll_states())
+
+    def rolling():
+        draw_player(screen, x, y, height, 0, False, width, 0, False, True, next(states))
+
+    def walking_uncached():
+        draw_player(screen, x, y, height, 0, False, width, next(ticks), True, True, pose_cache=None)
+
+    return [("draw_player/walking", walking), ("draw_player/idle", idle), ("draw_player/rolling", rolling),
+            ("draw_player/walking_uncached", walking_uncached)]
+
+
+def roll_cases():
+    roll = RollState()
+
+    def cycle():
+        roll.start_roll(False)
+        while roll.is_rolling or roll.cooldown_timer:
+            roll.update()
+
+    return [("roll_update/cycle", cycle)]
+
+
+def main_loop_cases(screen):
+    inputs = [UNPACKED[bits] for bits in random_inputs(LOOP_FRAMES)]
+    for count in LEVEL_SIZES:
+        world = World(make_level(count), 50, 0, 520)
+        camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, min_x=0, min_y=0, max_y=0)
+        renderer = DirtyRectRenderer(screen, WHITE, camera.visible(world.level), BLACK, camera.offset())
+
+        def frames(world=world, camera=camera, renderer=renderer):
+            # Back to the start, so every call plays the same frames
+            player = world.player
+            player.reset(world.start_x, world.start_y)
+            world.time = 0
+            camera.x = camera.y = camera.target_x = camera.target_y = 0
+            view_offset = None
+            for tick_inputs in inputs:
+                world.tick(tick_inputs)
+                camera.follow(player.x, player.y, TICK_DT)
+                if camera.offset() != view_offset:
+                    view_offset = camera.offset()
+                    renderer.set_level(camera.visible(world.level), view_offset)
+                renderer.begin_frame()
+                screen_x, screen_y = camera.world_to_screen(player.x, player.y)
+                draw_player(screen, screen_x, screen_y, player.height, 0, player.is_walking_left, player.width,
+                            world.time, player.is_walking_right, player.on_ground, player.roll_state)
+                renderer.mark_dirty(player_bounds(screen_x, screen_y, player.width, player.height))
+                renderer.end_frame()
+
+        yield f"main_loop/{count}_platforms", frames, LOOP_FRAMES
+
+
+def cases():
+    """(name, function to time, how many operations one call does) for every case"""
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for name, function in itertools.chain(collision_cases(), draw_cases(screen), roll_cases()):
+        yield name, function, 1
+    yield from main_loop_cases(screen)
+
+
+def calls_per_run(function):
+    """How many calls of function take at least MIN_RUN_SECONDS, after a warm-up call"""
+    function()  # Caches filled, first-call costs paid
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        if time.perf_counter() - start >= MIN_RUN_SECONDS:
+            return number
+        number *= 2
+
+
+def time_run(function, number):
+    """Seconds per call over one run of number calls"""
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return (time.perf_counter() - start) / number
+
+
+def machine():
+    """What the timings were taken on"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run_suite(only=None, verbose=True, names=None):
+    """
+    Time every case (or those whose name contains only, or is in names).
+
+    The repeats are interleaved: each round runs every case once, so a burst of
+    load on the machine (they can last seconds) spoils one run of several cases
+    rather than every run of one.
+
+    Returns:
+        dict: The suite's results, in the layout saved as a baseline.
+    """
+    pygame.display.init()
+    selected = [(name, function, operations, calls_per_run(function))
+                for name, function, operations in cases()
+                if (not only or only in name) and (names is None or name in names)]
+    runs = {name: [] for name, _, _, _ in selected}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(REPEATS):
+            for name, function, operations, number in selected:
+                runs[name].append(time_run(function, number) / operations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    results = {}
+    if verbose:
+        print(f"{'case':<40} {'best us/op':>11} {'median us/op':>13} {'calls/run':>10}")
+    for name, _, operations, number in selected:
+        best = min(runs[name])
+        median = statistics.median(runs[name])
+        results[name] = {"best": best, "median": median, "calls": number, "operations": operations}
+        if verbose:
+            print(f"{name:<40} {best * 1e6:>11.2f} {median * 1e6:>13.2f} {number:>10}")
+    return {"format": FORMAT, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine(),
+            "repeats": REPEATS, "results": results}
+
+
+def load(path):
+    with open(path) as file:
+        suite = json.load(file)
+    if suite.get("format") != FORMAT:
+        raise ValueError(f"{path} is suite format {suite.get('format')}, this is format {FORMAT}")
+    return suite
+
+
+def save(suite, path):
+    with open(path, "w") as file:
+        json.dump(suite, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Compare two suite results case by case.
+
+    Returns:
+        list[tuple]: (name, baseline seconds, current seconds, verdict) with verdict one of
+        "REGRESSION", "faster", "ok", "new" (no baseline) or "missing" (not timed now).
+    """
+    rows = []
+    before = baseline["results"]
+    after = current["results"]
+    for name in sorted(before.keys() | after.keys()):
+        if name not in before:
+            rows.append((name, None, after[name]["best"], "new"))
+        elif name not in after:
+            rows.append((name, before[name]["best"], None, "missing"))
+        else:
+            old = before[name]["best"]
+            new = after[name]["best"]
+            if new > old * (1 + threshold):
+                verdict = "REGRESSION"
+            elif new < old * (1 - threshold):
+                verdict = "faster"
+            else:
+                verdict = "ok"
+            rows.append((name, old, new, verdict))
+    return rows
+
+
+def print_comparison(baseline, current, rows, threshold):
+    if baseline["machine"] != current["machine"]:
+        print("note: the baseline was timed on a different machine or setup, so differences may not be regressions")
+        for key in sorted(baseline["machine"].keys() | current["machine"].keys()):
+            if baseline["machine"].get(key) != current["machine"].get(key):
+                print(f"  {key}: {baseline['machine'].get(key)} -> {current['machine'].get(key)}")
+    print(f"{'case':<40} {'baseline us':>12} {'now us':>10} {'change':>8}  verdict (threshold {threshold:.0%})")
+    for name, old, new, verdict in rows:
+        old_text = f"{old * 1e6:.2f}" if old is not None else "-"
+        new_text = f"{new * 1e6:.2f}" if new is not None else "-"
+        change = f"{new / old - 1:+.1%}" if old is not None and new is not None else "-"
+        print(f"{name:<40} {old_text:>12} {new_text:>10} {change:>8}  {verdict}")
+    regressions = sum(verdict == "REGRESSION" for _, _, _, verdict in rows)
+    print(f"{regressions} regression(s) in {len(rows)} cases")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Molasses Mike benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time the suite")
+    run_parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    run_parser.add_argument("--only", metavar="TEXT", help="only the cases whose name contains TEXT")
+    compare_parser = commands.add_parser("compare", help="time the suite (or read CURRENT) and compare with BASELINE")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE_PATH,
+                                help="saved results to compare with (default: benchmarks/baseline.json)")
+    compare_parser.add_argument("current", nargs="?", help="saved results to compare instead of timing now")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                                help=f"fraction slower that counts as a regression (default {THRESHOLD})")
+    compare_parser.add_argument("--only", metavar="TEXT", help="only the cases whose name contains TEXT")
+    compare_parser.add_argument("--save", metavar="FILE", help="also save this run's results")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        suite = run_suite(args.only)
+        if args.save:
+            save(suite, args.save)
+            print(f"saved to {args.save}")
+        return
+
+    baseline = load(args.baseline)
+    if args.only:
+        baseline["results"] = {name: result for name, result in baseline["results"].items() if args.only in name}
+    if args.current:
+        current = load(args.current)
+        if args.only:
+            current["results"] = {name: result for name, result in current["results"].items() if args.only in name}
+        rows = compare(baseline, current, args.threshold)
+    else:
+        current = run_suite(args.only, verbose=False)
+        rows = compare(baseline, current, args.threshold)
+        # A regression has to show up twice: the flagged cases are timed again and keep their better timing,
+        # so one long burst of load on the machine doesn't fail the comparison
+        flagged = {name for name, _, _, verdict in rows if verdict == "REGRESSION"}
+        if flagged:
+            for name, result in run_suite(verbose=False, names=flagged)["results"].items():
+                if result["best"] < current["results"][name]["best"]:
+                    current["results"][name] = result
+            rows = compare(baseline, current, args.threshold)
+        if args.save:
+            save(current, args.save)
+    if print_comparison(baseline, current, rows, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Fast bodies against thin platforms: final-position test vs sub-stepping vs one swept query.
+
+A 7x50 box falls or rolls through a 4 px thick platform at increasing speeds.
+The final-position test tunnels once the move is longer than the box plus the
+platform; sub-stepping in 4 px steps catches every hit but costs a test per
+step; sweep_box catches every hit in one query.
+
+Run from the repo root with: python -m benchmarks.swept_collision
+"""
+import math
+import random
+import time
+
+import pygame
+from collisions import collide_box, sweep_box
+
+PLAYER_WIDTH = 7
+PLAYER_HEIGHT = 50
+THICKNESS = 4
+QUERIES = 2000
+
+
+def final_only(left, top, move_x, move_y, shapes):
+    return bool(collide_box(left + move_x, top + move_y, PLAYER_WIDTH, PLAYER_HEIGHT, shapes))
+
+
+def sub_stepped(left, top, move_x, move_y, shapes):
+    steps = max(1, math.ceil(max(abs(move_x), abs(move_y)) / THICKNESS))
+    for step in range(1, steps + 1):
+        t = step / steps
+        if collide_box(left + move_x * t, top + move_y * t, PLAYER_WIDTH, PLAYER_HEIGHT, shapes):
+            return True
+    return False
+
+
+def swept(left, top, move_x, move_y, shapes):
+    return sweep_box(left, top, PLAYER_WIDTH, PLAYER_HEIGHT, move_x, move_y, shapes) is not None
+
+
+def make_queries(speed, rng):
+    """Moves that all cross a thin platform somewhere along the way"""
+    queries = []
+    for i in range(QUERIES):
+        if i % 2:
+            # Falling through a thin floor
+            floor = pygame.Rect(0, 500, 100, THICKNESS)
+            top = 500 - PLAYER_HEIGHT - rng.uniform(0, speed - PLAYER_HEIGHT - THICKNESS) if speed > 60 else 450 - rng.uniform(0, speed / 2)
+            queries.append((rng.uniform(10, 80), top, 0, speed, [floor]))
+        else:
+            # Rolling through a thin wall
+            wall = pygame.Rect(500, 0, THICKNESS, 600)
+            left = 500 - PLAYER_WIDTH - rng.uniform(0, max(0, speed - PLAYER_WIDTH - THICKNESS))
+            queries.append((left, rng.uniform(100, 400), speed, 0, [wall]))
+    return queries
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'speed':>6} | {'final-only us':>13} {'missed':>7} | {'sub-step us':>11} {'missed':>7} | "
+          f"{'swept us':>9} {'missed':>7}")
+    for speed in (13, 30, 60, 120, 240, 480):
+        queries = make_queries(speed, rng)
+        row = [f"{speed:>6}"]
+        for check in (final_only, sub_stepped, swept):
+            start = time.perf_counter()
+            missed = sum(not check(*query) for query in queries)
+            per_query = (time.perf_counter() - start) / QUERIES
+            row.append(f"{per_query * 1e6:>{13 if check is final_only else 11 if check is sub_stepped else 9}.2f} "
+                       f"{missed:>7}")
+        print(" | ".join(row))
+
+
+if __name__ == "__main__":
+    main()
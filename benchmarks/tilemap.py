@@ -0,0 +1,113 @@
+"""
+Tile map drawing from baked chunks vs one draw call per tile, and tile-grid collision queries.
+
+The view scrolls across a large random tile map. Chunked drawing is timed once
+every chunk on the path is baked, then again with a tile edited every frame so
+a chunk is rebaked each time. Collision queries use move_box with the
+TileMap as the level, on maps of growing size, to show the cost doesn't grow.
+
+Run from the repo root with: python -m benchmarks.tilemap
+"""
+import random
+import time
+
+import pygame
+from collisions import collide_box, move_box
+from spatial import SpatialGrid
+from tilemap import TileMap, TileRenderer
+
+VIEW_SIZE = (1400, 600)
+TILE_SIZE = 32
+MAP_HEIGHT = 40
+FRAMES = 200
+QUERIES = 20000
+TILESET = {1: (0, 0, 0), 2: (90, 60, 30), 3: (40, 120, 40)}
+
+
+def make_map(width, rng):
+    tilemap = TileMap(width, MAP_HEIGHT, TILE_SIZE)
+    for column in range(width):
+        ground = rng.randrange(MAP_HEIGHT // 2, MAP_HEIGHT)
+        tilemap.fill(column, ground, 1, MAP_HEIGHT - ground, rng.choice((1, 2)))
+        if rng.random() < 0.2:
+            tilemap.set(column, rng.randrange(MAP_HEIGHT // 2), 3)
+    tilemap.changed.clear()
+    return tilemap
+
+
+def draw_per_tile(surface, tilemap, offset):
+    first_x, first_y = tilemap.tile_at(*offset)
+    for row in range(max(0, first_y), min(tilemap.height, first_y + VIEW_SIZE[1] // TILE_SIZE + 2)):
+        for column in range(max(0, first_x), min(tilemap.width, first_x + VIEW_SIZE[0] // TILE_SIZE + 2)):
+            tile = tilemap.tiles[row * tilemap.width + column]
+            if tile:
+                pygame.draw.rect(surface, TILESET[tile], tilemap.tile_rect(column, row).move(-offset[0], -offset[1]))
+
+
+def time_drawing(tilemap, rng):
+    surface = pygame.Surface(VIEW_SIZE)
+    renderer = TileRenderer(tilemap, TILESET)
+    offsets = [(frame * 7, 300) for frame in range(FRAMES)]
+    for offset in offsets:  # Bake every chunk on the path first
+        renderer.draw(surface, offset)
+
+    start = time.perf_counter()
+    for offset in offsets:
+        draw_per_tile(surface, tilemap, offset)
+    per_tile = (time.perf_counter() - start) / FRAMES * 1e3
+
+    blits = 0
+    start = time.perf_counter()
+    for offset in offsets:
+        blits += renderer.draw(surface, offset)
+    chunked = (time.perf_counter() - start) / FRAMES * 1e3
+
+    bakes = renderer.bakes
+    start = time.perf_counter()
+    for offset in offsets:
+        tilemap.set(*tilemap.tile_at(offset[0] + 700, offset[1] + 300), rng.choice((0, 3)))
+        renderer.draw(surface, offset)
+    edited = (time.perf_counter() - start) / FRAMES * 1e3
+    return per_tile, chunked, blits / FRAMES, edited, (renderer.bakes - bakes) / FRAMES
+
+
+def time_collision(tilemap, rng):
+    # Boxes start in open space, as the player does between ticks (inside a clump of tiles, which one
+    # pushes a box out first depends on the order they come back in)
+    boxes = []
+    while len(boxes) < QUERIES:
+        x, y = rng.uniform(0, tilemap.width * TILE_SIZE), rng.uniform(0, MAP_HEIGHT * TILE_SIZE)
+        move_x, move_y = rng.uniform(-8, 8), rng.uniform(-15, 15)
+        if not collide_box(x, y, 7, 50, tilemap.query_box(x, y, 7, 50)):
+            boxes.append((x, y, move_x, move_y))
+    start = time.perf_counter()
+    tile_results = [move_box(x, y, 7, 50, move_x, move_y, tilemap)[:2] for x, y, move_x, move_y in boxes]
+    tile_time = (time.perf_counter() - start) / QUERIES * 1e6
+
+    # The same solid tiles as individual rects in a SpatialGrid move the boxes to the same places
+    grid = SpatialGrid(tilemap.query_box(0, 0, tilemap.width * TILE_SIZE, MAP_HEIGHT * TILE_SIZE))
+    start = time.perf_counter()
+    grid_results = [move_box(x, y, 7, 50, move_x, move_y, grid)[:2] for x, y, move_x, move_y in boxes]
+    grid_time = (time.perf_counter() - start) / QUERIES * 1e6
+    assert tile_results == grid_results
+    return tile_time, grid_time
+
+
+def main():
+    rng = random.Random(1)
+    tilemap = make_map(2000, rng)
+    per_tile, chunked, blits, edited, rebakes = time_drawing(tilemap, rng)
+    print(f"{'drawing':<28} {'ms/frame':>9}")
+    print(f"{'draw.rect per tile':<28} {per_tile:>9.3f}")
+    print(f"{'baked chunks':<28} {chunked:>9.3f}   ({blits:.1f} blits/frame)")
+    print(f"{'baked chunks, tile edits':<28} {edited:>9.3f}   ({rebakes:.2f} rebakes/frame)")
+
+    print()
+    print(f"{'map tiles':>10} {'tilemap us':>11} {'grid us':>8}")
+    for width in (100, 1000, 10000):
+        tile_time, grid_time = time_collision(make_map(width, rng), rng)
+        print(f"{width * MAP_HEIGHT:>10} {tile_time:>11.2f} {grid_time:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
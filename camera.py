@@ -0,0 +1,95 @@
+import pygame
+
+
+class Camera:
+    """
+    A view onto the world that smoothly follows a target.
+
+    World coordinates are where things are in the level; screen coordinates are
+    world coordinates minus the camera position. The camera only starts moving once
+    the target leaves a dead zone in the middle of the view, so standing around (or
+    pacing a little) keeps the view still.
+
+    Args:
+        view_width (int): Width of the view in pixels.
+        view_height (int): Height of the view in pixels.
+        smoothing (float): Fraction of the remaining distance covered per 60 Hz frame (1 snaps straight there).
+        deadzone_width (int): Width of the middle area the target can move in without scrolling.
+        deadzone_height (int): Height of that area.
+        min_x, max_x, min_y, max_y (float or None): Limits for the camera's top-left corner, None for no limit.
+    """
+    def __init__(self, view_width, view_height, smoothing=0.15, deadzone_width=200, deadzone_height=150,
+                 min_x=None, max_x=None, min_y=None, max_y=None):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.smoothing = smoothing
+        self.deadzone_width = deadzone_width
+        self.deadzone_height = deadzone_height
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self.x = self._clamp(0, min_x, max_x)  # World position of the top-left of the view
+        self.y = self._clamp(0, min_y, max_y)
+        self.target_x = self.x
+        self.target_y = self.y
+
+    @staticmethod
+    def _clamp(value, low, high):
+        if low is not None and value < low:
+            return low
+        if high is not None and value > high:
+            return high
+        return value
+
+    def _deadzone_target(self, current, target, view_size, deadzone_size):
+        # Where the camera has to be for the target to sit just inside the dead zone
+        zone_start = current + (view_size - deadzone_size) / 2
+        if target < zone_start:
+            return current - (zone_start - target)
+        if target > zone_start + deadzone_size:
+            return current + (target - zone_start - deadzone_size)
+        return current
+
+    def follow(self, target_x, target_y, dt):
+        """
+        Move towards keeping a world position inside the dead zone.
+
+        Args:
+            target_x (float): World x to follow (usually the player).
+            target_y (float): World y to follow.
+            dt (float): Seconds since the last call, so smoothing doesn't depend on frame rate.
+        """
+        self.target_x = self._clamp(self._deadzone_target(self.target_x, target_x, self.view_width, self.deadzone_width),
+                                    self.min_x, self.max_x)
+        self.target_y = self._clamp(self._deadzone_target(self.target_y, target_y, self.view_height,
+                                                          self.deadzone_height), self.min_y, self.max_y)
+        blend = 1 - (1 - self.smoothing) ** (dt * 60)
+        self.x += (self.target_x - self.x) * blend
+        self.y += (self.target_y - self.y) * blend
+
+    def snap(self, target_x, target_y):
+        """Jump straight to centring a world position, e.g. after a restart"""
+        self.x = self.target_x = self._clamp(target_x - self.view_width / 2, self.min_x, self.max_x)
+        self.y = self.target_y = self._clamp(target_y - self.view_height / 2, self.min_y, self.max_y)
+
+    def offset(self):
+        """The camera position rounded to whole pixels, which is what drawing should use"""
+        return round(self.x), round(self.y)
+
+    def view_rect(self):
+        """The part of the world the view shows, in world coordinates"""
+        offset_x, offset_y = self.offset()
+        return pygame.Rect(offset_x, offset_y, self.view_width, self.view_height)
+
+    def world_to_screen(self, x, y):
+        offset_x, offset_y = self.offset()
+        return x - offset_x, y - offset_y
+
+    def screen_to_world(self, x, y):
+        offset_x, offset_y = self.offset()
+        return x + offset_x, y + offset_y
+
+    def visible(self, grid):
+        """Platforms in a SpatialGrid that overlap the view"""
+        return grid.query_box(*self.view_rect())
@@ -1,42 +1,254 @@
+import math
 import pygame
 
-def check_collision(player_x, player_y, player_width, player_height, move_x, move_y, screen):
+
+class Contact:
+    """
+    A single overlap between a box and a piece of level geometry.
+
+    Attributes:
+        shape: The platform (pygame.Rect or Slope) that was hit.
+        normal_x (float): X part of the unit normal, pointing out of the shape towards the box.
+        normal_y (float): Y part of the unit normal (negative means "push up").
+        depth (float): How far the box has to move along the normal to stop overlapping.
+    """
+    def __init__(self, shape, normal_x, normal_y, depth):
+        self.shape = shape
+        self.normal_x = normal_x
+        self.normal_y = normal_y
+        self.depth = depth
+
+    def __repr__(self):
+        return f"Contact({self.shape}, normal=({self.normal_x:.2f}, {self.normal_y:.2f}), depth={self.depth:.2f})"
+
+
+class Slope:
+    """
+    A ramp that fills the lower-left or lower-right triangle of its rect.
+
+    Args:
+        x (int): Left edge of the slope's bounding box.
+        y (int): Top edge of the slope's bounding box.
+        width (int): Width of the bounding box.
+        height (int): Height of the bounding box.
+        rising_right (bool): True if the floor goes up towards the right.
+    """
+    def __init__(self, x, y, width, height, rising_right=True):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.rising_right = rising_right
+
+        # Unit normal of the ramp surface, pointing out of the solid part
+        length = math.hypot(width, height)
+        direction = -1 if rising_right else 1
+        self.normal_x = direction * height / length
+        self.normal_y = -width / length
+
+    def surface_y(self, x):
+        """Y of the ramp surface at world x, clamped to the slope's extent"""
+        t = (min(max(x, self.rect.left), self.rect.right) - self.rect.left) / self.rect.width
+        if not self.rising_right:
+            t = 1 - t
+        return self.rect.bottom - t * self.rect.height
+
+
+def _box_vs_rect(rect, left, top, right, bottom):
+    if left >= rect.right or right <= rect.left or top >= rect.bottom or bottom <= rect.top:
+        return None
+
+    # Push the box out along whichever axis needs the smallest move
+    pushes = (
+        (bottom - rect.top, 0, -1),    # out through the top
+        (rect.bottom - top, 0, 1),     # out through the bottom
+        (right - rect.left, -1, 0),    # out through the left side
+        (rect.right - left, 1, 0),     # out through the right side
+    )
+    depth, normal_x, normal_y = min(pushes)
+    return Contact(rect, normal_x, normal_y, depth)
+
+
+def _box_vs_slope(slope, left, top, right, bottom):
+    rect = slope.rect
+    if left >= rect.right or right <= rect.left or top >= rect.bottom or bottom <= rect.top:
+        return None
+
+    # The bottom corner on the high side of the ramp is the one that digs in deepest
+    corner_x = right if slope.rising_right else left
+    sink = bottom - slope.surface_y(corner_x)
+    if sink <= 0:
+        return None
+
+    # Convert the vertical sink into a distance along the surface normal
+    return Contact(slope, slope.normal_x, slope.normal_y, sink * -slope.normal_y)
+
+
+def collide_box(left, top, width, height, shapes):
+    """
+    Find every piece of level geometry that overlaps a box.
+
+    Args:
+        left (float): Left edge of the box.
+        top (float): Top edge of the box.
+        width (float): Width of the box.
+        height (float): Height of the box.
+        shapes (iterable): pygame.Rect platforms and/or Slope objects to test against.
+
+    Returns:
+        list[Contact]: One contact per overlapping shape, empty if the box is free.
+    """
+    right = left + width
+    bottom = top + height
+    contacts = []
+    for shape in shapes:
+        if isinstance(shape, Slope):
+            contact = _box_vs_slope(shape, left, top, right, bottom)
+        else:
+            contact = _box_vs_rect(shape, left, top, right, bottom)
+        if contact is not None:
+            contacts.append(contact)
+    return contacts
+
+
+def _shape_axes_and_points(shape):
+    """Separating axes to test and the corner points of a shape"""
+    if isinstance(shape, Slope):
+        rect = shape.rect
+        high_x = rect.right if shape.rising_right else rect.left
+        points = ((rect.left, rect.bottom), (rect.right, rect.bottom), (high_x, rect.top))
+        return ((1, 0), (0, 1), (shape.normal_x, shape.normal_y)), points
+    return ((1, 0), (0, 1)), ((shape.left, shape.top), (shape.right, shape.bottom))
+
+
+def _axis_intervals(shape, left, top, right, bottom, move_x, move_y):
+    """(axis, box shadow, shape shadow, speed along the axis) for each separating axis of a shape"""
+    if not isinstance(shape, Slope):
+        # Plain rects only need the x and y axes, where the shadows are just the edges
+        return (((1, 0), left, right, shape.left, shape.right, move_x),
+                ((0, 1), top, bottom, shape.top, shape.bottom, move_y))
+
+    axes, points = _shape_axes_and_points(shape)
+    intervals = []
+    for axis_x, axis_y in axes:
+        box_min = axis_x * (left if axis_x >= 0 else right) + axis_y * (top if axis_y >= 0 else bottom)
+        box_max = axis_x * (right if axis_x >= 0 else left) + axis_y * (bottom if axis_y >= 0 else top)
+        projections = [axis_x * x + axis_y * y for x, y in points]
+        intervals.append(((axis_x, axis_y), box_min, box_max, min(projections), max(projections),
+                          axis_x * move_x + axis_y * move_y))
+    return intervals
+
+
+def _sweep_shape(shape, left, top, right, bottom, move_x, move_y):
+    # Separating axis test with motion: on every axis work out when the moving box's
+    # shadow starts and stops overlapping the shape's; they touch while all overlap
+    t_enter = -math.inf
+    t_exit = math.inf
+    hit_axis = None
+    hit_speed = 0
+    for axis, box_min, box_max, shape_min, shape_max, speed in _axis_intervals(shape, left, top, right, bottom,
+                                                                              move_x, move_y):
+
+        if speed == 0:
+            if box_max <= shape_min or box_min >= shape_max:
+                return None  # Separated along this axis for the whole move
+            continue
+        if speed > 0:
+            enter = (shape_min - box_max) / speed
+            exit_ = (shape_max - box_min) / speed
+        else:
+            enter = (shape_max - box_min) / speed
+            exit_ = (shape_min - box_max) / speed
+        if enter > t_enter:
+            t_enter = enter
+            hit_axis = axis
+            hit_speed = speed
+        t_exit = min(t_exit, exit_)
+
+    if t_enter >= t_exit or t_enter >= 1 or t_exit <= 0:
+        return None
+    if t_enter < 0:
+        # Already overlapping at the start: a move heading out of the shape (along the way it would be
+        # pushed out) is free, anything else stops straight away, so nothing can sink on through
+        contacts = collide_box(left, top, right - left, bottom - top, (shape,))
+        if not contacts:
+            return None
+        contact = contacts[0]
+        if move_x * contact.normal_x + move_y * contact.normal_y > 0:
+            return None
+        return 0.0, contact
+
+    # The normal is the axis the box hit last, pointing back against the motion
+    direction = -1 if hit_speed > 0 else 1
+    return t_enter, Contact(shape, hit_axis[0] * direction, hit_axis[1] * direction, 0.0)
+
+
+def sweep_box(left, top, width, height, move_x, move_y, shapes):
     """
-    Check for collisions between the player and the environment.
+    Find the first piece of level geometry a box hits while moving, in one query.
+
+    Unlike testing only where the box ends up, this can't miss a thin platform
+    the box would pass straight through in a single fast move.
 
     Args:
-        player_x (float): Player's current x position.
-        player_y (float): Player's current y position.
-        player_width (int): Player's width.
-        player_height (int): Player's height.
-        move_x (float): Horizontal movement to check.
-        move_y (float): Vertical movement to check.
-        screen (pygame.Surface): The game screen to check colors.
+        left (float): Left edge of the box before moving.
+        top (float): Top edge of the box before moving.
+        width (float): Width of the box.
+        height (float): Height of the box.
+        move_x (float): Horizontal movement.
+        move_y (float): Vertical movement.
+        shapes (iterable): pygame.Rect platforms and/or Slope objects to test against.
 
     Returns:
-        bool: True if movement is allowed, False if it would cause a collision.
-    """
-    # Check edges of the player after movement
-    new_left = player_x + move_x
-    new_right = player_x + player_width + move_x
-    new_top = player_y + move_y
-    new_bottom = player_y + player_height + move_y
-
-    # Check horizontal movement collision
-    for x in range(int(new_left), int(new_right) + 1, player_width // 2):  # Horizontal edge points
-        for y in range(int(new_top), int(new_bottom) + 1, player_height // 2):  # Vertical edge points
-            # Check if coordinates are within screen bounds
-            if 0 <= x < screen.get_width() and 0 <= y < screen.get_height():
-                color = screen.get_at((x, y))
-                if color == (0, 0, 0):  # Black indicates a collision
-                    # If moving down and collides with a platform (the player is falling)
-                    if move_y > 0 and y <= player_y + player_height:  # Standing on top of a platform
-                        player_y = y - player_height - 50  # Adjust position to just above the platform
-                        return False
-                    # If moving up and collides (hitting the ceiling)
-                    elif move_y < 0 and y >= player_y:  # Hitting the ceiling
-                        return False
-                    else:
-                        return False  # For left and right movement or invalid cases
-
-    return True
\ No newline at end of file
+        tuple[float, Contact] or None: Fraction of the move (0 to 1) at which the box first
+        touches something and the contact there, or None if the whole move is clear.
+    """
+    right = left + width
+    bottom = top + height
+    first = None
+    for shape in shapes:
+        hit = _sweep_shape(shape, left, top, right, bottom, move_x, move_y)
+        if hit is not None and (first is None or hit[0] < first[0]):
+            first = hit
+    return first
+
+
+def move_box(left, top, width, height, move_x, move_y, level, ignore=None):
+    """
+    Move a box as far as it can go before it hits level geometry.
+
+    The box stops where it first touches something, flush against it. A box that
+    starts inside a platform and isn't moving out of it is pushed out instead.
+
+    Args:
+        left (float): Left edge of the box before moving.
+        top (float): Top edge of the box before moving.
+        width (float): Width of the box.
+        height (float): Height of the box.
+        move_x (float): Horizontal movement.
+        move_y (float): Vertical movement.
+        level (SpatialGrid): The level's platforms; only the ones near the box are tested.
+        ignore: A platform to leave out, e.g. the moving one carrying the player.
+
+    Returns:
+        tuple: (left, top, contact): where the box ends up, and the Contact that stopped it (None if nothing did).
+    """
+    nearby = level.query_swept_box(left, top, width, height, move_x, move_y)
+    if ignore is not None:
+        nearby = [shape for shape in nearby if shape is not ignore]
+    hit = sweep_box(left, top, width, height, move_x, move_y, nearby)
+    if hit is None:
+        return left + move_x, top + move_y, None
+
+    t, contact = hit
+    shape = contact.shape
+    if isinstance(shape, Slope):
+        # Swept hits have no depth; a box that started inside goes out along the ramp's normal
+        return (left + move_x * t + contact.normal_x * contact.depth,
+                top + move_y * t + contact.normal_y * contact.depth, contact)
+    # Put the box exactly against the edge it hit (or was pushed out through), so rounding
+    # can't leave it a hair inside the platform
+    if contact.normal_y < 0:
+        return left + move_x * t, shape.top - height, contact
+    if contact.normal_y > 0:
+        return left + move_x * t, shape.bottom, contact
+    if contact.normal_x < 0:
+        return shape.left - width, top + move_y * t, contact
+    return shape.right, top + move_y * t, contact
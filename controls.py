@@ -0,0 +1,138 @@
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame
+from world import Inputs
+
+ACTIONS = ("left", "right", "jump", "roll", "restart")
+
+# Action -> pygame key names (see pygame.key.name); any of an action's keys works
+DEFAULT_BINDINGS = {
+    "left": ("left", "a"),
+    "right": ("right", "d"),
+    "jump": ("up", "w"),
+    "roll": ("space",),
+    "restart": ("r",),
+}
+
+
+def load_bindings(path):
+    """
+    Key bindings from a JSON file, on top of the defaults.
+
+    The file maps actions to lists of key names, e.g. {"jump": ["w", "up"], "roll": ["left shift"]}.
+    """
+    bindings = dict(DEFAULT_BINDINGS)
+    with open(path) as file:
+        for action, names in json.load(file).items():
+            if action not in ACTIONS:
+                raise ValueError(f"{path}: unknown action {action!r}, expected one of {', '.join(ACTIONS)}")
+            bindings[action] = tuple(names)
+    return bindings
+
+
+class InputBuffer:
+    """
+    Turns key events into the Inputs of each simulation tick.
+
+    Key presses and releases are queued with the time they were taken off pygame's
+    event queue, instead of polling which keys happen to be down when a frame
+    starts. Each tick takes the queued events in order, up to the first one that
+    would change an action it has already changed. A tap shorter than a frame is
+    therefore still held for one tick, and a release and re-press still reach the
+    simulation as a fresh press. Everything else arrives on the next tick that
+    runs, so input is never more than one tick late whatever the frame rate.
+
+    Args:
+        bindings (dict): Action -> key names, like DEFAULT_BINDINGS.
+    """
+    def __init__(self, bindings=DEFAULT_BINDINGS):
+        self.actions = {}  # pygame key code -> action
+        for action, names in bindings.items():
+            self.bind(action, *names)
+        self.events = deque()  # (timestamp, action, key, pressed) not yet seen by a tick
+        self.keys_down = {action: set() for action in ACTIONS}
+        self.held = dict.fromkeys(ACTIONS, False)  # Actions as the last tick saw them
+        self.unpresented = None  # Time of the oldest event the simulation has seen but the screen hasn't shown
+        self.inputs = Inputs()  # Refilled every tick rather than rebuilt, so a tick allocates nothing
+        self.changed = set()  # Actions the current tick has changed (kept to be cleared, not rebuilt)
+
+    def bind(self, action, *key_names):
+        """Make key_names (replacing the action's old keys) trigger action"""
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action {action!r}, expected one of {', '.join(ACTIONS)}")
+        self.actions = {key: bound for key, bound in self.actions.items() if bound != action}
+        for name in key_names:
+            self.actions[pygame.key.key_code(name)] = action
+
+    def handle_event(self, event, timestamp=None):
+        """
+        Queue a pygame event if it is a bound key going down or up.
+
+        Returns:
+            bool: True if the event was used.
+        """
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            action = self.actions.get(event.key)
+            if action is None:
+                return False
+            self.events.append((perf_counter() if timestamp is None else timestamp, action, event.key,
+                                event.type == pygame.KEYDOWN))
+            return True
+        if event.type == pygame.WINDOWFOCUSLOST:
+            # Releases that happen while another window has focus never arrive
+            now = perf_counter() if timestamp is None else timestamp
+            for action, keys in self.keys_down.items():
+                self.events.extend((now, action, key, False) for key in keys)
+        return False
+
+    def next_tick(self):
+        """
+        The Inputs for the next simulation tick (pass this function itself to World.step).
+
+        The same Inputs object is returned every tick with its buttons updated, so
+        copy it if it has to outlive the tick.
+        """
+        changed = self.changed
+        changed.clear()
+        events = self.events
+        while events:
+            timestamp, action, key, pressed = events[0]
+            keys = self.keys_down[action]
+            now_held = pressed or len(keys) > (key in keys)  # Held by this key or another one
+            if now_held != self.held[action]:
+                if action in changed:
+                    break  # Leave the second change of an action for the next tick, so this one sees the first
+                changed.add(action)
+            events.popleft()
+            if pressed:
+                keys.add(key)
+            else:
+                keys.discard(key)
+            self.held[action] = now_held
+            if self.unpresented is None:
+                self.unpresented = timestamp
+
+        held = self.held
+        inputs = self.inputs
+        inputs.left = held["left"]
+        inputs.right = held["right"]
+        inputs.jump = held["jump"]
+        inputs.roll = held["roll"]
+        inputs.restart = held["restart"]
+        return inputs
+
+    def presented(self, now=None):
+        """
+        Note that the latest frame is on screen.
+
+        Returns:
+            float or None: Seconds from the oldest input it shows to now (input-to-photon latency), None if it
+            shows no new input.
+        """
+        if self.unpresented is None:
+            return None
+        latency = (perf_counter() if now is None else now) - self.unpresented
+        self.unpresented = None
+        return latency
@@ -0,0 +1,101 @@
+import numpy as np
+
+from player import (LIMB_ANGLES, LIMBS, LOWER_LIMB_LENGTH, UPPER_LIMB_LENGTH, WALK_CYCLE_FRAMES, pose_scratch,
+                    render_pose)
+
+# player's rig as arrays: the LIMBS columns, and the LIMB_ANGLES rows indexed by facing + 1
+LIMB_START_X, LIMB_SIDE, LIMB_SWING_X, LIMB_SIGNAL = (np.array(column) for column in zip(*LIMBS))
+ANGLES = np.array([LIMB_ANGLES[facing] for facing in (-1, 0, 1)], dtype=np.float64)  # (facing, limb, angle term)
+
+
+def limb_endpoints(x, y, height, facing, time):
+    """
+    Forward kinematics of the rig for many stick figures at once.
+
+    The same sums as player.limb_segments in the same order, done across whole
+    columns of figures, so every figure gets the numbers the scalar version would.
+
+    Args:
+        x (np.ndarray): Figures' x positions.
+        y (np.ndarray): Figures' y positions.
+        height (np.ndarray): Body heights in whole pixels.
+        facing (np.ndarray): -1 walking left, 1 walking right or 0 standing still (see player.rig_facing).
+        time (np.ndarray): Ticks into the walk cycle.
+
+    Returns:
+        np.ndarray: Shape (figures, 4, 6): start x, start y, joint x, joint y, end x, end y of each limb in
+        player.LIMBS order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    facing = np.asarray(facing, dtype=np.intp)
+    cycle = np.asarray(time, dtype=np.float64) * 2 * np.pi / WALK_CYCLE_FRAMES
+    moving = facing != 0
+    signals = np.stack((np.where(moving, np.sin(cycle), 0.0), np.where(moving, np.sin(cycle + np.pi), 0.0)), axis=1)
+
+    phase = signals[:, LIMB_SIGNAL]  # (figures, limb)
+    angles = ANGLES[facing + 1]
+    upper_angle = np.radians(angles[..., 0] + angles[..., 1] * phase)
+    lower_angle = upper_angle + np.radians(angles[..., 2]) + angles[..., 3] * np.abs(phase) * np.pi / 6
+
+    segments = np.empty((len(x), len(LIMBS), 6))
+    root_y = y[:, None] + LIMB_SIDE * (np.asarray(height) // 2)[:, None]
+    segments[..., 0] = x[:, None] + LIMB_START_X
+    segments[..., 1] = root_y
+    segments[..., 2] = x[:, None] + LIMB_SWING_X + np.cos(upper_angle) * UPPER_LIMB_LENGTH
+    segments[..., 3] = root_y + np.sin(upper_angle) * UPPER_LIMB_LENGTH
+    segments[..., 4] = segments[..., 2] + np.cos(lower_angle) * LOWER_LIMB_LENGTH
+    segments[..., 5] = segments[..., 3] + np.sin(lower_angle) * LOWER_LIMB_LENGTH
+    return segments
+
+
+def draw_crowd(screen, x, y, width, height, facing, time, poses=None):
+    """
+    Draw many walking or idle stick figures, posed in one batch, with one blit call.
+
+    Looks like calling player.draw_standing_pose for each figure in turn. A
+    figure is placed on whole pixels with its limbs rounded relative to that, so
+    what it covers around its position depends only on its size and rounded
+    limbs: each distinct pose is drawn once with player.render_pose, and every
+    figure is blitted in a single Surface.blits call. Like PoseCache's sprites, a
+    figure cut by the surface's edge is clipped as a whole, which can differ by a
+    few pixels from pygame.draw clipping each line.
+
+    Args:
+        screen (pygame.Surface): Surface to draw on.
+        x, y, width, height, facing, time (np.ndarray): One entry per figure, as for limb_endpoints, plus the
+            body widths.
+        poses (dict or None): Pose sprites drawn already, kept by the caller to reuse from frame to frame (a walk
+            cycle has a few hundred at most); None to draw them for this call only.
+    """
+    x = np.round(np.asarray(x, dtype=np.float64)).astype(np.intp)
+    y = np.round(np.asarray(y, dtype=np.float64)).astype(np.intp)
+    if not len(x):
+        return
+    poses = {} if poses is None else poses
+    width = np.broadcast_to(np.asarray(width), x.shape)
+    height = np.broadcast_to(np.asarray(height), x.shape)
+    facing = np.broadcast_to(np.asarray(facing), x.shape)
+    time = np.broadcast_to(np.asarray(time), x.shape)
+    origin = np.zeros(len(x))
+    limbs = np.round(limb_endpoints(origin, origin, height, facing, time)).reshape(len(x), -1)
+    # One row of int16s per figure, as bytes: equal rows are the same pose, and the bytes are the cache key
+    rows = np.column_stack((width, height, limbs)).astype(np.int16)
+    keys = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel().tolist()
+
+    sprites = []
+    offsets_x = []
+    offsets_y = []
+    for i, key in enumerate(keys):
+        pose = poses.get(key)
+        if pose is None:
+            # Any figure with this key draws the same pixels, so the first one stands in for all of them
+            figure_width, figure_height = width[i].item(), height[i].item()
+            pose = poses[key] = render_pose(pose_scratch(screen, figure_width, figure_height), figure_width,
+                                            figure_height, facing[i].item(), time[i].item())
+        sprite, offset_x, offset_y = pose
+        sprites.append(sprite)
+        offsets_x.append(offset_x)
+        offsets_y.append(offset_y)
+    positions = zip((x + offsets_x).tolist(), (y + offsets_y).tolist())
+    screen.blits(zip(sprites, positions), doreturn=False)
@@ -0,0 +1,298 @@
+import numpy as np
+
+from world import Physics
+
+
+class PlatformArray:
+    """
+    Level platforms as NumPy columns, sorted by left edge for vectorized sweep-and-prune.
+
+    Args:
+        platforms (iterable): pygame.Rect platforms (or anything with .rect, like Slope; its bounds are used).
+    """
+    def __init__(self, platforms):
+        rects = [getattr(platform, "rect", platform) for platform in platforms]
+        bounds = np.array([(rect.left, rect.top, rect.right, rect.bottom) for rect in rects],
+                          dtype=np.float64).reshape(-1, 4)
+        bounds = bounds[np.argsort(bounds[:, 0], kind="stable")]
+        self.lefts = np.ascontiguousarray(bounds[:, 0])
+        self.tops = np.ascontiguousarray(bounds[:, 1])
+        self.rights = np.ascontiguousarray(bounds[:, 2])
+        self.bottoms = np.ascontiguousarray(bounds[:, 3])
+        self.max_width = float((self.rights - self.lefts).max()) if len(rects) else 0.0
+
+    def __len__(self):
+        return len(self.lefts)
+
+    def overlaps_any(self, left, top, right, bottom):
+        """
+        Test a batch of boxes against every platform.
+
+        Only platforms whose left edge falls in [box left - widest platform, box right)
+        can overlap a box, so each box gets a contiguous run of candidates from the
+        sorted lefts. The runs are tested one column at a time across all boxes.
+
+        Args:
+            left, top, right, bottom (np.ndarray): Box edges, one entry per box.
+
+        Returns:
+            np.ndarray: Boolean array, True where a box overlaps at least one platform.
+        """
+        hit = np.zeros(len(left), dtype=bool)
+        if not len(self.lefts):
+            return hit
+
+        first = np.searchsorted(self.lefts, left - self.max_width, side="right")
+        last = np.searchsorted(self.lefts, right, side="left")
+        candidates = last - first
+        for k in range(int(candidates.max(initial=0))):
+            active = np.nonzero((candidates > k) & ~hit)[0]
+            if not len(active):
+                break
+            j = first[active] + k
+            hit[active] = ((self.lefts[j] < right[active]) & (self.rights[j] > left[active])
+                           & (self.tops[j] < bottom[active]) & (self.bottoms[j] > top[active]))
+        return hit
+
+    def move_boxes(self, left, top, width, height, move_x, move_y):
+        """
+        Move a batch of boxes as far as each can go before it hits a platform (collisions.move_box, vectorized).
+
+        Each box stops where it first touches a platform, flush against it. A box that
+        starts inside one and isn't moving out of it is pushed out instead. The
+        candidates for a box are the sorted lefts its swept bounds can reach, tested
+        one column at a time across all boxes like overlaps_any.
+
+        Args:
+            left, top, width, height (np.ndarray): Boxes before moving, one entry per box.
+            move_x, move_y (np.ndarray or float): Movement of each box.
+
+        Returns:
+            tuple: (left, top, hit): where the boxes end up, and a boolean array, True where a box was stopped.
+        """
+        count = len(left)
+        move_x = np.broadcast_to(np.asarray(move_x, dtype=np.float64), (count,))
+        move_y = np.broadcast_to(np.asarray(move_y, dtype=np.float64), (count,))
+        if not len(self.lefts):
+            return left + move_x, top + move_y, np.zeros(count, dtype=bool)
+
+        first_t = np.full(count, np.inf)
+        normal_x = np.zeros(count)
+        normal_y = np.zeros(count)
+        hit_platform = np.zeros(count, dtype=np.intp)
+        right = left + width
+        bottom = top + height
+        # Bounds of each box over the whole move
+        swept_left = np.minimum(left, left + move_x)
+        swept_top = np.minimum(top, top + move_y)
+        swept_right = np.maximum(right, right + move_x)
+        swept_bottom = np.maximum(bottom, bottom + move_y)
+        first = np.searchsorted(self.lefts, swept_left - self.max_width, side="right")
+        last = np.searchsorted(self.lefts, swept_right, side="left")
+        candidates = last - first
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k in range(int(candidates.max(initial=0))):
+                # Nothing can be hit sooner than at the very start
+                active = np.nonzero((candidates > k) & (first_t > 0))[0]
+                if not len(active):
+                    break
+                j = first[active] + k
+                # Only platforms touching the swept bounds get the full sweep
+                near = ((self.lefts[j] < swept_right[active]) & (self.rights[j] > swept_left[active])
+                        & (self.tops[j] <= swept_bottom[active]) & (self.bottoms[j] >= swept_top[active]))
+                if near.any():
+                    self._sweep(j[near], active[near], left, top, right, bottom, move_x, move_y, first_t, normal_x,
+                                normal_y, hit_platform)
+
+        hit = np.isfinite(first_t)
+        t = np.where(hit, first_t, 1)
+        new_left = left + move_x * t
+        new_top = top + move_y * t
+        # Put each box exactly against the edge it hit (or was pushed out through)
+        j = hit_platform
+        new_top = np.where(hit & (normal_y < 0), self.tops[j] - height, new_top)
+        new_top = np.where(hit & (normal_y > 0), self.bottoms[j], new_top)
+        new_left = np.where(hit & (normal_x < 0), self.lefts[j] - width, new_left)
+        new_left = np.where(hit & (normal_x > 0), self.rights[j], new_left)
+        return new_left, new_top, hit
+
+    def _sweep(self, j, active, left, top, right, bottom, move_x, move_y, first_t, normal_x, normal_y,
+               hit_platform):
+        """Sweep the active boxes against platform j of each (as collisions._sweep_shape), keeping the earliest hits"""
+        lefts, tops, rights, bottoms = self.lefts[j], self.tops[j], self.rights[j], self.bottoms[j]
+        box_left, box_top, box_right, box_bottom = left[active], top[active], right[active], bottom[active]
+        speed_x, speed_y = move_x[active], move_y[active]
+
+        # When each axis's shadows start and stop overlapping; an axis without motion overlaps always or never
+        enter_x = np.where(speed_x > 0, lefts - box_right, rights - box_left) / speed_x
+        exit_x = np.where(speed_x > 0, rights - box_left, lefts - box_right) / speed_x
+        apart_x = (box_right <= lefts) | (box_left >= rights)
+        enter_x = np.where(speed_x == 0, np.where(apart_x, np.inf, -np.inf), enter_x)
+        exit_x = np.where(speed_x == 0, np.where(apart_x, -np.inf, np.inf), exit_x)
+        enter_y = np.where(speed_y > 0, tops - box_bottom, bottoms - box_top) / speed_y
+        exit_y = np.where(speed_y > 0, bottoms - box_top, tops - box_bottom) / speed_y
+        apart_y = (box_bottom <= tops) | (box_top >= bottoms)
+        enter_y = np.where(speed_y == 0, np.where(apart_y, np.inf, -np.inf), enter_y)
+        exit_y = np.where(speed_y == 0, np.where(apart_y, -np.inf, np.inf), exit_y)
+
+        t_enter = np.maximum(enter_x, enter_y)
+        t_exit = np.minimum(exit_x, exit_y)
+        touching = (t_enter < t_exit) & (t_enter < 1) & (t_exit > 0)
+
+        # The normal is the axis the box hit last, pointing back against the motion
+        on_y = enter_y > enter_x
+        hit_x = np.where(on_y, 0, -np.sign(speed_x))
+        hit_y = np.where(on_y, -np.sign(speed_y), 0)
+
+        # Already overlapping at the start: pushed out along whichever axis needs the smallest move
+        # (in _box_vs_rect's order, so ties go the same way), and free if already heading out that way
+        pushes = np.stack((box_right - lefts, box_bottom - tops, bottoms - box_top, rights - box_left))
+        push = np.argmin(pushes, axis=0)
+        push_x = np.array((-1, 0, 0, 1))[push]
+        push_y = np.array((0, -1, 1, 0))[push]
+        inside = touching & (t_enter < 0)
+        touching &= ~inside | (speed_x * push_x + speed_y * push_y <= 0)
+        t_enter = np.where(inside, 0.0, t_enter)
+        hit_x = np.where(inside, push_x, hit_x)
+        hit_y = np.where(inside, push_y, hit_y)
+
+        sooner = touching & (t_enter < first_t[active])
+        boxes = active[sooner]
+        first_t[boxes] = t_enter[sooner]
+        normal_x[boxes] = hit_x[sooner]
+        normal_y[boxes] = hit_y[sooner]
+        hit_platform[boxes] = j[sooner]
+
+
+class EntityStore:
+    """
+    Physics bodies stored as a structure of NumPy arrays and stepped all at once.
+
+    Each body follows the same rules as the player in World.tick (jump-force decay,
+    gravity, swept platform collision one axis at a time, ground clamping), but the
+    rules are applied to every live body in a single vectorized pass. Platforms are
+    treated as their bounding rects. Slots of despawned bodies are reused before the
+    arrays grow.
+
+    Args:
+        capacity (int): Initial number of slots; the arrays double when full.
+        physics (Physics or None): Movement constants, None for the game's.
+    """
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "width": np.float64,
+        "height": np.float64,
+        "velocity_x": np.float64,
+        "velocity_y": np.float64,
+        "jump_force": np.float64,
+        "is_jumping": bool,
+        "on_ground": bool,
+        "alive": bool,
+    }
+
+    def __init__(self, capacity=1024, physics=None):
+        self.capacity = capacity
+        self.physics = physics if physics is not None else Physics()
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.count = 0  # One past the highest slot ever used
+        self.free_slots = []
+
+    def __len__(self):
+        return self.count - len(self.free_slots)
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+        for name, dtype in self.FIELDS.items():
+            grown = np.zeros(new_capacity, dtype=dtype)
+            grown[:self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.capacity = new_capacity
+
+    def spawn(self, x, y, width=7, height=50, velocity_x=0):
+        """
+        Add a body standing still at (x, y).
+
+        Returns:
+            int: The body's slot index.
+        """
+        if self.free_slots:
+            index = self.free_slots.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow()
+            index = self.count
+            self.count += 1
+
+        self.x[index] = x
+        self.y[index] = y
+        self.width[index] = width
+        self.height[index] = height
+        self.velocity_x[index] = velocity_x
+        self.velocity_y[index] = 0
+        self.jump_force[index] = 0
+        self.is_jumping[index] = False
+        self.on_ground[index] = False
+        self.alive[index] = True
+        return index
+
+    def despawn(self, index):
+        """Remove a body; its slot is reused by a later spawn (despawning it again does nothing)"""
+        if not self.alive[index]:
+            return
+        self.alive[index] = False
+        self.free_slots.append(index)
+
+    def jump(self, indices):
+        """Make the given bodies jump, if they are standing on something"""
+        indices = np.asarray(indices)
+        jumping = indices[self.on_ground[indices] & self.alive[indices]]
+        self.jump_force[jumping] = self.physics.jump_force
+        self.is_jumping[jumping] = True
+        self.on_ground[jumping] = False
+
+    def step(self, platforms, ground_level):
+        """
+        Advance every live body by one tick.
+
+        Args:
+            platforms (PlatformArray): The level's platforms.
+            ground_level (float): Lowest y a body can reach.
+        """
+        n = self.count
+        alive = self.alive[:n]
+        x, y = self.x[:n], self.y[:n]
+        width, height = self.width[:n], self.height[:n]
+        velocity_x, velocity_y = self.velocity_x[:n], self.velocity_y[:n]
+        jump_force, is_jumping, on_ground = self.jump_force[:n], self.is_jumping[:n], self.on_ground[:n]
+
+        physics = self.physics
+
+        # Horizontal movement, stopping against walls
+        new_x, new_y, _ = platforms.move_boxes(x, y, width, height, velocity_x, 0)
+        x[alive] = new_x[alive]
+        y[alive] = new_y[alive]
+
+        # Jumping
+        velocity_y[is_jumping] = jump_force[is_jumping]
+        jump_force[is_jumping] *= physics.jump_decay
+        is_jumping &= np.abs(jump_force) >= 1
+
+        # Gravity (on the ground too: landing again each tick is what keeps a body standing)
+        velocity_y[~is_jumping & alive] += physics.gravity
+
+        # Vertical movement: the move swept is the one made, and it stops where it first touches something
+        new_x, new_y, hit = platforms.move_boxes(x, y, width, height, 0, velocity_y)
+        x[alive] = new_x[alive]
+        y[alive] = new_y[alive]
+        hit &= alive
+        on_ground[alive & ~hit] = False
+        on_ground[hit & (velocity_y > 0)] = True
+        velocity_y[hit] = 0  # Stop vertical movement (landed or hit a ceiling)
+
+        # Ground collision
+        grounded = alive & (y >= ground_level)
+        y[grounded] = ground_level
+        velocity_y[grounded] = 0
+        on_ground[grounded] = True
@@ -0,0 +1,234 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import pygame
+
+# Binary level layout (all little-endian):
+#   header
+#   chunk index: one (first platform, platform count) pair per chunk, chunk 0 first
+#   platforms: (x, y, width, height) int32 records, sorted by x
+#   movers: the moving platforms' descriptions as a UTF-8 JSON list (maybe empty), to the end of the file
+# A chunk is a CHUNK_SIZE wide vertical strip of the level; a platform belongs to
+# the chunk its left edge is in.
+MAGIC = b"MMLV"
+VERSION = 2  # 2: the movers section is always there
+HEADER = struct.Struct("<4sHHiiiiiiII")  # magic, version, reserved, chunk size, origin x, start x, start y,
+                                         # ground level, widest platform, chunk count, platform count
+INDEX_ENTRY = struct.Struct("<II")
+PLATFORM = struct.Struct("<iiii")
+CHUNK_SIZE = 1024
+
+
+def write_level(path, platforms, start, ground_level, chunk_size=CHUNK_SIZE, movers=()):
+    """
+    Write a level in the binary format.
+
+    Args:
+        path (str): File to write.
+        platforms (iterable): (x, y, width, height) platforms, in any order.
+        start (tuple): Player's (x, y) starting position.
+        ground_level (int): Lowest y the player can reach.
+        chunk_size (int): Width in pixels of each streamed chunk.
+        movers (list): Moving platform descriptions (see movers.make_movers).
+    """
+    platforms = sorted(tuple(platform) for platform in platforms)
+    origin_x = platforms[0][0] if platforms else 0
+    widest = max((platform[2] for platform in platforms), default=0)
+    chunk_count = (platforms[-1][0] - origin_x) // chunk_size + 1 if platforms else 0
+
+    # Platforms are sorted by x, so every chunk is one contiguous run of them
+    index = array("I", bytes(INDEX_ENTRY.size * chunk_count))
+    for i, platform in enumerate(platforms):
+        chunk = (platform[0] - origin_x) // chunk_size
+        if index[chunk * 2 + 1] == 0:
+            index[chunk * 2] = i
+        index[chunk * 2 + 1] += 1
+    # Empty chunks point at where their run would start so lookups never need a special case
+    for chunk in range(1, chunk_count):
+        if index[chunk * 2 + 1] == 0:
+            index[chunk * 2] = index[chunk * 2 - 2] + index[chunk * 2 - 1]
+
+    records = array("i", (value for platform in platforms for value in platform))
+    if sys.byteorder != "little":
+        index.byteswap()
+        records.byteswap()
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, chunk_size, origin_x, start[0], start[1], ground_level, widest,
+                               chunk_count, len(platforms)))
+        file.write(index.tobytes())
+        file.write(records.tobytes())
+        file.write(json.dumps(list(movers)).encode())
+
+
+def compile_level(source_path, output_path):
+    """
+    Compile a JSON level description into the binary format.
+
+    The description looks like:
+        {"start": [50, 300], "ground_level": 520, "platforms": [[100, 550, 50, 50], ...], "movers": [...]}
+    """
+    with open(source_path) as file:
+        description = json.load(file)
+    write_level(output_path, description["platforms"], description["start"], description["ground_level"],
+                description.get("chunk_size", CHUNK_SIZE), description.get("movers", []))
+
+
+def _format_version(path):
+    """Format version in a binary level's header, None if it isn't a level file"""
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        return None
+    return HEADER.unpack(header)[1]
+
+
+def open_level(path):
+    """
+    Open a level, compiling it first if path is a JSON description newer than its .lvl file
+    (or the .lvl file is from another version of the format).
+
+    Returns:
+        LevelFile: The opened level.
+    """
+    if path.endswith(".json"):
+        compiled = path[:-len(".json")] + ".lvl"
+        if (not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(path)
+                or _format_version(compiled) != VERSION):
+            compile_level(path, compiled)
+        path = compiled
+    return LevelFile(path)
+
+
+class LevelFile:
+    """
+    A memory-mapped binary level; only the header is read up front.
+
+    Opening takes the same time whatever the level's size, and chunks are decoded
+    only when asked for, so memory use follows what is loaded rather than the file.
+
+    Args:
+        path (str): Path to a file written by write_level.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.chunk_size, self.origin_x, start_x, start_y, self.ground_level,
+         self.max_platform_width, self.chunk_count, self.platform_count) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a level file")
+        if version != VERSION:
+            raise ValueError(f"{path} is level format version {version}, expected {VERSION}")
+        self.start = (start_x, start_y)
+        self.index_offset = HEADER.size
+        self.platforms_offset = self.index_offset + INDEX_ENTRY.size * self.chunk_count
+        self.movers_offset = self.platforms_offset + PLATFORM.size * self.platform_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def chunks_between(self, left, right):
+        """Chunks holding platforms whose left edge lies in [left, right]"""
+        first = max(0, int(left - self.origin_x) // self.chunk_size)
+        last = min(self.chunk_count - 1, int(right - self.origin_x) // self.chunk_size)
+        return range(first, last + 1)
+
+    def read_chunk(self, chunk):
+        """
+        Decode one chunk.
+
+        Returns:
+            list[pygame.Rect]: The chunk's platforms.
+        """
+        first, count = INDEX_ENTRY.unpack_from(self.data, self.index_offset + chunk * INDEX_ENTRY.size)
+        start = self.platforms_offset + first * PLATFORM.size
+        return [pygame.Rect(record) for record in PLATFORM.iter_unpack(self.data[start:start + count * PLATFORM.size])]
+
+    def prefetch(self, chunks):
+        """
+        Get some chunks' platform records into memory without decoding them.
+
+        Safe to call from a background thread, so a later read_chunk on the main
+        thread doesn't have to wait for the disk.
+        """
+        if not len(chunks):
+            return
+        first, _ = INDEX_ENTRY.unpack_from(self.data, self.index_offset + chunks[0] * INDEX_ENTRY.size)
+        last, count = INDEX_ENTRY.unpack_from(self.data, self.index_offset + chunks[-1] * INDEX_ENTRY.size)
+        start = self.platforms_offset + first * PLATFORM.size
+        end = self.platforms_offset + (last + count) * PLATFORM.size
+        if end <= start:
+            return
+        if hasattr(mmap, "MADV_WILLNEED"):
+            page_start = start - start % mmap.PAGESIZE
+            self.data.madvise(mmap.MADV_WILLNEED, page_start, end - page_start)
+        self.data[start:end]  # Reading the bytes faults every page in
+
+    def read_movers(self):
+        """The level's moving platform descriptions (see movers.make_movers), kept apart from the huge platform list"""
+        return json.loads(self.data[self.movers_offset:])
+
+    def read_all(self):
+        """Decode every platform in the level (for headless runs that don't stream)"""
+        return [platform for chunk in range(self.chunk_count) for platform in self.read_chunk(chunk)]
+
+
+class LevelStreamer:
+    """
+    Keeps the chunks around the view loaded in a SpatialGrid and drops the rest.
+
+    Args:
+        level_file (LevelFile): The level to stream from.
+        grid (SpatialGrid): Where loaded platforms go (e.g. World.level).
+        margin (int): Extra pixels loaded on each side of the view, so chunks arrive before they are seen.
+    """
+    def __init__(self, level_file, grid, margin=CHUNK_SIZE):
+        self.level_file = level_file
+        self.grid = grid
+        self.margin = margin
+        self.loaded = {}  # chunk -> its platforms
+
+    def update(self, view_left, view_right):
+        """
+        Load chunks that came near the view and unload ones that left it.
+
+        Returns:
+            bool: True if any chunk was loaded or unloaded.
+        """
+        # A platform can start up to max_platform_width left of the view and still reach into it
+        wanted = self.level_file.chunks_between(view_left - self.margin - self.level_file.max_platform_width,
+                                                view_right + self.margin)
+        changed = False
+        for chunk in [chunk for chunk in self.loaded if chunk not in wanted]:
+            for platform in self.loaded.pop(chunk):
+                self.grid.remove(platform)
+            changed = True
+        for chunk in wanted:
+            if chunk not in self.loaded:
+                platforms = self.level_file.read_chunk(chunk)
+                for platform in platforms:
+                    self.grid.insert(platform)
+                self.loaded[chunk] = platforms
+                changed = True
+        return changed
+
+    def platforms(self):
+        """Every platform currently loaded"""
+        return [platform for platforms in self.loaded.values() for platform in platforms]
+
+
+if __name__ == "__main__":
+    # python levelfile.py levels/level1.json [levels/level1.lvl]
+    source = sys.argv[1]
+    compile_level(source, sys.argv[2] if len(sys.argv) > 2 else source[:-len(".json")] + ".lvl")
@@ -1,147 +1,257 @@
+import os
 import pygame
 import sys
-from player import draw_player
-from collisions import check_collision
-from specialmoves import RollState, handle_roll
+from types import SimpleNamespace
+from player import draw_player, player_bounds, pose_cache
+from renderer import DirtyRectRenderer
+from assets import AssetManager
+from levelfile import LevelStreamer, CHUNK_SIZE
+from camera import Camera
+from profiler import FrameProfiler
+from controls import InputBuffer, load_bindings
+from startup import WarmUp
 
-pygame.init()
+try:
+    from particles import ParticleSystem, PlayerEffects
+except ImportError:  # The particles need NumPy; without it the game just runs without them
+    ParticleSystem = None
+
+# Only the display (which brings events with it) is started; the profiler starts fonts when its
+# overlay is first shown, and the game has no sound or joystick support to wait for
+pygame.display.init()
 
 # Constants
 SCREEN_WIDTH = 1400
 SCREEN_HEIGHT = 600
+FPS = 60
 RED = (255, 0, 0)
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
-INITIAL_JUMP_FORCE = -15
-GRAVITY = 0.8
-PLAYER_SPEED = 5
 SPAWN_X_OFFSET = 10
 SPAWN_Y_OFFSET = -50
-
-time = 0
-jump_force = 0
-is_jumping = False
-player_x = 100
-player_y = 0
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+LEVELS_DIR = "levels"
+LEVEL_PATH = os.path.join(LEVELS_DIR, "level1.json")
+CONTROLS_PATH = "controls.json"  # Optional key bindings, e.g. {"jump": ["w", "up"]}
 
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Molasses Mike")
 
-# Player variables
-START_X = (SCREEN_WIDTH // 2) - 650  # Store starting X position
-START_Y = SCREEN_HEIGHT - 300  # Store starting Y position
-player_x = START_X
-player_y = START_Y
-player_height = 50
-player_width = 7  # Set the body width to 7
 walk_angle = 0  # Controls the swing of arms and legs
-is_walking_left = False  # Initially walking to the right
-is_walking_right = False
-player_velocity_y = 0  # Player vertical velocity (for gravity)
-on_ground = False  # Whether the player is standing on a platform
-ground_level = SCREEN_HEIGHT - 80
-
-# Initialize roll state
-roll_state = RollState()
-
-# Platform data (x, y, width, height)
-platforms = [
-    pygame.Rect(100, SCREEN_HEIGHT - 50, 50, 50),  # First platform
-    pygame.Rect(250, SCREEN_HEIGHT - 100, 50, 100),  # Second platform
-    pygame.Rect(400, SCREEN_HEIGHT - 150, 50, 150),  # Third platform
-    pygame.Rect(550, SCREEN_HEIGHT - 200, 50, 200),  # Fourth platform
-]
+
+# python main.py --record session.rep  records every tick's inputs;
+# python main.py --replay session.rep  plays them back (python replay.py session.rep checks one headless)
+# python main.py --frames N            quits after N frames (for startup timing and smoke tests)
+if len(sys.argv) > 1:
+    import argparse  # Only paid for when there are options to parse
+
+    parser = argparse.ArgumentParser(description="Molasses Mike")
+    parser.add_argument("--record", metavar="FILE", help="record this session's inputs to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back the inputs recorded in FILE")
+    parser.add_argument("--frames", type=int, metavar="N", help="quit after N frames")
+    args = parser.parse_args()
+else:
+    args = SimpleNamespace(record=None, replay=None, frames=None)
+if args.record or args.replay:
+    from replay import InputRecorder, Replay
+replay = Replay.load(args.replay) if args.replay else None
+
+# Levels are data files; the binary version is streamed in chunks around the view. They load on
+# worker threads, so switching level (PageDown/PageUp) never stalls a frame; only the first is waited for
+assets = AssetManager()
+level_paths = sorted(os.path.join(LEVELS_DIR, name) for name in os.listdir(os.path.join(GAME_DIR, LEVELS_DIR))
+                     if name.endswith(".json"))
+level_path = replay.level_path if replay else LEVEL_PATH
+level = assets.wait(assets.load("level", os.path.join(GAME_DIR, level_path)))
+if level.failed:
+    raise level.error
+next_level = None  # Level loading to switch to
+level_file = level.value.level_file
+
+# The simulation runs in fixed ticks; this loop only feeds it input and draws it
+world = level.value.make_world()
+player = world.player
+if args.record:
+    world.recorder = InputRecorder(level_path)
+clock = pygame.time.Clock()
+
+# The camera follows the player sideways; the level is as tall as the window
+camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, min_x=0, min_y=0, max_y=0)
+streamer = LevelStreamer(level_file, world.level, margin=0)  # Just what the first frame shows; the margin comes after
+streamer.update(camera.x, camera.x + SCREEN_WIDTH)
+
+
+def visible_platforms():
+    """What the camera sees of the level: the static platforms and the moving ones"""
+    static = []
+    moving = []
+    for shape in camera.visible(world.level):
+        (moving if shape in world.movers else static).append(shape)
+    return static, moving
+
+
+def draw_progress(fraction):
+    """A loading bar along the top of the screen; returns the area drawn over"""
+    bar = pygame.Rect(0, 0, round(SCREEN_WIDTH * fraction), 4)
+    pygame.draw.rect(screen, RED, bar)
+    return bar
+
+
+def enter_level(asset):
+    """Start playing a loaded level asset from its start, in place of the one being played"""
+    global level, level_path, level_file, world, player, streamer, view_offset, warm_up
+    if warm_up is not None:
+        warm_up.cancel()  # It may be reading the old level's file
+        warm_up = None
+    assets.release(level)  # Stays cached for switching back, until enough other assets push it out
+    level = asset
+    level_path = os.path.relpath(asset.path, GAME_DIR)
+    level_file = level.value.level_file
+    world = level.value.make_world()
+    player = world.player
+    if particles is not None:
+        particles.clear()
+    camera.snap(*level_file.start)
+    streamer = LevelStreamer(level_file, world.level)
+    streamer.update(camera.x, camera.x + SCREEN_WIDTH)
+    view_offset = camera.offset()
+    renderer.set_level(visible_platforms()[0], view_offset)
+
+
+# The visible part of the level is drawn once into a cached background; while the
+# camera is still, each frame only the player's area (and moving platforms) is redrawn
+view_offset = camera.offset()
+renderer = DirtyRectRenderer(screen, WHITE, visible_platforms()[0], BLACK, view_offset)
+
+# Key events are buffered and handed to the simulation tick by tick, so short taps aren't lost
+controls_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONTROLS_PATH)
+controls = InputBuffer(load_bindings(controls_path)) if os.path.exists(controls_path) else InputBuffer()
+tick_inputs = replay.player() if replay else controls.next_tick
+
+# Dust and roll trails; particles live in world coordinates and tick with the simulation
+particles = ParticleSystem() if ParticleSystem is not None else None
+effects = PlayerEffects(particles) if particles is not None else None
+
+# Frame time overlay: F3 shows it, F4 exports the recent frames, F5 profiles the next slow frame
+profiler = FrameProfiler()
+
+frames_shown = 0
+warm_up = None  # Background cache filling, started once the first frame is on screen
 
 # Main game loop
 run = True
 while run:
-    screen.fill(WHITE)  # Fill screen with white background
-
-    # Draw platforms
-    for platform in platforms:
-        pygame.draw.rect(screen, BLACK, platform)
+    # Frame rate (FPS), and how much real time passed since the last frame
+    dt = clock.tick(FPS) / 1000
+    profiler.begin_frame()
 
     # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
+    with profiler.stage("events"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()  # The window was uncovered, so everything needs redrawing
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()  # Show/hide the frame time overlay
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                profiler.export_csv("frame_times.csv")
+                profiler.export_json("frame_times.json")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                profiler.capture_slow_frames()  # cProfile the next frame that misses 60 FPS
+            elif (event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEDOWN, pygame.K_PAGEUP)
+                  and next_level is None and not (args.record or replay)):
+                # Next or previous level; it loads in the background while this one carries on
+                index = level_paths.index(level_path) if level_path in level_paths else -1
+                index = (index + (1 if event.key == pygame.K_PAGEDOWN else -1)) % len(level_paths)
+                next_level = assets.load("level", os.path.join(GAME_DIR, level_paths[index]))
+            else:
+                controls.handle_event(event)
+
+    # Take in loaded assets, and switch level once the next one is ready
+    with profiler.stage("assets"):
+        assets.poll()
+        if next_level is not None and next_level.ready:
+            enter_level(next_level)
+            next_level = None
+        elif next_level is not None and next_level.failed:
+            print(f"Couldn't load {next_level.path}: {next_level.error}", file=sys.stderr)
+            assets.release(next_level)
+            next_level = None
 
     # Handle player movement
-    keys = pygame.key.get_pressed()
-    move_x = 0
-    move_y = player_velocity_y
-    is_walking_left = False
-    is_walking_right = False
-
-    # Reset position when R is pressed
-    if keys[pygame.K_r]:
-        player_x = START_X
-        player_y = START_Y
-        player_velocity_y = 0
-        on_ground = False
-        is_jumping = False
-        jump_force = 0
-
-    # Horizontal movement
-    if keys[pygame.K_LEFT]:  # Move left
-        move_x = -PLAYER_SPEED
-        is_walking_left = True
-    elif keys[pygame.K_RIGHT]:  # Move right
-        move_x = PLAYER_SPEED
-        is_walking_right = True
-
-    # Handle rolling
-    roll_velocity = handle_roll(keys, roll_state, is_walking_left, is_walking_right)
-    move_x += roll_velocity
-
-    # Check horizontal collision
-    if check_collision(player_x, player_y, player_width, player_height, move_x, 0, screen):
-        player_x += move_x
-
-    # Jumping
-    if keys[pygame.K_UP] and on_ground:  # Jump
-        jump_force = INITIAL_JUMP_FORCE
-        is_jumping = True
-        on_ground = False
-
-    if is_jumping:
-        player_velocity_y = jump_force
-        jump_force = jump_force * 0.9
-        if abs(jump_force) < 1:
-            is_jumping = False
-
-    # Gravity
-    if not is_jumping and not on_ground:
-        player_velocity_y += GRAVITY
-
-    # Check vertical collision
-    if check_collision(player_x, player_y, player_width, player_height, 0, move_y, screen):
-        player_y += player_velocity_y
-        on_ground = False
-    else:  # If collision is detected, stop vertical movement
-        if player_velocity_y > 0:  # Falling
-            on_ground = True
-            player_velocity_y = 0
-        elif player_velocity_y < 0:  # Hitting ceiling
-            player_velocity_y = 0
-
-    # Ground collision
-    if player_y >= ground_level:
-        player_y = ground_level
-        player_velocity_y = 0
-        on_ground = True
-
-    # Draw the player
-    draw_player(screen, player_x, player_y, player_height, walk_angle, is_walking_left, player_width, time, is_walking_right, on_ground, roll_state)
-
-    time += 1   # Increment time for walking cycle
-
-    # Update the screen
-    pygame.display.flip()
-
-    # Frame rate (FPS)
-    pygame.time.Clock().tick(60)
+    with profiler.stage("simulation"):
+        ticks = world.step(dt, tick_inputs)
+        if particles is not None:
+            effects.update(player)
+            for _ in range(ticks):
+                particles.update()
+
+    # Draw the player between the last two ticks so motion stays smooth at any frame rate
+    draw_x, draw_y = world.render_position()
+    camera.follow(draw_x, draw_y, dt)
+
+    # Stream level chunks around the view, and rebake the background (culled to what
+    # the camera sees) when the view scrolled or new platforms arrived
+    with profiler.stage("level"):
+        level_changed = streamer.update(camera.x, camera.x + SCREEN_WIDTH)
+        if level_changed or camera.offset() != view_offset:
+            view_offset = camera.offset()
+            renderer.set_level(visible_platforms()[0], view_offset)
+
+    with profiler.stage("draw"):
+        # Restore the background where the player was last frame
+        renderer.begin_frame()
+
+        # Moving platforms aren't in the background; they are drawn between their last two ticks like the player
+        for shape in visible_platforms()[1]:
+            rect = world.movers.draw_rect(world.movers.platforms[id(shape)], world.alpha)
+            rect.move_ip(-view_offset[0], -view_offset[1])
+            pygame.draw.rect(screen, BLACK, rect)
+            renderer.mark_dirty(rect)
+
+        particle_area = particles.draw(screen, camera.offset()) if particles is not None else None
+        if particle_area:
+            renderer.mark_dirty(particle_area)
+
+        screen_x, screen_y = camera.world_to_screen(draw_x, draw_y)
+        draw_player(screen, screen_x, screen_y, player.height, walk_angle, player.is_walking_left, player.width,
+                    world.time, player.is_walking_right, player.on_ground, player.roll_state)
+        renderer.mark_dirty(player_bounds(screen_x, screen_y, player.width, player.height))
+
+        if next_level is not None:
+            renderer.mark_dirty(draw_progress(assets.progress([next_level])))
+
+        if profiler.enabled:
+            renderer.mark_dirty(profiler.draw_overlay(screen))
+
+    # Update the changed parts of the screen
+    with profiler.stage("present"):
+        renderer.end_frame()
+    latency = controls.presented()
+    if latency is not None:
+        profiler.record("input lag", latency)  # From the key event to the frame showing it
+
+    frames_shown += 1
+    if frames_shown == 1:
+        # The window is up: stream the margin around the view from now on, and warm the
+        # level chunks there and the walking poses on a background thread
+        streamer.margin = CHUNK_SIZE
+        warm_up = WarmUp(screen, level_file, level_file.chunks_between(camera.x - CHUNK_SIZE,
+                                                                       camera.x + SCREEN_WIDTH + CHUNK_SIZE),
+                         player.width, player.height)
+    elif warm_up is not None and warm_up.ready():
+        pose_cache.adopt(warm_up.poses)
+        warm_up = None
+    if args.frames and frames_shown >= args.frames:
+        run = False
+
+    profiler.end_frame()
 
 # Quit Pygame
+if warm_up is not None:
+    warm_up.cancel()
+if args.record:
+    world.recorder.save(args.record)
+assets.close()
 pygame.quit()
-sys.exit()
\ No newline at end of file
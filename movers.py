@@ -0,0 +1,390 @@
+import heapq
+import math
+import struct
+
+import pygame
+
+CARRY_PROBE = 2  # How far above or below the player's feet a platform's top still counts as stood on
+FOREVER = None  # step() result: sleep until something wakes the platform (see Movers.touch)
+
+# CrumblingPlatform states
+SOLID = 0
+SHAKING = 1
+FALLING = 2
+GONE = 3
+
+# Saved state of a Movers (little-endian, see Movers.save_state): tick count and alarms set so far,
+# then per platform, in the order they were added: its rect's top-left corner, how far it moved on
+# its last step and on which tick, its place in the awake list and its alarm (tick, order set; -1 for
+# none), whether it is in the grid; and then the platform's own STATE
+MOVERS = struct.Struct("<Ii")
+PLATFORM = struct.Struct("<iiiiiiii?")
+
+
+class PathPlatform:
+    """
+    A platform that follows a path of waypoints at a steady speed, waiting at each one.
+
+    Its rect is what goes in the level's SpatialGrid; the exact position is kept
+    separately so speeds below a pixel a tick still add up.
+
+    Args:
+        rect (pygame.Rect or tuple): The platform; it starts at the first waypoint whatever its position.
+        path (list): (x, y) positions of the platform's top-left corner to visit in order.
+        speed (float): Pixels per tick.
+        pause (int): Ticks to wait at each waypoint (asleep, so waiting costs nothing).
+        loop (bool): Go from the last waypoint straight to the first, instead of back along the path.
+    """
+    STATE = struct.Struct("<4diHb")  # Exact position, step, steps left, waypoint and direction it is heading
+
+    def __init__(self, rect, path, speed, pause=0, loop=False):
+        if len(path) < 2:
+            raise ValueError("a path platform needs at least two waypoints")
+        if speed <= 0:
+            raise ValueError(f"a path platform needs a positive speed, got {speed}")
+        self.rect = pygame.Rect(rect)
+        self.path = [tuple(point) for point in path]
+        self.speed = speed
+        self.pause = pause
+        self.loop = loop
+        self.rect.topleft = self.path[0]
+        self.x, self.y = self.path[0]
+        self.target = 0  # Index of the waypoint it is heading for
+        self.heading = 1  # 1 along the path, -1 back along it
+        self._next_leg()
+        self.dx = self.dy = 0  # How far the rect moved on its last step
+        self.moved_tick = -1  # Movers tick of that step
+        self.awake = False
+        self.solid = True
+
+    def _next_leg(self):
+        """Head for the next waypoint: work out the steps and the distance of each step to it"""
+        last = len(self.path) - 1
+        if self.loop:
+            self.target = (self.target + 1) % len(self.path)
+        else:
+            if not 0 < self.target < last:
+                self.heading = -1 if self.target == last else 1
+            self.target += self.heading
+        target_x, target_y = self.path[self.target]
+        distance = math.hypot(target_x - self.x, target_y - self.y)
+        self.steps_left = max(1, math.ceil(distance / self.speed))
+        self.step_x = (target_x - self.x) / self.steps_left
+        self.step_y = (target_y - self.y) / self.steps_left
+
+    def step(self, grid):
+        """
+        Move one tick along the path, refiling the rect in grid if it moved.
+
+        Returns:
+            int or None: Ticks to sleep from now (0 to keep moving), FOREVER to sleep until woken.
+        """
+        self.steps_left -= 1
+        arrived = not self.steps_left
+        if arrived:
+            self.x, self.y = self.path[self.target]  # Exactly, whatever the rounding on the way
+        else:
+            self.x += self.step_x
+            self.y += self.step_y
+
+        rect = self.rect
+        left = rect.x
+        top = rect.y
+        rect.x = round(self.x)
+        rect.y = round(self.y)
+        self.dx = rect.x - left
+        self.dy = rect.y - top
+        if self.dx or self.dy:
+            grid.update(rect)
+
+        if not arrived:
+            return 0
+        self._next_leg()
+        return self.pause
+
+    def touch(self):
+        """Someone stood on it; returns True if that wakes it (it doesn't, it moves on its own)"""
+        return False
+
+    def save_state(self, buffer, offset):
+        self.STATE.pack_into(buffer, offset, self.x, self.y, self.step_x, self.step_y, self.steps_left, self.target,
+                             self.heading)
+
+    def load_state(self, buffer, offset):
+        (self.x, self.y, self.step_x, self.step_y, self.steps_left, self.target,
+         self.heading) = self.STATE.unpack_from(buffer, offset)
+
+
+class CrumblingPlatform:
+    """
+    A platform that holds until stood on, then shakes, falls away and comes back later.
+
+    It sleeps while solid and untouched and while gone, so only the ones crumbling
+    at the moment cost anything.
+
+    Args:
+        rect (pygame.Rect or tuple): The platform where it rests.
+        delay (int): Ticks it shakes for after being stood on, before it falls.
+        respawn (int): Ticks from falling out of reach to being back in place.
+        gravity (float): Added to its falling speed every tick.
+        fall_distance (int): How far it falls before it is gone.
+    """
+    STATE = struct.Struct("<ddBi")  # Exact top, falling speed, crumble state and its timer
+
+    def __init__(self, rect, delay=30, respawn=180, gravity=0.5, fall_distance=600):
+        self.rect = pygame.Rect(rect)
+        self.home = self.rect.topleft
+        self.delay = delay
+        self.respawn = respawn
+        self.gravity = gravity
+        self.fall_distance = fall_distance
+        self.state = SOLID
+        self.timer = 0
+        self.velocity_y = 0.0
+        self.y = float(self.rect.top)
+        self.dx = self.dy = 0
+        self.moved_tick = -1
+        self.awake = False
+        self.solid = True  # In the grid, i.e. there to stand on
+
+    def touch(self):
+        """Someone stood on it; returns True if that wakes it"""
+        if self.state != SOLID:
+            return False
+        self.state = SHAKING
+        self.timer = self.delay
+        return True
+
+    def step(self, grid):
+        """
+        Advance the crumble by one tick (see PathPlatform.step).
+
+        Returns:
+            int or None: Ticks to sleep from now (0 to keep going), FOREVER to sleep until stood on again.
+        """
+        self.dx = self.dy = 0
+        if self.state == SHAKING:
+            self.timer -= 1
+            if self.timer <= 0:
+                self.state = FALLING
+                self.velocity_y = 0.0
+            return 0
+
+        if self.state == FALLING:
+            self.velocity_y += self.gravity
+            self.y += self.velocity_y
+            top = self.rect.top
+            self.rect.top = round(self.y)
+            self.dy = self.rect.top - top
+            if self.rect.top - self.home[1] < self.fall_distance:
+                if self.dy:
+                    grid.update(self.rect)
+                return 0
+            grid.remove(self.rect)
+            self.solid = False
+            self.state = GONE
+            return self.respawn
+
+        # GONE, woken by its alarm: back in place, and asleep until stood on again
+        self.rect.topleft = self.home
+        self.y = float(self.rect.top)
+        grid.insert(self.rect)
+        self.solid = True
+        self.state = SOLID
+        return FOREVER
+
+    def save_state(self, buffer, offset):
+        self.STATE.pack_into(buffer, offset, self.y, self.velocity_y, self.state, self.timer)
+
+    def load_state(self, buffer, offset):
+        self.y, self.velocity_y, self.state, self.timer = self.STATE.unpack_from(buffer, offset)
+
+
+class Movers:
+    """
+    The moving platforms of a World, stepped once per tick.
+
+    Each platform's rect lives in the level's SpatialGrid next to the static
+    platforms, so collision tests see them like any other; when one moves only
+    its own entry is refiled (and only if it crossed into other cells). Only
+    awake platforms are stepped: a platform sleeps when step() says so, either
+    for a number of ticks (an alarm wakes it) or until touched (stood on), so
+    idle platforms cost nothing however many there are.
+
+    Args:
+        grid (SpatialGrid): The level the platforms move in.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.platforms = {}  # id(rect) -> platform, for telling movers' rects from static platforms
+        self.awake = []  # Stepped every tick, in the order they woke
+        self.alarms = []  # Heap of (tick to wake at, order set, platform)
+        self.alarms_set = 0
+        self.ticks = 0
+
+    def __len__(self):
+        return len(self.platforms)
+
+    def __bool__(self):
+        return bool(self.platforms)
+
+    def __contains__(self, shape):
+        """Whether a shape from the grid is one of these platforms' rects"""
+        return id(shape) in self.platforms
+
+    def __iter__(self):
+        return iter(self.platforms.values())
+
+    def add(self, platform, awake=True):
+        """Put a platform in the level, moving from the next tick (or asleep until touched)"""
+        self.platforms[id(platform.rect)] = platform
+        self.grid.insert(platform.rect)
+        if awake:
+            self.wake(platform)
+
+    def wake(self, platform):
+        """Step a platform from the next tick on"""
+        if not platform.awake:
+            platform.awake = True
+            self.awake.append(platform)
+
+    def touch(self, platform):
+        """Tell a platform it is being stood on, waking it if it reacts to that"""
+        if platform.touch():
+            self.wake(platform)
+
+    def update(self):
+        """Step every awake platform by one tick, putting the ones that are done to sleep"""
+        self.ticks += 1
+        alarms = self.alarms
+        while alarms and alarms[0][0] <= self.ticks:
+            self.wake(heapq.heappop(alarms)[2])
+        if not self.awake:
+            return
+
+        still_awake = []
+        grid = self.grid
+        ticks = self.ticks
+        for platform in self.awake:
+            sleep = platform.step(grid)
+            platform.moved_tick = ticks
+            if sleep == 0:
+                still_awake.append(platform)
+                continue
+            platform.awake = False
+            if sleep is not FOREVER:
+                heapq.heappush(alarms, (ticks + sleep, self.alarms_set, platform))
+                self.alarms_set += 1
+        self.awake = still_awake
+
+    def state_size(self):
+        """Bytes save_state writes"""
+        return MOVERS.size + sum(PLATFORM.size + platform.STATE.size for platform in self)
+
+    def save_state(self, buffer, offset):
+        """
+        Pack every platform's position and progress, and which are awake or have alarms set, into buffer at offset.
+
+        Returns:
+            int: The offset just past what was written.
+        """
+        awake = {id(platform): order for order, platform in enumerate(self.awake)}
+        alarms = {id(platform): (tick, order) for tick, order, platform in self.alarms}
+        MOVERS.pack_into(buffer, offset, self.ticks, self.alarms_set)
+        offset += MOVERS.size
+        for platform in self:
+            rect = platform.rect
+            alarm_tick, alarm_order = alarms.get(id(platform), (-1, -1))
+            PLATFORM.pack_into(buffer, offset, rect.x, rect.y, platform.dx, platform.dy, platform.moved_tick,
+                               awake.get(id(platform), -1), alarm_tick, alarm_order, platform.solid)
+            offset += PLATFORM.size
+            platform.save_state(buffer, offset)
+            offset += platform.STATE.size
+        return offset
+
+    def load_state(self, buffer, offset):
+        """
+        Put the platforms back as save_state packed them at offset, refiling their rects in the grid.
+
+        Returns:
+            int: The offset just past what was read.
+        """
+        self.ticks, self.alarms_set = MOVERS.unpack_from(buffer, offset)
+        offset += MOVERS.size
+        awake = []
+        self.alarms = []
+        grid = self.grid
+        for platform in self:
+            rect = platform.rect
+            (rect.x, rect.y, platform.dx, platform.dy, platform.moved_tick, awake_order, alarm_tick, alarm_order,
+             platform.solid) = PLATFORM.unpack_from(buffer, offset)
+            offset += PLATFORM.size
+            platform.load_state(buffer, offset)
+            offset += platform.STATE.size
+
+            platform.awake = awake_order >= 0
+            if platform.awake:
+                awake.append((awake_order, platform))
+            if alarm_tick >= 0:
+                self.alarms.append((alarm_tick, alarm_order, platform))
+            if rect not in grid:
+                if platform.solid:
+                    grid.insert(rect)
+            elif platform.solid:
+                grid.update(rect)
+            else:
+                grid.remove(rect)
+        awake.sort(key=lambda entry: entry[0])
+        self.awake = [platform for _, platform in awake]
+        heapq.heapify(self.alarms)
+        return offset
+
+    def standing_on(self, left, bottom, width):
+        """The moving platform whose top is within CARRY_PROBE of a box's bottom edge, or None"""
+        for shape in self.grid.query_box(left, bottom - CARRY_PROBE, width, 2 * CARRY_PROBE + 1):
+            platform = self.platforms.get(id(shape))
+            # The top edge, not just anywhere: a platform beside the box doesn't carry it
+            if platform is not None and abs(shape.top - bottom) <= CARRY_PROBE:
+                return platform
+        return None
+
+    def carry(self, platform):
+        """How far (dx, dy) a platform moved this tick, to take what stands on it along"""
+        if platform.moved_tick != self.ticks:
+            return 0, 0
+        return platform.dx, platform.dy
+
+    def draw_rect(self, platform, alpha):
+        """A platform's rect blended between the last two ticks (see World.render_position)"""
+        rect = platform.rect.copy()
+        if platform.moved_tick == self.ticks:
+            rect.x -= round(platform.dx * (1 - alpha))
+            rect.y -= round(platform.dy * (1 - alpha))
+        return rect
+
+
+def make_movers(entries, source="level"):
+    """
+    New moving platforms for a level's "movers" entries, e.g. each time the level is played again.
+
+    Entries look like:
+        {"type": "path", "rect": [x, y, width, height], "path": [[x, y], ...], "speed": 2, "pause": 60}
+        {"type": "crumbling", "rect": [x, y, width, height], "delay": 30, "respawn": 180}
+    with the other keyword arguments of PathPlatform and CrumblingPlatform optional.
+
+    Args:
+        entries (list): The entries, as LevelFile.read_movers returns them.
+        source (str): Where they came from, for error messages.
+
+    Returns:
+        list[tuple]: (platform, awake) pairs for Movers.add.
+    """
+    kinds = {"path": PathPlatform, "crumbling": CrumblingPlatform}
+    movers = []
+    for entry in entries:
+        options = dict(entry)
+        kind = options.pop("type")
+        if kind not in kinds:
+            raise ValueError(f"{source}: unknown mover type {kind!r}, expected one of {', '.join(kinds)}")
+        movers.append((kinds[kind](**options), kind == "path"))
+    return movers
@@ -0,0 +1,233 @@
+import math
+
+import numpy as np
+import pygame
+
+from specialmoves import RollPhase
+
+# Particle colours are indices into a palette, so a whole batch is coloured with one lookup
+DUST = 0
+ROLL_TRAIL = 1
+ROLL_IMPACT = 2
+PALETTE = [(150, 130, 110), (255, 150, 150), (200, 60, 60)]
+
+LEG_LENGTH = 60  # Upper plus lower leg; the feet are this far below the bottom of the body
+
+
+def default_sprite():
+    """A 3x3 plus shape, white on a colorkey background (the particle's colour replaces the white)"""
+    sprite = pygame.Surface((3, 3))
+    sprite.set_colorkey((0, 0, 0))
+    sprite.fill((255, 255, 255), (1, 0, 1, 3))
+    sprite.fill((255, 255, 255), (0, 1, 3, 1))
+    return sprite
+
+
+class ParticleSystem:
+    """
+    A fixed-capacity pool of particles stored as NumPy arrays and updated all at once.
+
+    All the arrays are allocated up front. Emitting takes slots off a free list and
+    dead particles put theirs back, so a running effect never allocates per particle.
+    Drawing stamps the sprite's pixels for every live particle straight into the
+    target's pixel array. For surfaces without a usable pixel array (24-bit), it
+    falls back to one Surface.blits call of per-colour copies of the sprite.
+
+    Args:
+        capacity (int): Most particles alive at once; emits past it are dropped.
+        gravity (float): Added to vertical velocity every tick.
+        drag (float): Velocity multiplier applied every tick.
+        sprite (pygame.Surface): Shape stamped for each particle (non-colorkey pixels), default default_sprite().
+        palette (list): RGB colours the particles' colour indices refer to.
+        seed (int or None): Seed for the random spread of emitted particles.
+    """
+    def __init__(self, capacity=65536, gravity=0.25, drag=0.97, sprite=None, palette=PALETTE, seed=None):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.palette = list(palette)
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.velocity_x = np.zeros(capacity, dtype=np.float32)
+        self.velocity_y = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)  # Ticks left to live
+        self.color = np.zeros(capacity, dtype=np.uint8)  # Index into palette
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Free slots as a stack, lowest slot on top, so live particles stay packed at the front
+        self.free_slots = np.arange(capacity - 1, -1, -1, dtype=np.intp)
+        self.free_count = capacity
+        self.count = 0  # One past the highest slot ever used; updates and draws only look this far
+
+        self.set_sprite(sprite if sprite is not None else default_sprite())
+
+    def __len__(self):
+        return self.capacity - self.free_count
+
+    def set_sprite(self, sprite):
+        """Use a new particle shape"""
+        self.sprite = sprite
+        mask = pygame.mask.from_surface(sprite)
+        width, height = sprite.get_size()
+        self.sprite_offsets = [(x - width // 2, y - height // 2)
+                               for x in range(width) for y in range(height) if mask.get_at((x, y))]
+        self.tinted_sprites = None  # Built on first use by the blits fallback
+
+    def emit(self, x, y, count, speed=(1.0, 3.0), angle=(0.0, 2 * math.pi), life=(20, 40), color=DUST):
+        """
+        Emit a burst of particles from one point.
+
+        Args:
+            x (float): World x to emit from.
+            y (float): World y to emit from.
+            count (int): Number of particles.
+            speed (tuple): Range of starting speeds in pixels per tick.
+            angle (tuple): Range of directions in radians (0 is right, pi / 2 is down).
+            life (tuple): Range of lifetimes in ticks.
+            color (int): Palette index.
+
+        Returns:
+            int: Number of particles actually emitted (fewer when the pool is nearly full).
+        """
+        count = min(count, self.free_count)
+        if count <= 0:
+            return 0
+        slots = self.free_slots[self.free_count - count:self.free_count]
+        self.free_count -= count
+
+        directions = self.rng.uniform(angle[0], angle[1], count)
+        speeds = self.rng.uniform(speed[0], speed[1], count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.velocity_x[slots] = np.cos(directions) * speeds
+        self.velocity_y[slots] = np.sin(directions) * speeds
+        self.life[slots] = self.rng.integers(life[0], life[1], count, endpoint=True)
+        self.color[slots] = color
+        self.alive[slots] = True
+        self.count = max(self.count, int(slots.max()) + 1)
+        return count
+
+    def update(self):
+        """Advance every particle by one tick and recycle the ones that died"""
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        velocity_x, velocity_y = self.velocity_x[:n], self.velocity_y[:n]
+        life, alive = self.life[:n], self.alive[:n]
+
+        # Dead slots are moved too; it's cheaper than masking and they are never drawn
+        velocity_y += self.gravity
+        velocity_x *= self.drag
+        velocity_y *= self.drag
+        x += velocity_x
+        y += velocity_y
+        life -= 1
+
+        died = np.flatnonzero(alive & (life <= 0))
+        if len(died):
+            alive[died] = False
+            self.free_slots[self.free_count:self.free_count + len(died)] = died[::-1]
+            self.free_count += len(died)
+        if self.free_count == self.capacity:
+            self.count = 0
+            self.free_slots[:] = np.arange(self.capacity - 1, -1, -1)
+
+    def clear(self):
+        """Kill every particle"""
+        self.alive[:] = False
+        self.count = 0
+        self.free_slots[:] = np.arange(self.capacity - 1, -1, -1)
+        self.free_count = self.capacity
+
+    def draw(self, screen, offset=(0, 0)):
+        """
+        Draw every live particle.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            offset (tuple): World position of the surface's top-left corner (e.g. camera.offset()).
+
+        Returns:
+            pygame.Rect or None: The area drawn over (for dirty-rect rendering), None if nothing was drawn.
+        """
+        live = np.flatnonzero(self.alive[:self.count])
+        if not len(live):
+            return None
+        xs = self.x[live].astype(np.intp) - offset[0]
+        ys = self.y[live].astype(np.intp) - offset[1]
+        width, height = screen.get_size()
+        on_screen = (xs > -8) & (xs < width + 8) & (ys > -8) & (ys < height + 8)
+        xs, ys, colors = xs[on_screen], ys[on_screen], self.color[live[on_screen]]
+        if not len(xs):
+            return None
+
+        if screen.get_bytesize() == 3:
+            self._blit_sprites(screen, xs, ys, colors)
+        else:
+            mapped = np.array([screen.map_rgb(color) for color in self.palette])[colors]
+            pixels = pygame.surfarray.pixels2d(screen)
+            for dx, dy in self.sprite_offsets:
+                px, py = xs + dx, ys + dy
+                inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[inside], py[inside]] = mapped[inside]
+            del pixels  # Unlocks the surface
+
+        sprite_width, sprite_height = self.sprite.get_size()
+        area = pygame.Rect(int(xs.min()) - sprite_width // 2, int(ys.min()) - sprite_height // 2,
+                           int(xs.max() - xs.min()) + sprite_width, int(ys.max() - ys.min()) + sprite_height)
+        return area.clip(screen.get_rect())
+
+    def _blit_sprites(self, screen, xs, ys, colors):
+        if self.tinted_sprites is None:
+            self.tinted_sprites = []
+            for color in self.palette:
+                tinted = self.sprite.copy()
+                tinted.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+                tinted.set_colorkey(self.sprite.get_colorkey())
+                self.tinted_sprites.append(tinted)
+        sprite_width, sprite_height = self.sprite.get_size()
+        sprites = [self.tinted_sprites[color] for color in colors.tolist()]
+        positions = zip((xs - sprite_width // 2).tolist(), (ys - sprite_height // 2).tolist())
+        screen.blits(zip(sprites, positions), doreturn=False)
+
+
+class PlayerEffects:
+    """
+    Watches the player between frames and emits particles when something happens.
+
+    Dust kicks up when the player lands and each roll phase gives off a burst,
+    so nothing in the simulation has to know particles exist.
+
+    Args:
+        particles (ParticleSystem): Where the effects are emitted.
+    """
+    def __init__(self, particles):
+        self.particles = particles
+        self.was_on_ground = True
+        self.roll_phase = None  # Phase of the roll in progress, None when not rolling
+
+    def update(self, player):
+        feet_x = player.x
+        feet_y = player.y + player.height // 2 + LEG_LENGTH
+
+        if player.on_ground and not self.was_on_ground:
+            # Upwards half circle of dust, both ways along the ground
+            self.particles.emit(feet_x, feet_y, 40, speed=(1.0, 4.0), angle=(math.pi, 2 * math.pi), life=(15, 30),
+                                color=DUST)
+        self.was_on_ground = player.on_ground
+
+        roll = player.roll_state
+        phase = roll.current_phase if roll.is_rolling else None
+        if phase is not None and phase != self.roll_phase:
+            # Trail thrown back against the direction of the roll
+            back = math.pi if roll.roll_direction > 0 else 0.0
+            if phase == RollPhase.HANDS or phase == RollPhase.FINISH:
+                self.particles.emit(feet_x, feet_y, 30, speed=(1.0, 3.0), angle=(math.pi, 2 * math.pi),
+                                    life=(10, 25), color=DUST)
+            else:
+                self.particles.emit(player.x, player.y, 20, speed=(0.5, 2.5), angle=(back - 0.6, back + 0.6),
+                                    life=(10, 20), color=ROLL_IMPACT if phase == RollPhase.ROLLING else ROLL_TRAIL)
+        self.roll_phase = phase
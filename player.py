@@ -1,10 +1,27 @@
 import pygame
 import math
-from specialmoves import RollPhase
+from array import array
+from collections import OrderedDict
+from specialmoves import RollPhase, phase_table
 
 RED = (255, 0, 0)
+POSE_COLORKEY = (255, 0, 255)  # Transparent background of cached poses
+WALK_CYCLE_FRAMES = 60  # The walk animation repeats every 60 frames
+
+def pose_reach(player_width, player_height):
+    """How far (x, y) from the player's position any pose can draw: 60 px of limb plus line width on every side"""
+    return player_width + 70, player_height // 2 + 70
+
+
+def player_bounds(player_x, player_y, player_width, player_height):
+    """A rect covering everything draw_player can draw for a player at (player_x, player_y)"""
+    reach_x, reach_y = pose_reach(player_width, player_height)
+    return pygame.Rect(int(player_x) - reach_x, int(player_y) - reach_y, reach_x * 2, reach_y * 2)
+
 
 class PlayerPart:
+    __slots__ = ("x", "y", "angle", "scale")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -12,22 +29,36 @@ class PlayerPart:
         self.scale = 1.0
 
 class RollAnimator:
+    # The parts are created once and re-posed by reset() and update(), so one animator can draw every roll
+    __slots__ = ("x", "y", "width", "height", "direction", "head", "body", "arms", "legs", "parts", "head_radius",
+                 "limb_thickness")
+
     def __init__(self, player_x, player_y, player_width, player_height, direction):
-        self.x = player_x
-        self.y = player_y
-        self.width = player_width
-        self.height = player_height
-        self.direction = direction
-        
         # Initialize body parts
-        self.head = PlayerPart(player_x, player_y - player_height // 2)
+        self.head = PlayerPart(player_x, player_y)
         self.body = PlayerPart(player_x, player_y)
-        self.arms = [PlayerPart(player_x, player_y) for _ in range(2)]
-        self.legs = [PlayerPart(player_x, player_y) for _ in range(2)]
+        self.arms = (PlayerPart(player_x, player_y), PlayerPart(player_x, player_y))
+        self.legs = (PlayerPart(player_x, player_y), PlayerPart(player_x, player_y))
+        self.parts = (self.head, self.body) + self.arms + self.legs
+        self.reset(player_x, player_y, player_width, player_height, direction)
         
         # Animation parameters
         self.head_radius = 20
         self.limb_thickness = 5
+
+    def reset(self, player_x, player_y, player_width, player_height, direction):
+        """Stand the parts back at the start of a roll for a player at (player_x, player_y)"""
+        self.x = player_x
+        self.y = player_y
+        self.width = player_width
+        self.height = player_height
+        self.direction = direction
+        for part in self.parts:
+            part.x = player_x
+            part.y = player_y
+            part.angle = 0
+            part.scale = 1.0
+        self.head.y = player_y - player_height // 2
     
     def _lerp(self, start, end, t):
         """Linear interpolation between start and end values"""
@@ -148,18 +179,13 @@ class RollAnimator:
             
         self.body.scale = self._lerp(0.5, 1.0, progress)
     
+    # Pose function of each phase, indexed by RollPhase
+    PHASE_UPDATES = (_update_leap, _update_hands, _update_tuck, _update_rolling, _update_finish)
+
     def update(self, phase, phase_progress):
         """Update all body parts based on current phase"""
-        update_funcs = {
-            RollPhase.LEAP: self._update_leap,
-            RollPhase.HANDS: self._update_hands,
-            RollPhase.TUCK: self._update_tuck,
-            RollPhase.ROLLING: self._update_rolling,
-            RollPhase.FINISH: self._update_finish
-        }
-        
-        if phase in update_funcs:
-            update_funcs[phase](phase_progress)
+        if 0 <= phase < RollPhase.COUNT:
+            self.PHASE_UPDATES[phase](self, phase_progress)
     
     def draw(self, screen):
         """Draw the player in current pose"""
@@ -207,148 +233,305 @@ class RollAnimator:
         pygame.draw.circle(screen, RED, (int(self.head.x), int(self.head.y)), 
                          self.head_radius)
 
-def draw_player(screen, player_x, player_y, player_height, walk_angle, is_walking_left, player_width, time, is_walking_right, on_ground, roll_state=None):
+def pose_scratch(screen, player_width, player_height):
+    """A surface in screen's pixel format that render_pose can draw any pose of this size of player on"""
+    reach_x, reach_y = pose_reach(player_width, player_height)
+    return pygame.Surface((reach_x * 2, reach_y * 2), 0, screen)
+
+
+def render_pose(scratch, player_width, player_height, facing, time):
+    """
+    Draw one walking or idle pose with draw_standing_pose and cut it out as a sprite.
+
+    Args:
+        scratch (pygame.Surface): From pose_scratch, for the same size of player; its contents are overwritten.
+        player_width (int): Body width.
+        player_height (int): Body height.
+        facing (int): -1 walking left, 1 walking right or 0 standing still (see rig_facing).
+        time (float): Ticks into the walk cycle.
+
+    Returns:
+        tuple: The colorkeyed sprite, and the x and y offset of its top-left corner from the player's position.
+    """
+    origin_x, origin_y = pose_reach(player_width, player_height)
+    scratch.fill(POSE_COLORKEY)
+    draw_standing_pose(scratch, origin_x, origin_y, player_height, facing == -1, player_width, time, facing == 1)
+
+    # Keep only the pixels the pose covers; RLE lets the blit skip the transparent runs
+    area = scratch.get_bounding_rect()
+    sprite = scratch.subsurface(area).copy()
+    sprite.set_colorkey(POSE_COLORKEY, pygame.RLEACCEL)
+    return sprite, area.x - origin_x, area.y - origin_y
+
+
+class PoseCache:
+    """
+    Pre-rendered walking and idle poses, blitted instead of redrawn every frame.
+
+    The walk cycle repeats every WALK_CYCLE_FRAMES frames and the idle pose never
+    changes, so each (walk phase, direction) pose is drawn once, cropped to the
+    pixels it covers and kept as a run-length encoded sprite. When the cache is
+    full the least recently used pose is evicted, and everything is thrown away if
+    the player's size changes.
+
+    Args:
+        max_poses (int): How many poses to keep (a full walk cycle both ways plus idle is 121).
+    """
+    def __init__(self, max_poses=128):
+        self.max_poses = max_poses
+        self.poses = OrderedDict()  # (direction, phase) -> (sprite, x offset, y offset), least recently used first
+        self.player_size = None  # (player_width, player_height) the poses were drawn for
+        self.scratch = None
+
+    def invalidate(self):
+        """Forget every cached pose"""
+        self.poses.clear()
+        self.player_size = None
+        self.scratch = None
+
+    def _render(self, screen, key, player_width, player_height):
+        if self.scratch is None:
+            self.scratch = pose_scratch(screen, player_width, player_height)
+        direction, phase = key
+        return render_pose(self.scratch, player_width, player_height, direction, phase)
+
+    def prerender(self, screen, player_width, player_height, cancelled=None):
+        """
+        Render the idle pose and the whole walk cycle both ways now.
+
+        Meant for a spare cache on a background thread (see startup.WarmUp), which
+        the cache in use then adopts; screen is only used for its pixel format.
+        Stops early once cancelled (a threading.Event) is set.
+        """
+        self.invalidate()
+        self.player_size = (player_width, player_height)
+        keys = [(0, 0)] + [(direction, phase) for direction in (1, -1) for phase in range(WALK_CYCLE_FRAMES)]
+        for key in keys[:self.max_poses]:
+            if cancelled is not None and cancelled.is_set():
+                return
+            self.poses[key] = self._render(screen, key, player_width, player_height)
+
+    def adopt(self, other):
+        """Take another cache's poses, if they were drawn for the same size of player"""
+        if self.player_size is None:
+            self.invalidate()
+            self.player_size = other.player_size
+        if other.player_size != self.player_size:
+            return
+        for key, pose in other.poses.items():
+            if key not in self.poses and len(self.poses) < self.max_poses:
+                self.poses[key] = pose
+
+    def draw(self, screen, player_x, player_y, player_width, player_height, time, is_walking_left, is_walking_right):
+        """Blit the pose for this frame, rendering it first if it isn't cached"""
+        if self.player_size != (player_width, player_height):
+            self.invalidate()
+            self.player_size = (player_width, player_height)
+
+        if is_walking_left or is_walking_right:
+            key = (-1 if is_walking_left else 1, time % WALK_CYCLE_FRAMES)
+        else:
+            key = (0, 0)  # Idle pose doesn't depend on time
+
+        pose = self.poses.get(key)
+        if pose is not None:
+            self.poses.move_to_end(key)
+        else:
+            if len(self.poses) >= self.max_poses:
+                self.poses.popitem(last=False)
+            pose = self._render(screen, key, player_width, player_height)
+            self.poses[key] = pose
+
+        sprite, offset_x, offset_y = pose
+        # Placed the way draw_standing_pose places the figure, so the pixels match drawing it directly
+        screen.blit(sprite, (round(player_x) + offset_x, round(player_y) + offset_y))
+
+
+class RollKeyframes:
+    """
+    Every frame of the roll baked into flat keyframe tables, so drawing a roll is a lookup.
+
+    A roll only ever shows sum(phase_durations) distinct frames per direction, so
+    each one is posed once with RollAnimator at the origin and stored as offsets
+    from the player's position. Drawing then adds the player's position to the
+    stored numbers in the same order the animator does, so the pixels match.
+    The tables are rebuilt if the player's size or the phase durations change.
+    """
+    # Layout of one frame: 2 legs and 2 arms as (start x, start y, end dx, end dy),
+    # the body as (half width, half height, width, height) and the head as (x, y)
+    LEGS = 0
+    BODY = 8
+    ARMS = 12
+    HEAD = 20
+    FRAME_SIZE = 22
+
+    def __init__(self):
+        self.player_width = None
+        self.player_height = None
+        self.phase_durations = None
+        self.tables = {}  # roll_direction -> array of FRAME_SIZE floats per frame
+        self.phase_starts = ()  # Index of each phase's first frame, indexed by phase
+
+    def bake(self, player_width, player_height, phase_durations):
+        """Pose every (direction, phase, phase_timer) frame of a roll and store it"""
+        self.player_width = player_width
+        self.player_height = player_height
+        self.phase_durations = phase_durations = phase_table(phase_durations)
+        self.phase_starts = tuple(sum(phase_durations[:phase]) for phase in range(RollPhase.COUNT))
+
+        limb_length = player_height // 3
+        animator = RollAnimator(0, 0, player_width, player_height, 1)
+        for direction in (1, -1):
+            table = array("d")
+            for phase in range(RollPhase.COUNT):
+                duration = phase_durations[phase]
+                # The timer counts down from the duration and the roll moves on when it hits 0
+                for phase_timer in range(duration, 0, -1):
+                    animator.reset(0, 0, player_width, player_height, direction)
+                    animator.update(phase, 1 - (phase_timer / duration))
+                    for leg in animator.legs:
+                        table.extend((leg.x, leg.y, math.cos(math.radians(leg.angle)) * limb_length,
+                                      math.sin(math.radians(leg.angle)) * limb_length))
+                    body_width = player_width * animator.body.scale
+                    body_height = player_height * animator.body.scale
+                    table.extend((body_width // 2, body_height // 2, body_width, body_height))
+                    for arm in animator.arms:
+                        table.extend((arm.x, arm.y, math.cos(math.radians(arm.angle)) * limb_length,
+                                      math.sin(math.radians(arm.angle)) * limb_length))
+                    table.extend((animator.head.x, animator.head.y))
+            self.tables[direction] = table
+
+    def draw(self, screen, player_x, player_y, player_width, player_height, roll_state):
+        """Draw the current frame of roll_state's roll"""
+        durations = roll_state.phase_durations
+        if (player_width != self.player_width or player_height != self.player_height
+                or durations != self.phase_durations):
+            self.bake(player_width, player_height, durations)
+
+        phase = roll_state.current_phase
+        table = self.tables[roll_state.roll_direction]
+        i = (self.phase_starts[phase] + durations[phase] - roll_state.phase_timer) * self.FRAME_SIZE
+
+        # Same drawing order as RollAnimator.draw: legs -> body -> arms -> head
+        for limb in (i + self.LEGS, i + self.LEGS + 4):
+            start_x = player_x + table[limb]
+            start_y = player_y + table[limb + 1]
+            pygame.draw.line(screen, RED, (start_x, start_y),
+                             (start_x + table[limb + 2], start_y + table[limb + 3]), 5)
+
+        body = i + self.BODY
+        pygame.draw.rect(screen, RED, pygame.Rect(player_x - table[body], player_y - table[body + 1],
+                                                  table[body + 2], table[body + 3]))
+
+        for limb in (i + self.ARMS, i + self.ARMS + 4):
+            start_x = player_x + table[limb]
+            start_y = player_y + table[limb + 1]
+            pygame.draw.line(screen, RED, (start_x, start_y),
+                             (start_x + table[limb + 2], start_y + table[limb + 3]), 5)
+
+        head = i + self.HEAD
+        pygame.draw.circle(screen, RED, (int(player_x + table[head]), int(player_y + table[head + 1])), 20)
+
+
+pose_cache = PoseCache()
+roll_keyframes = RollKeyframes()
+roll_animator = RollAnimator(0, 0, 7, 50, 1)  # Re-posed for every roll drawn without keyframes
+
+
+def draw_player(screen, player_x, player_y, player_height, walk_angle, is_walking_left, player_width, time, is_walking_right, on_ground, roll_state=None, pose_cache=pose_cache, roll_keyframes=roll_keyframes):
+    if roll_state and roll_state.is_rolling and roll_keyframes is not None:
+        # Rolls are played back from the baked keyframe tables
+        roll_keyframes.draw(screen, player_x, player_y, player_width, player_height, roll_state)
+        return
+
     if roll_state and roll_state.is_rolling:
         # Calculate phase progress (0 to 1)
         phase_progress = 1 - (roll_state.phase_timer / roll_state.phase_durations[roll_state.current_phase])
         
-        # Create and update animator
-        animator = RollAnimator(player_x, player_y, player_width, player_height, roll_state.roll_direction)
-        animator.update(roll_state.current_phase, phase_progress)
-        animator.draw(screen)
+        # Re-pose the shared animator
+        roll_animator.reset(player_x, player_y, player_width, player_height, roll_state.roll_direction)
+        roll_animator.update(roll_state.current_phase, phase_progress)
+        roll_animator.draw(screen)
         return
-        
-    # Normal player drawing code
-    pygame.draw.circle(screen, RED, (player_x, player_y - player_height // 2 - 20), 20)
-    pygame.draw.rect(screen, RED, (player_x - player_width // 2, player_y - player_height // 2, player_width, player_height))
-
-    # Arms and legs (same as before)
-    arm_length = 30
-    arm_offset = 5  # Reduced from 10 to bring arms closer to body
-    upper_leg_length = 30
-    lower_leg_length = 30
-    leg_offset = 10
-
-    # Calculate the base position for arms and legs
-    base_y = player_y - player_height // 2
-
-    # Create a walking cycle using sine waves
-    arm_swing = math.sin(time * 2 * math.pi / 60) if (is_walking_left or is_walking_right) else 0  # Only swing when walking
-    leg_swing = math.sin(time * 2 * math.pi / 60) if (is_walking_left or is_walking_right) else 0  # Only swing when walking
-
-    # Arm calculations
-    upper_arm_length = 30
-    lower_arm_length = 30
-    left_rest_angle = 120  # 120 degrees from vertical
-    right_rest_angle = 60  # 120 degrees from vertical
-    swing_range = 30  # Amount of swing during running
-
-    # Left arm
-    if is_walking_left or is_walking_right:
-        if is_walking_left:
-            
-            left_upper_arm_angle = math.radians(-270 + (swing_range * arm_swing))
-            left_lower_arm_angle = left_upper_arm_angle + math.radians(120)
-        else:  # walking right
-            
-            left_upper_arm_angle = math.radians(120 + (-swing_range * arm_swing))
-            left_lower_arm_angle = left_upper_arm_angle - math.radians(120)
+
+    # Walking and idle poses come from the sprite cache; pass pose_cache=None to draw them directly
+    if pose_cache is not None:
+        pose_cache.draw(screen, player_x, player_y, player_width, player_height, time, is_walking_left, is_walking_right)
     else:
-        left_upper_arm_angle = math.radians(left_rest_angle)
-        left_lower_arm_angle = left_upper_arm_angle  # Aligned with upper arm
-
-    left_upper_arm_x = player_x - arm_offset + math.cos(left_upper_arm_angle) * upper_arm_length
-    left_upper_arm_y = base_y + math.sin(left_upper_arm_angle) * upper_arm_length
-
-    left_lower_arm_x = left_upper_arm_x + math.cos(left_lower_arm_angle) * lower_arm_length
-    left_lower_arm_y = left_upper_arm_y + math.sin(left_lower_arm_angle) * lower_arm_length
-
-    # Right arm
-    if is_walking_left or is_walking_right:
-        if is_walking_left:
-            # Arms on left side when running left (rotated 90° CCW)
-            right_upper_arm_angle = math.radians(-270 + (-swing_range * arm_swing))  # -120° + 90° = -30°
-            right_lower_arm_angle = right_upper_arm_angle + math.radians(120)
-        else:  # walking right
-            # Arms on right side when running right
-            right_upper_arm_angle = math.radians(120 + (swing_range * arm_swing))
-            right_lower_arm_angle = right_upper_arm_angle - math.radians(120)
+        draw_standing_pose(screen, player_x, player_y, player_height, is_walking_left, player_width, time, is_walking_right)
+
+
+# The walking stick figure's rig. Each limb is two 30 px segments starting at the top of the
+# body (arms) or the bottom (legs): (x offset of its start, -1 for the top or 1 for the bottom,
+# x offset the upper segment is swung from, which swing signal drives it: 0 for the walk cycle's
+# sine, 1 for the same half a cycle on)
+LIMBS = (
+    (-5, -1, -5, 0),  # Left arm
+    (5, -1, 5, 0),    # Right arm
+    (0, 1, -5, 0),    # Leg 1
+    (0, 1, 5, 1),     # Leg 2 (opposite phase)
+)
+UPPER_LIMB_LENGTH = 30
+LOWER_LIMB_LENGTH = 30
+
+# Per facing (0 standing still, -1 walking left, 1 walking right), each limb's angles: the upper
+# segment is at base + swing * signal degrees, and the lower one at the upper's angle plus bend
+# degrees plus knee * abs(signal) * pi / 6 (a knee that straightens mid-stride)
+LIMB_ANGLES = {
+    0: ((120, 0, 0, 0), (60, 0, 0, 0), (90, 0, 0, 0), (90, 0, 0, 0)),
+    -1: ((-270, 30, 120, 0), (-270, -30, 120, 0), (90, -30, 0, -1), (90, -30, 0, -1)),
+    1: ((120, -30, -120, 0), (120, 30, -120, 0), (90, 30, 0, 1), (90, 30, 0, 1)),
+}
+
+
+def rig_facing(is_walking_left, is_walking_right):
+    """The rig's facing: -1 walking left, 1 walking right, 0 standing still"""
+    return -1 if is_walking_left else 1 if is_walking_right else 0
+
+
+def limb_segments(player_x, player_y, player_height, facing, time):
+    """
+    Forward kinematics of the rig for one stick figure.
+
+    Returns:
+        list[tuple]: (start x, start y, joint x, joint y, end x, end y) of each limb in LIMBS order.
+    """
+    if facing:
+        cycle = time * 2 * math.pi / WALK_CYCLE_FRAMES
+        signals = (math.sin(cycle), math.sin(cycle + math.pi))
     else:
-        # Resting position: 120 degrees from vertical
-        right_upper_arm_angle = math.radians(right_rest_angle)
-        right_lower_arm_angle = right_upper_arm_angle  # Aligned with upper arm
-
-    # Calculate right arm positions
-    right_upper_arm_x = player_x + arm_offset + math.cos(right_upper_arm_angle) * upper_arm_length
-    right_upper_arm_y = base_y + math.sin(right_upper_arm_angle) * upper_arm_length
-
-    right_lower_arm_x = right_upper_arm_x + math.cos(right_lower_arm_angle) * lower_arm_length
-    right_lower_arm_y = right_upper_arm_y + math.sin(right_lower_arm_angle) * lower_arm_length
-
-    # Draw the arms
-    # Left arm
-    pygame.draw.line(screen, RED, (player_x - arm_offset, base_y), (left_upper_arm_x, left_upper_arm_y), 5)  # Upper arm
-    pygame.draw.line(screen, RED, (left_upper_arm_x, left_upper_arm_y), (left_lower_arm_x, left_lower_arm_y), 5)  # Lower arm
-
-    # Right arm
-    pygame.draw.line(screen, RED, (player_x + arm_offset, base_y), (right_upper_arm_x, right_upper_arm_y), 5)  # Upper arm
-    pygame.draw.line(screen, RED, (right_upper_arm_x, right_upper_arm_y), (right_lower_arm_x, right_lower_arm_y), 5)  # Lower arm
-
-    # Calculate leg positions
-    leg_base_x = player_x  # Center the legs under the character
-    leg_base_y = player_y + player_height // 2  # Start from bottom of body
-
-    # Walking logic for legs
-    if is_walking_left or is_walking_right:
-        # Create two offset sine waves for the legs (one is half a cycle ahead)
-        leg1_phase = math.sin(time * 2 * math.pi / 60)  # First leg
-        leg2_phase = math.sin((time * 2 * math.pi / 60) + math.pi)  # Second leg (opposite phase)
-        
-        if is_walking_left:
-            # Left leg
-            # Base angle is 90° (vertical up), swing ±30°
-            upper_leg1_angle = math.radians(90 + (-30 * leg1_phase))  # Negative for left walking
-            # Lower leg straightens as it moves through stride
-            knee_bend1 = abs(leg1_phase) * math.pi / 6  # Max 30° bend, straightens in middle
-            lower_leg1_angle = upper_leg1_angle - knee_bend1  # Subtract for counterclockwise bend
-            
-            # Right leg (opposite phase)
-            upper_leg2_angle = math.radians(90 + (-30 * leg2_phase))
-            knee_bend2 = abs(leg2_phase) * math.pi / 6
-            lower_leg2_angle = upper_leg2_angle - knee_bend2
-        else:  # walking right
-            # Right leg
-            upper_leg1_angle = math.radians(90 + (30 * leg1_phase))  # Positive for right walking
-            knee_bend1 = abs(leg1_phase) * math.pi / 6
-            lower_leg1_angle = upper_leg1_angle + knee_bend1  # Add for clockwise bend
-            
-            # Left leg (opposite phase)
-            upper_leg2_angle = math.radians(90 + (30 * leg2_phase))
-            knee_bend2 = abs(leg2_phase) * math.pi / 6
-            lower_leg2_angle = upper_leg2_angle + knee_bend2
-    else:  # Standing still
-        # Set legs to vertical up position
-        upper_leg1_angle = math.radians(90)  # Vertical up
-        lower_leg1_angle = upper_leg1_angle
-        upper_leg2_angle = math.radians(90)
-        lower_leg2_angle = upper_leg2_angle
-
-    # Calculate the positions of the upper and lower legs with slight horizontal offset
-    upper_leg1_x = leg_base_x - 5 + math.cos(upper_leg1_angle) * upper_leg_length
-    upper_leg1_y = leg_base_y + math.sin(upper_leg1_angle) * upper_leg_length
-
-    lower_leg1_x = upper_leg1_x + math.cos(lower_leg1_angle) * lower_leg_length
-    lower_leg1_y = upper_leg1_y + math.sin(lower_leg1_angle) * lower_leg_length
-
-    upper_leg2_x = leg_base_x + 5 + math.cos(upper_leg2_angle) * upper_leg_length
-    upper_leg2_y = leg_base_y + math.sin(upper_leg2_angle) * upper_leg_length
-
-    lower_leg2_x = upper_leg2_x + math.cos(lower_leg2_angle) * lower_leg_length
-    lower_leg2_y = upper_leg2_y + math.sin(lower_leg2_angle) * lower_leg_length
-
-    # Draw the upper and lower legs
-    pygame.draw.line(screen, RED, (leg_base_x, leg_base_y), (upper_leg1_x, upper_leg1_y), 5)  # Left upper leg
-    pygame.draw.line(screen, RED, (upper_leg1_x, upper_leg1_y), (lower_leg1_x, lower_leg1_y), 5)  # Left lower leg
-
-    pygame.draw.line(screen, RED, (leg_base_x, leg_base_y), (upper_leg2_x, upper_leg2_y), 5)  # Right upper leg
-    pygame.draw.line(screen, RED, (upper_leg2_x, upper_leg2_y), (lower_leg2_x, lower_leg2_y), 5)  # Right lower leg
\ No newline at end of file
+        signals = (0, 0)  # Standing still doesn't swing
+    half_height = player_height // 2
+    segments = []
+    for (start_dx, side, swing_dx, signal), (base, swing, bend, knee) in zip(LIMBS, LIMB_ANGLES[facing]):
+        phase = signals[signal]
+        upper_angle = math.radians(base + swing * phase)
+        lower_angle = upper_angle + math.radians(bend) + knee * abs(phase) * math.pi / 6
+        root_y = player_y + side * half_height
+        joint_x = player_x + swing_dx + math.cos(upper_angle) * UPPER_LIMB_LENGTH
+        joint_y = root_y + math.sin(upper_angle) * UPPER_LIMB_LENGTH
+        segments.append((player_x + start_dx, root_y, joint_x, joint_y,
+                         joint_x + math.cos(lower_angle) * LOWER_LIMB_LENGTH,
+                         joint_y + math.sin(lower_angle) * LOWER_LIMB_LENGTH))
+    return segments
+
+
+def draw_standing_pose(screen, player_x, player_y, player_height, is_walking_left, player_width, time, is_walking_right):
+    """
+    Draw the walking or idle stick figure with pygame.draw calls.
+
+    The figure goes on the nearest whole pixel and its limb points are rounded
+    relative to that, so a pose comes out the same wherever it is drawn (which is
+    what lets PoseCache blit one sprite everywhere).
+    """
+    x = round(player_x)
+    y = round(player_y)
+    pygame.draw.circle(screen, RED, (x, y - player_height // 2 - 20), 20)
+    pygame.draw.rect(screen, RED, (x - player_width // 2, y - player_height // 2, player_width, player_height))
+
+    # Arms then legs, each as an upper and a lower segment
+    segments = limb_segments(0, 0, player_height, rig_facing(is_walking_left, is_walking_right), time)
+    for start_x, start_y, joint_x, joint_y, end_x, end_y in segments:
+        joint = (x + round(joint_x), y + round(joint_y))
+        pygame.draw.line(screen, RED, (x + round(start_x), y + round(start_y)), joint, 5)
+        pygame.draw.line(screen, RED, joint, (x + round(end_x), y + round(end_y)), 5)
@@ -0,0 +1,222 @@
+import math
+import os
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+OVERLAY_COLOR = (0, 90, 0)
+OVERLAY_BACKGROUND = (235, 235, 235)
+
+
+class _NullStage:
+    """What stage() hands out while profiling is off: entering and leaving it does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _StageTimer:
+    """Times one named stage; one is made per name and reused every frame"""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.current[self.name] = self.profiler.current.get(self.name, 0.0) + perf_counter() - self.start
+        return False
+
+
+def percentile(sorted_samples, fraction):
+    """The smallest sample that at least `fraction` of sorted_samples are less than or equal to (nearest rank)"""
+    if not sorted_samples:
+        return 0.0
+    # Rounded first, so that float error (0.07 * 100 is 7.000000000000001) can't push the rank up by one
+    rank = math.ceil(round(fraction * len(sorted_samples), 9))
+    return sorted_samples[max(0, rank - 1)]
+
+
+class FrameProfiler:
+    """
+    Named per-stage frame timers with rolling percentiles, an overlay and exports.
+
+    Wrap each stage of the game loop in `with profiler.stage("name"):` and call
+    begin_frame()/end_frame() around the whole frame. While disabled, stage()
+    returns a shared do-nothing context manager, so leaving the calls in costs
+    next to nothing.
+
+    Args:
+        enabled (bool): Start with timing on.
+        history (int): How many recent frames the percentiles are taken over.
+        snapshot_dir (str): Where cProfile snapshots of slow frames are written.
+    """
+    def __init__(self, enabled=False, history=300, snapshot_dir="."):
+        self.enabled = enabled
+        self.history = history
+        self.snapshot_dir = snapshot_dir
+        self.samples = {}  # stage name -> deque of recent times in seconds ("frame" is the whole frame)
+        self.timers = {}  # stage name -> its reusable _StageTimer
+        self.current = {}  # stage name -> time spent in it so far this frame
+        self.frame_start = 0.0
+        self.frames = 0
+
+        # cProfile capture of slow frames, armed with capture_slow_frames()
+        self.slow_frame_ms = None
+        self.snapshots_wanted = 0
+        self.snapshots_written = []
+        self.cprofile = None
+
+        self.font = None
+
+    def toggle(self):
+        """Turn timing on or off (the overlay shows while it is on)"""
+        self.enabled = not self.enabled
+        if not self.enabled and self.cprofile is not None:
+            # Switched off mid-capture: end_frame won't run for this frame, so stop the profile and drop it
+            self.cprofile.disable()
+            self.cprofile = None
+        # Switched on mid-frame: time the rest of this frame rather than since some old frame
+        self.frame_start = perf_counter()
+        self.current.clear()
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame"""
+        if not self.enabled:
+            return NULL_STAGE
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = _StageTimer(self, name)
+        return timer
+
+    def record(self, name, seconds):
+        """Add a measurement that isn't a timed block (e.g. a latency) to this frame"""
+        if self.enabled:
+            self.current[name] = seconds
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = perf_counter()
+        if self.snapshots_wanted:
+            import cProfile  # Only needed once slow frame capture is armed
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        frame_time = perf_counter() - self.frame_start
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            if frame_time * 1000 >= self.slow_frame_ms:
+                self._write_snapshot(frame_time)
+            self.cprofile = None
+
+        self.current["frame"] = frame_time
+        for name, seconds in self.current.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.history)
+            samples.append(seconds)
+        self.current.clear()
+        self.frames += 1
+
+    def capture_slow_frames(self, threshold_ms=1000 / 60, count=1):
+        """
+        Write a cProfile snapshot of each of the next `count` frames slower than threshold_ms.
+
+        Every frame is profiled while armed (there's no telling in advance which will
+        be slow), so only arm it while hunting for a hitch.
+        """
+        self.slow_frame_ms = threshold_ms
+        self.snapshots_wanted = count
+        if not self.enabled:
+            self.toggle()
+
+    def _write_snapshot(self, frame_time):
+        path = os.path.join(self.snapshot_dir, f"slow_frame_{self.frames}_{frame_time * 1000:.1f}ms.prof")
+        self.cprofile.dump_stats(path)
+        self.snapshots_written.append(path)
+        self.snapshots_wanted -= 1
+
+    def summary(self):
+        """
+        Rolling statistics per stage.
+
+        Returns:
+            dict: stage name -> {"p50", "p95", "p99", "max"} in milliseconds, slowest stages first.
+        """
+        stats = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                "p50": percentile(ordered, 0.50) * 1000,
+                "p95": percentile(ordered, 0.95) * 1000,
+                "p99": percentile(ordered, 0.99) * 1000,
+                "max": ordered[-1] * 1000,
+            }
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["p50"]))
+
+    def export_csv(self, path):
+        """Write the recent per-frame times of every stage (ms), one row per frame"""
+        import csv
+
+        names = list(self.samples)
+        length = max((len(samples) for samples in self.samples.values()), default=0)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_number"] + names)
+            for row in range(length):
+                values = []
+                for name in names:
+                    samples = self.samples[name]
+                    # Stages that didn't run every frame have fewer samples; line them up at the latest frame
+                    index = row - (length - len(samples))
+                    values.append(f"{samples[index] * 1000:.4f}" if index >= 0 else "")
+                writer.writerow([self.frames - length + row] + values)
+
+    def export_json(self, path):
+        """Write the percentile summary plus the raw recent samples (ms)"""
+        import json
+
+        with open(path, "w") as file:
+            json.dump({
+                "frames": self.frames,
+                "summary": self.summary(),
+                "samples": {name: [seconds * 1000 for seconds in samples] for name, samples in self.samples.items()},
+            }, file, indent=2)
+
+    def draw_overlay(self, screen, position=(10, 10)):
+        """
+        Draw a p50/p95/p99 table of the stages onto screen.
+
+        Returns:
+            pygame.Rect: The area drawn over (for dirty-rect rendering).
+        """
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", 14)
+
+        lines = [f"{'stage':<12}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<12}{stats['p50']:>7.2f}{stats['p95']:>7.2f}{stats['p99']:>7.2f}")
+
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 8
+        area = pygame.Rect(position[0], position[1], width, line_height * len(lines) + 8)
+        screen.fill(OVERLAY_BACKGROUND, area)
+        for i, line in enumerate(lines):
+            screen.blit(self.font.render(line, True, OVERLAY_COLOR), (area.x + 4, area.y + 4 + i * line_height))
+        return area
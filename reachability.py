@@ -0,0 +1,249 @@
+import bisect
+import math
+import sys
+from collections import deque
+
+from replay import UNPACKED, RIGHT, JUMP, ROLL
+from spatial import SpatialGrid, shape_rect
+from world import World, Physics
+
+# Ways of leaving a platform, cheapest first; an edge is labelled with the first one that makes it
+FALL = "fall"  # Walk off the edge
+WALK = "walk"  # Jump while walking
+ROLL_JUMP = "roll"  # Jump and roll at the same time for the extra distance
+STATES = (FALL, WALK, ROLL_JUMP)
+
+GROUND = "ground"  # Node for the floor at the level's ground_level
+OPEN_AIR = 1e9  # Ground level for tracing arcs, far enough down to never be reached
+REACH_BAND = 256  # Height of each slice of the level searched for landing spots
+
+
+class MovementEnvelope:
+    """
+    Where the player can get to from a standing start, for each way of leaving a platform.
+
+    Each state's arc is traced once by running the real World rules in empty space
+    (holding right), and it is extended whenever a deeper drop is asked about. For a
+    given drop, the landing tick is then one bisect and the furthest horizontal
+    distance is a table lookup.
+
+    Args:
+        physics (Physics): Movement constants.
+        player_width (int): Width of the player's collision box.
+        player_height (int): Height of the player's collision box.
+    """
+    def __init__(self, physics, player_width=7, player_height=50):
+        self.physics = physics
+        self.player_width = player_width
+        self.player_height = player_height
+        self.worlds = {}
+        self.dx = {}  # state -> horizontal distance after each tick
+        self.dy = {}  # state -> vertical offset after each tick (negative is up)
+        self.apex_tick = {}  # state -> tick of the highest point
+        for state in STATES:
+            world = World([], 0, 0, OPEN_AIR, physics)
+            world.player.on_ground = True
+            self.worlds[state] = world
+            self.dx[state] = [0.0]
+            self.dy[state] = [0.0]
+            first = RIGHT | (JUMP if state != FALL else 0) | (ROLL if state == ROLL_JUMP else 0)
+            self._trace(state, first)
+            while self._rising(state):
+                self._trace(state, RIGHT)
+            self.apex_tick[state] = min(range(len(self.dy[state])), key=self.dy[state].__getitem__)
+
+    def _trace(self, state, bits):
+        world = self.worlds[state]
+        world.tick(UNPACKED[bits])
+        self.dx[state].append(world.player.x)
+        self.dy[state].append(world.player.y)
+
+    def _rising(self, state):
+        world = self.worlds[state]
+        return world.player.is_jumping or world.player.velocity_y < 0 or world.player.roll_state.is_rolling
+
+    def apex(self, state):
+        """How high (pixels, positive) the player's feet get above where they started"""
+        return -self.dy[state][self.apex_tick[state]]
+
+    def reach(self, state, drop):
+        """
+        Furthest horizontal distance at which the player can land `drop` pixels below where they started.
+
+        Args:
+            state (str): One of STATES.
+            drop (float): Height of the take-off surface minus height of the landing one, in screen y
+                (negative lands higher up).
+
+        Returns:
+            float or None: The distance, or None if the arc never comes down at that height.
+        """
+        if drop < -self.apex(state):
+            return None
+        dy = self.dy[state]
+        while dy[-1] < drop:
+            self._trace(state, RIGHT)
+        # Only the falling part of the arc can land, and it only goes down, so it can be bisected
+        tick = bisect.bisect_left(dy, drop, lo=self.apex_tick[state])
+        return self.dx[state][tick]
+
+    def reach_table(self, state, first_drop, last_drop):
+        """reach() for every whole-pixel drop from first_drop to last_drop, as a list"""
+        return [self.reach(state, drop) for drop in range(first_drop, last_drop + 1)]
+
+
+_envelopes = {}  # (physics key, player size) -> MovementEnvelope
+
+
+def envelope_for(physics, player_width=7, player_height=50):
+    """The MovementEnvelope for some physics, traced once and then cached"""
+    key = (physics.key(), player_width, player_height)
+    envelope = _envelopes.get(key)
+    if envelope is None:
+        envelope = _envelopes[key] = MovementEnvelope(physics, player_width, player_height)
+    return envelope
+
+
+class Reachability:
+    """
+    Platform-to-platform reachability graph of a level, built from the movement envelope.
+
+    For each platform, only the platforms inside the area its jumps and falls can
+    cover are looked up in the level's SpatialGrid, a band of heights at a time. Each of those is then
+    checked against the envelope in constant time, so a level of thousands of
+    platforms is checked in milliseconds. Arcs are checked against the landing
+    platform only, not against obstacles along the way, so an edge means "in range",
+    not "clear flight path".
+
+    Graphs are cached per physics; changing any constant (even on the same Physics
+    object) gives a different key and a fresh graph.
+
+    Args:
+        level (SpatialGrid or iterable): The level's platforms (e.g. World.level, or a list to get a grid
+            sized for these queries).
+        ground_level (float): The level's ground_level (lowest player y).
+        player_width (int): Width of the player's collision box.
+        player_height (int): Height of the player's collision box.
+    """
+    def __init__(self, level, ground_level, player_width=7, player_height=50):
+        # Jump-sized queries walk far fewer cells of a coarser grid than the game's
+        self.level = level if isinstance(level, SpatialGrid) else SpatialGrid(level, REACH_BAND)
+        self.ground_level = ground_level
+        self.player_width = player_width
+        self.player_height = player_height
+        self.graphs = {}  # physics key -> {node: {node: state}}
+
+    def invalidate(self):
+        """Forget every cached graph, after the level's platforms change"""
+        self.graphs.clear()
+
+    def graph(self, physics=None):
+        """
+        The reachability graph for some physics (the game's by default).
+
+        Returns:
+            dict: node -> {node it can reach: cheapest STATES entry that gets there}. Nodes are
+            (x, y, width, height) platform tuples plus GROUND.
+        """
+        physics = physics if physics is not None else Physics()
+        key = physics.key()
+        graph = self.graphs.get(key)
+        if graph is None:
+            graph = self.graphs[key] = self._build(envelope_for(physics, self.player_width, self.player_height))
+        return graph
+
+    def _build(self, envelope):
+        ground_top = self.ground_level + self.player_height  # Where the feet are when on the ground
+        rects = [shape_rect(shape) for shape in self.level]
+        graph = {GROUND: {}}
+        if not rects:
+            return graph
+
+        # Reach of every state for every whole-pixel drop the level has, so each
+        # candidate is a few list lookups (platform edges are whole pixels)
+        rise = math.ceil(max(envelope.apex(state) for state in STATES))  # Index of a drop of 0
+        deepest = ground_top - min(rect.top for rect in rects)
+        tables = [envelope.reach_table(state, -rise, deepest) for state in STATES]
+        furthest = tables[-1]  # Rolling jumps go furthest at every height
+        width = self.player_width
+
+        for rect in rects:
+            edges = graph.setdefault(tuple(rect), {})
+            if rect.top < ground_top:
+                edges[GROUND] = FALL
+            span_left, span_right = rect.left - width, rect.right
+
+            # Look for landing spots a band of heights at a time, each only as wide as
+            # the furthest jump down to the bottom of that band
+            band_top = rect.top - rise
+            while band_top < ground_top:
+                band_bottom = min(band_top + REACH_BAND, ground_top)
+                reach = furthest[band_bottom - 1 - rect.top + rise] or 0
+                for shape in self.level.query_box(span_left - reach, band_top, span_right - span_left + 2 * reach,
+                                                  band_bottom - band_top):
+                    other = shape_rect(shape)
+                    # Each platform is taken in the band its top is in
+                    if not band_top <= other.top < band_bottom or other is rect:
+                        continue
+                    gap = max(0, other.left - width - span_right, span_left - other.right)
+                    index = other.top - rect.top + rise
+                    for state, table in zip(STATES, tables):
+                        state_reach = table[index]
+                        if state_reach is not None and gap <= state_reach:
+                            edges[tuple(other)] = state
+                            break
+                band_top = band_bottom
+
+        # Nothing limits sideways movement on the ground, so only height matters from there
+        apexes = {state: envelope.apex(state) for state in STATES}
+        for rect in rects:
+            for state in (WALK, ROLL_JUMP):
+                if ground_top - rect.top <= apexes[state]:
+                    graph[GROUND][tuple(rect)] = state
+                    break
+        return graph
+
+    def start_node(self, x, y):
+        """The node a player dropped at (x, y) lands on"""
+        feet = y + self.player_height
+        ground_top = self.ground_level + self.player_height
+        below = [shape_rect(shape) for shape in self.level.query_box(x, feet, self.player_width, ground_top - feet)]
+        below = [rect for rect in below if rect.top >= feet]
+        return tuple(min(below, key=lambda rect: rect.top)) if below else GROUND
+
+    def reachable_from(self, node, physics=None):
+        """Every node that can be got to from node, node included"""
+        graph = self.graph(physics)
+        seen = {node}
+        queue = deque([node])
+        while queue:
+            for neighbour in graph.get(queue.popleft(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return seen
+
+    def unreachable(self, start_x, start_y, physics=None):
+        """Platforms a player starting at (start_x, start_y) can never land on"""
+        reached = self.reachable_from(self.start_node(start_x, start_y), physics)
+        return [node for node in self.graph(physics) if node not in reached]
+
+
+if __name__ == "__main__":
+    # python reachability.py levels/level1.json  -- list platforms the player can't get to
+    from time import perf_counter
+
+    from levelfile import open_level
+
+    with open_level(sys.argv[1]) as level_file:
+        platforms = level_file.read_all()
+        start, ground_level = level_file.start, level_file.ground_level
+    started = perf_counter()
+    reachability = Reachability(platforms, ground_level)
+    unreachable = reachability.unreachable(*start)
+    elapsed = perf_counter() - started
+    print(f"{len(platforms)} platforms checked in {elapsed * 1000:.1f} ms")
+    for node in unreachable:
+        print(f"unreachable: {node}")
+    if unreachable:
+        sys.exit(1)
@@ -0,0 +1,78 @@
+import pygame
+
+FULL_REDRAW_RATIO = 0.5  # Past this much of the screen changing, one full flip is cheaper than many rects
+
+
+class DirtyRectRenderer:
+    """
+    Redraws and pushes to the display only the parts of the screen that changed.
+
+    The static level (background colour and platforms) is drawn once into a cached
+    Surface. Each frame, the areas moving things covered last frame are restored
+    from that cache, the moving things are drawn, and only the old and new areas
+    are sent to pygame.display.update. A full redraw is used for the first frame,
+    after invalidate(), or when too much of the screen is dirty.
+
+    Args:
+        screen (pygame.Surface): The display surface.
+        background_color (tuple): Colour behind the level.
+        platforms (iterable): pygame.Rect platforms to bake into the static layer.
+        platform_color (tuple): Colour to draw the platforms in.
+        offset (tuple): World position of the screen's top-left corner.
+        tiles (TileRenderer or None): A tile layer to bake in under the platforms.
+    """
+    def __init__(self, screen, background_color, platforms, platform_color, offset=(0, 0), tiles=None):
+        self.screen = screen
+        self.background_color = background_color
+        self.platform_color = platform_color
+        self.background = pygame.Surface(screen.get_size(), 0, screen)
+        self.previous_rects = []  # Areas drawn over last frame
+        self.current_rects = []  # Areas drawn over this frame
+        self.tiles = tiles
+        self.set_level(platforms, offset)
+
+    def set_level(self, platforms, offset=(0, 0)):
+        """
+        Rebake the static layer, e.g. after loading a new level or scrolling the camera.
+
+        Args:
+            platforms (iterable): Platforms to draw, in world coordinates.
+            offset (tuple): World position of the screen's top-left corner.
+        """
+        self.background.fill(self.background_color)
+        if self.tiles is not None:
+            self.tiles.draw(self.background, offset)  # One blit per visible chunk, however many tiles
+        for platform in platforms:
+            pygame.draw.rect(self.background, self.platform_color, platform.move(-offset[0], -offset[1]))
+        self.invalidate()
+
+    def invalidate(self):
+        """Redraw and flip the whole screen on the next frame (window exposed, level changed...)"""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """Wipe last frame's moving things off the screen"""
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(self.background, rect, rect)
+
+    def mark_dirty(self, rect):
+        """Record an area drawn over this frame; it is pushed now and restored next frame"""
+        self.current_rects.append(rect.clip(self.screen.get_rect()))
+
+    def end_frame(self):
+        """Push this frame's changes to the display"""
+        rects = self.previous_rects + self.current_rects
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        screen_area = self.screen.get_width() * self.screen.get_height()
+
+        if self.full_redraw or dirty_area > screen_area * FULL_REDRAW_RATIO:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+        self.full_redraw = False
+        self.previous_rects = self.current_rects
+        self.current_rects = []
@@ -0,0 +1,201 @@
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from world import World, Inputs
+
+# Replay file layout (all little-endian):
+#   header, then the level path (UTF-8)
+#   input runs: (packed buttons, run length) pairs, one byte of buttons per tick
+#   state hashes: one CRC32 every hash_interval ticks
+MAGIC = b"MMRP"
+VERSION = 4  # 2: rolls and jump presses count on the tick their button goes down; 3: hashes cover moving platforms;
+             # 4: hashes take the roll speed as a double
+HEADER = struct.Struct("<4sHHIII")  # magic, version, hash interval, tick count, run count, level path length
+RUN = struct.Struct("<BH")
+HASH_INTERVAL = 60  # Ticks between state hashes (one a second)
+
+# One bit per button
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+ROLL = 8
+RESTART = 16
+
+# Every possible combination unpacked once, so playback never builds Inputs objects
+UNPACKED = [Inputs(left=bool(bits & LEFT), right=bool(bits & RIGHT), jump=bool(bits & JUMP), roll=bool(bits & ROLL),
+                   restart=bool(bits & RESTART)) for bits in range(32)]
+
+STATE = struct.Struct("<Iddddd?????iiiidii??")  # Roll speed is a double: Physics takes fractional ones
+
+
+def pack_inputs(inputs):
+    """Buttons of an Inputs as one byte"""
+    return ((LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0) | (JUMP if inputs.jump else 0)
+            | (ROLL if inputs.roll else 0) | (RESTART if inputs.restart else 0))
+
+
+def state_hash(world):
+    """CRC32 of everything the simulation carries from one tick to the next"""
+    player = world.player
+    roll = player.roll_state
+    crc = zlib.crc32(STATE.pack(world.time, player.x, player.y, player.velocity_y, player.jump_force,
+                                roll.roll_progress, player.is_jumping, player.on_ground, player.is_walking_left,
+                                player.is_walking_right, roll.is_rolling, roll.current_phase, roll.phase_timer,
+                                roll.cooldown_timer, roll.roll_direction, roll.roll_speed, player.air_ticks,
+                                player.jump_buffer, world.jump_held, world.roll_held))
+    if world.movers:
+        movers = bytearray(world.movers.state_size())
+        world.movers.save_state(movers, 0)
+        crc = zlib.crc32(movers, crc)
+    return crc
+
+
+class InputRecorder:
+    """
+    Records every tick's inputs, plus a state hash every hash_interval ticks.
+
+    Attach it with world.recorder = recorder; World.tick calls record() itself.
+
+    Args:
+        level_path (str): The level the recording was made on, stored in the file.
+        hash_interval (int): Ticks between state hashes.
+    """
+    def __init__(self, level_path, hash_interval=HASH_INTERVAL):
+        self.level_path = level_path
+        self.hash_interval = hash_interval
+        self.inputs = bytearray()
+        self.hashes = array("I")
+
+    def record(self, world, inputs):
+        self.inputs.append(pack_inputs(inputs))
+        if world.time % self.hash_interval == 0:
+            self.hashes.append(state_hash(world))
+
+    def to_replay(self):
+        return Replay(self.level_path, self.hash_interval, bytes(self.inputs), self.hashes)
+
+    def save(self, path):
+        self.to_replay().save(path)
+
+
+class Replay:
+    """
+    A recorded play session: the inputs for every tick and the state hashes to check against.
+
+    Args:
+        level_path (str): The level the session was played on.
+        hash_interval (int): Ticks between state hashes.
+        inputs (bytes): One packed byte of buttons per tick.
+        hashes (array): state_hash after every hash_interval-th tick.
+    """
+    def __init__(self, level_path, hash_interval, inputs, hashes):
+        self.level_path = level_path
+        self.hash_interval = hash_interval
+        self.inputs = inputs
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def save(self, path):
+        """Write the replay, run-length encoding the inputs (buttons are held for many ticks)"""
+        runs = bytearray()
+        run_count = 0
+        i = 0
+        while i < len(self.inputs):
+            bits = self.inputs[i]
+            length = 1
+            while i + length < len(self.inputs) and self.inputs[i + length] == bits and length < 0xFFFF:
+                length += 1
+            runs += RUN.pack(bits, length)
+            run_count += 1
+            i += length
+
+        hashes = array("I", self.hashes)
+        if sys.byteorder != "little":
+            hashes.byteswap()
+        level_path = self.level_path.encode()
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.hash_interval, len(self.inputs), run_count, len(level_path)))
+            file.write(level_path)
+            file.write(runs)
+            file.write(hashes.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, hash_interval, tick_count, run_count, path_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != VERSION:
+            raise ValueError(f"{path} is replay format version {version}, expected {VERSION}")
+
+        offset = HEADER.size
+        level_path = data[offset:offset + path_length].decode()
+        offset += path_length
+        inputs = bytearray()
+        for bits, length in RUN.iter_unpack(data[offset:offset + run_count * RUN.size]):
+            inputs += bytes((bits,)) * length
+        offset += run_count * RUN.size
+        hashes = array("I")
+        hashes.frombytes(data[offset:offset + (tick_count // hash_interval) * hashes.itemsize])
+        if sys.byteorder != "little":
+            hashes.byteswap()
+        return cls(level_path, hash_interval, bytes(inputs), hashes)
+
+    def player(self):
+        """
+        A function handing out the recorded Inputs one tick at a time, for World.step.
+
+        Once the recording runs out it keeps returning "no buttons held".
+        """
+        inputs = iter(self.inputs)
+        return lambda: UNPACKED[next(inputs, 0)]
+
+    def verify(self, world):
+        """
+        Fast-forward a fresh World through the whole replay, checking the state hashes.
+
+        Args:
+            world (World): A world freshly built for the replay's level.
+
+        Returns:
+            int or None: The tick of the first hash that doesn't match, or None if the replay still plays back
+            exactly.
+        """
+        interval = self.hash_interval
+        hashes = self.hashes
+        tick = world.tick
+        for i, bits in enumerate(self.inputs):
+            tick(UNPACKED[bits])
+            if (i + 1) % interval == 0 and state_hash(world) != hashes[(i + 1) // interval - 1]:
+                return i + 1
+        return None
+
+
+def world_for(level_path):
+    """A headless World on the whole of a level, as a replay starts (relative paths are from the game folder)"""
+    from levelfile import open_level
+    from movers import make_movers
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), level_path)
+    with open_level(path) as level:
+        world = World(level.read_all(), level.start[0], level.start[1], level.ground_level)
+        for platform, awake in make_movers(level.read_movers(), path):
+            world.movers.add(platform, awake)
+    return world
+
+
+if __name__ == "__main__":
+    # python replay.py session.rep  -- fast-forward a recording and check it still plays back the same
+    replay = Replay.load(sys.argv[1])
+    desync = replay.verify(world_for(replay.level_path))
+    if desync is None:
+        print(f"OK: {len(replay)} ticks, {len(replay.hashes)} state hashes match")
+    else:
+        print(f"DESYNC: state differs from the recording at tick {desync}")
+        sys.exit(1)
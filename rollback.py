@@ -0,0 +1,317 @@
+import random
+import struct
+import zlib
+from array import array
+
+from replay import UNPACKED, pack_inputs
+
+# One player's World between ticks (little-endian): tick count; position, position before the
+# last tick (for drawing between ticks), vertical speed, jump force, roll progress; is_jumping,
+# on_ground, walking left/right, is_rolling, jump and roll held last tick; roll phase and
+# direction, phase timer, cooldown timer; ticks in the air, jump buffer. On a level with moving
+# platforms their state follows (see Movers.save_state)
+WORLD = struct.Struct("<I7d7?BbhhiH")
+HEADER = struct.Struct("<I")  # The match frame a snapshot was taken at (before simulating it)
+
+
+def world_size(world):
+    """Bytes save_world writes for a World"""
+    return WORLD.size + (world.movers.state_size() if world.movers else 0)
+
+
+def save_world(world, buffer, offset):
+    """Pack everything a World carries from one tick to the next into buffer at offset, returning the offset after it"""
+    player = world.player
+    roll = player.roll_state
+    WORLD.pack_into(buffer, offset, world.time, player.x, player.y, world.prev_x, world.prev_y, player.velocity_y,
+                    player.jump_force, roll.roll_progress, player.is_jumping, player.on_ground,
+                    player.is_walking_left, player.is_walking_right, roll.is_rolling, world.jump_held,
+                    world.roll_held, roll.current_phase, roll.roll_direction, roll.phase_timer, roll.cooldown_timer,
+                    player.air_ticks, player.jump_buffer)
+    offset += WORLD.size
+    if world.movers:
+        offset = world.movers.save_state(buffer, offset)
+    return offset
+
+
+def load_world(world, buffer, offset):
+    """Put a World back in the state save_world packed at offset, returning the offset after it"""
+    player = world.player
+    roll = player.roll_state
+    (world.time, player.x, player.y, world.prev_x, world.prev_y, player.velocity_y, player.jump_force,
+     roll.roll_progress, player.is_jumping, player.on_ground, player.is_walking_left, player.is_walking_right,
+     roll.is_rolling, world.jump_held, world.roll_held, roll.current_phase, roll.roll_direction, roll.phase_timer,
+     roll.cooldown_timer, player.air_ticks, player.jump_buffer) = WORLD.unpack_from(buffer, offset)
+    offset += WORLD.size
+    if world.movers:
+        offset = world.movers.load_state(buffer, offset)
+    return offset
+
+
+def snapshot_size(worlds):
+    """Bytes in the snapshot of a match between these worlds"""
+    return HEADER.size + sum(map(world_size, worlds))
+
+
+def encode_delta(baseline, snapshot):
+    """
+    Compress a snapshot against an earlier one of the same match, e.g. to send it to a peer that has the earlier one.
+
+    The snapshots are XORed, so every byte that didn't change becomes zero (and most
+    don't from one frame to the next: flags, timers, the high bytes of positions),
+    and the zero runs compress to almost nothing.
+    """
+    if len(baseline) != len(snapshot):
+        raise ValueError(f"snapshots of different matches ({len(baseline)} and {len(snapshot)} bytes)")
+    changes = int.from_bytes(snapshot, "little") ^ int.from_bytes(baseline, "little")
+    return zlib.compress(changes.to_bytes(len(snapshot), "little"), 1)
+
+
+def decode_delta(baseline, delta):
+    """The snapshot encode_delta(baseline, snapshot) was made from"""
+    changes = zlib.decompress(delta)
+    if len(changes) != len(baseline):
+        raise ValueError(f"delta is for a {len(changes)} byte snapshot, baseline has {len(baseline)}")
+    return (int.from_bytes(changes, "little") ^ int.from_bytes(baseline, "little")).to_bytes(len(changes), "little")
+
+
+class SnapshotRing:
+    """
+    The last few snapshots of a match in one preallocated buffer, so saving one never allocates.
+
+    A snapshot is the frame number followed by one WORLD record per player (each
+    with its moving platforms after it). Frame f goes in slot f % capacity,
+    overwriting the snapshot capacity frames older.
+
+    Args:
+        capacity (int): How many frames back snapshots are kept.
+        worlds (list[World]): The worlds of the match, to size the snapshots for.
+    """
+    def __init__(self, capacity, worlds):
+        self.capacity = capacity
+        self.players = len(worlds)
+        self.size = snapshot_size(worlds)
+        self.buffer = bytearray(capacity * self.size)
+        self.frames = array("q", [-1]) * capacity  # Frame stored in each slot, -1 for none
+
+    def __contains__(self, frame):
+        return frame >= 0 and self.frames[frame % self.capacity] == frame
+
+    def save(self, frame, worlds):
+        """Snapshot the worlds as frame"""
+        slot = frame % self.capacity
+        offset = slot * self.size
+        HEADER.pack_into(self.buffer, offset, frame)
+        offset += HEADER.size
+        for world in worlds:
+            offset = save_world(world, self.buffer, offset)
+        self.frames[slot] = frame
+
+    def load(self, frame, worlds):
+        """Put the worlds back as they were at frame"""
+        if frame not in self:
+            raise KeyError(f"no snapshot of frame {frame} (the last {self.capacity} frames are kept)")
+        offset = (frame % self.capacity) * self.size + HEADER.size
+        for world in worlds:
+            offset = load_world(world, self.buffer, offset)
+
+    def get(self, frame):
+        """The snapshot of frame as bytes (for encode_delta, checksums or sending)"""
+        if frame not in self:
+            raise KeyError(f"no snapshot of frame {frame} (the last {self.capacity} frames are kept)")
+        offset = (frame % self.capacity) * self.size
+        return bytes(self.buffer[offset:offset + self.size])
+
+
+class LoopbackNetwork:
+    """
+    Stands in for the network between the peers of a match running in one process.
+
+    Messages from one peer reach every other peer latency network ticks later,
+    give or take up to jitter ticks (so with jitter they can arrive out of
+    order). Call tick() once per frame to move the clock on.
+
+    Args:
+        peers (int): Number of peers.
+        latency (int): Ticks a message takes to arrive.
+        jitter (int): Most ticks a message can arrive early or late.
+        seed (int or None): Seed for the jitter.
+    """
+    def __init__(self, peers, latency=3, jitter=0, seed=None):
+        self.peers = peers
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.now = 0
+        self.in_flight = [[] for _ in range(peers)]  # Per receiver: (arrival tick, order sent, message)
+        self.sent = 0
+
+    def tick(self):
+        """Move the network clock on by one tick"""
+        self.now += 1
+
+    def send(self, sender, message):
+        """Send a message from sender to every other peer"""
+        for peer in range(self.peers):
+            if peer != sender:
+                delay = self.latency + (self.rng.randint(-self.jitter, self.jitter) if self.jitter else 0)
+                self.in_flight[peer].append((self.now + max(0, delay), self.sent, message))
+                self.sent += 1
+
+    def receive(self, peer):
+        """Every message that has reached peer by now, in the order they arrived"""
+        in_flight = self.in_flight[peer]
+        arrived = [entry for entry in in_flight if entry[0] <= self.now]
+        if not arrived:
+            return []
+        self.in_flight[peer] = [entry for entry in in_flight if entry[0] > self.now]
+        arrived.sort()
+        return [message for _, _, message in arrived]
+
+    def endpoint(self, peer):
+        """One peer's view of the network, for RollbackSession"""
+        return LoopbackEndpoint(self, peer)
+
+
+class LoopbackEndpoint:
+    """What a peer sends and receives through a LoopbackNetwork"""
+    def __init__(self, network, peer):
+        self.network = network
+        self.peer = peer
+
+    def send(self, message):
+        self.network.send(self.peer, message)
+
+    def receive(self):
+        return self.network.receive(self.peer)
+
+
+class RollbackSession:
+    """
+    Runs one peer's copy of a match, hiding network latency with rollback.
+
+    Every peer simulates every player's World in lockstep, one tick per frame.
+    Inputs of remote players that haven't arrived yet are predicted (the last
+    buttons they were known to hold), and the frame is simulated straight away.
+    When an input arrives that differs from what was predicted, the worlds are
+    restored from the snapshot of that frame and the frames since are simulated
+    again with it. A peer more than max_rollback frames ahead of another's inputs
+    waits (advance returns False) rather than run out of snapshots.
+
+    Messages on the transport are (frame, player, packed buttons) tuples, with the
+    buttons packed like replay inputs.
+
+    Args:
+        worlds (list[World]): One World per player, in player order.
+        local_player (int): The player whose inputs this peer supplies.
+        transport: Anything with send(message) and receive() -> list of messages,
+            like LoopbackNetwork.endpoint().
+        max_rollback (int): Most frames that are ever simulated again.
+    """
+    def __init__(self, worlds, local_player, transport, max_rollback=8):
+        self.worlds = worlds
+        self.players = len(worlds)
+        self.local_player = local_player
+        self.transport = transport
+        self.max_rollback = max_rollback
+        self.frame = 0  # Next frame to simulate
+        self.snapshots = SnapshotRing(max_rollback + 1, worlds)
+
+        # Buttons used (predicted until received) for each player, for a window of frames around now
+        self.input_frames = 4 * (max_rollback + 1)
+        self.inputs = bytearray(self.input_frames * self.players)
+        self.received = bytearray(self.input_frames * self.players)
+        self.confirmed = [-1] * self.players  # Last frame up to which each player's inputs have all arrived
+
+        self.rollbacks = 0
+        self.frames_resimulated = 0
+        self.stalls = 0
+
+    def _index(self, frame, player):
+        return (frame % self.input_frames) * self.players + player
+
+    def _predicted(self, player):
+        """The buttons to use for a player on a frame whose input hasn't arrived"""
+        confirmed = self.confirmed[player]
+        return self.inputs[self._index(confirmed, player)] if confirmed >= 0 else 0
+
+    def _store(self, frame, player, bits):
+        """Record a player's real input for a frame, returning True if a frame already simulated used another"""
+        index = self._index(frame, player)
+        mispredicted = frame < self.frame and self.inputs[index] != bits
+        self.inputs[index] = bits
+        self.received[index] = 1
+        # Inputs can arrive out of order; confirmed only moves over an unbroken run of them (and only
+        # as far as the slots advance() has cleared for reuse)
+        confirmed = self.confirmed[player]
+        horizon = self.frame + self.input_frames // 2
+        while confirmed + 1 < horizon and self.received[self._index(confirmed + 1, player)]:
+            confirmed += 1
+        self.confirmed[player] = confirmed
+        return mispredicted
+
+    def _simulate(self, frame):
+        """Snapshot the worlds, then simulate frame, predicting inputs that haven't arrived"""
+        self.snapshots.save(frame, self.worlds)
+        for player, world in enumerate(self.worlds):
+            index = self._index(frame, player)
+            if not self.received[index]:
+                self.inputs[index] = self._predicted(player)
+            world.tick(UNPACKED[self.inputs[index]])
+
+    def poll(self):
+        """
+        Take in whatever inputs have arrived, rolling back if any of them were mispredicted.
+
+        Returns:
+            int: Frames simulated again (0 if every prediction was right).
+        """
+        rollback_to = None
+        for frame, player, bits in self.transport.receive():
+            if frame < self.frame - self.max_rollback:
+                raise RuntimeError(f"input for frame {frame} arrived after it could be rolled back "
+                                   f"(now at frame {self.frame})")
+            if self._store(frame, player, bits) and (rollback_to is None or frame < rollback_to):
+                rollback_to = frame
+        if rollback_to is None:
+            return 0
+
+        self.snapshots.load(rollback_to, self.worlds)
+        for frame in range(rollback_to, self.frame):
+            self._simulate(frame)
+        self.rollbacks += 1
+        self.frames_resimulated += self.frame - rollback_to
+        return self.frame - rollback_to
+
+    def advance(self, local_inputs):
+        """
+        Simulate the next frame with the local player's inputs (an Inputs), sending them to the other peers.
+
+        Returns:
+            bool: True if the frame was simulated, False if this peer has to wait
+            for the others (call again next frame with the then-current inputs).
+        """
+        self.poll()
+        frame = self.frame
+        if frame - min(self.confirmed) > self.max_rollback:
+            self.stalls += 1
+            return False
+
+        bits = pack_inputs(local_inputs)
+        # Clear what this slot held input_frames ago before it is reused
+        for player in range(self.players):
+            self.received[self._index(frame + self.input_frames // 2, player)] = 0
+        self._store(frame, self.local_player, bits)
+        self.transport.send((frame, self.local_player, bits))
+        self._simulate(frame)
+        self.frame = frame + 1
+        return True
+
+    @property
+    def confirmed_frame(self):
+        """The latest frame whose snapshot is final: every input before it has arrived"""
+        return min(min(self.confirmed) + 1, self.frame)
+
+    def checksum(self, frame):
+        """CRC32 of the snapshot of frame, to compare with other peers' for desyncs (see confirmed_frame)"""
+        return zlib.crc32(self.snapshots.get(frame))
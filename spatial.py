@@ -0,0 +1,232 @@
+import math
+
+
+def shape_rect(shape):
+    """The axis-aligned bounds of a platform (pygame.Rect) or anything with a .rect (e.g. Slope)"""
+    return getattr(shape, "rect", shape)
+
+
+def ray_vs_rect(rect, x0, y0, dx, dy):
+    """
+    Slab test of the segment (x0, y0) -> (x0 + dx, y0 + dy) against a rect.
+
+    Returns:
+        float or None: Fraction of the segment (0 to 1) where it enters the rect, or None if it misses.
+    """
+    t_enter = 0.0
+    t_exit = 1.0
+    for start, delta, low, high in ((x0, dx, rect.left, rect.right), (y0, dy, rect.top, rect.bottom)):
+        if delta == 0:
+            if start < low or start >= high:
+                return None
+            continue
+        t1 = (low - start) / delta
+        t2 = (high - start) / delta
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_enter = max(t_enter, t1)
+        t_exit = min(t_exit, t2)
+        if t_enter > t_exit:
+            return None
+    return t_enter
+
+
+class SpatialGrid:
+    """
+    Uniform hash grid over level geometry, so queries only look at nearby platforms.
+
+    Every shape is filed under each cell its bounds touch. Queries walk the cells a
+    box or ray covers, so their cost depends on what is near them rather than on how
+    many platforms the level has.
+
+    Args:
+        shapes (iterable): Platforms (pygame.Rect or Slope) to insert straight away.
+        cell_size (int): Width and height of a grid cell in pixels.
+    """
+    def __init__(self, shapes=(), cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> {id(shape): shape}
+        self.shape_cells = {}  # id(shape) -> (shape, cell range it is filed under)
+        for shape in shapes:
+            self.insert(shape)
+
+    def __len__(self):
+        return len(self.shape_cells)
+
+    def __iter__(self):
+        return (shape for shape, _ in self.shape_cells.values())
+
+    def __contains__(self, shape):
+        return id(shape) in self.shape_cells
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        # Right/bottom edges are exclusive, so a rect ending exactly on a cell line stays out of the next cell
+        min_x = int(left // size)
+        min_y = int(top // size)
+        max_x = int(-(-right // size)) - 1  # ceil(right / size) - 1, in floor divisions
+        max_y = int(-(-bottom // size)) - 1
+        return min_x, min_y, max_x if max_x > min_x else min_x, max_y if max_y > min_y else min_y
+
+    def _file(self, shape, cell_range):
+        key = id(shape)
+        min_x, min_y, max_x, max_y = cell_range
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                self.cells.setdefault((cell_x, cell_y), {})[key] = shape
+
+    def _unfile(self, shape, cell_range):
+        key = id(shape)
+        min_x, min_y, max_x, max_y = cell_range
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                bucket = self.cells[(cell_x, cell_y)]
+                del bucket[key]
+                if not bucket:
+                    del self.cells[(cell_x, cell_y)]
+
+    def insert(self, shape):
+        """Add a platform to the grid"""
+        if id(shape) in self.shape_cells:
+            raise ValueError(f"{shape} is already in the grid")
+        rect = shape_rect(shape)
+        cell_range = self._cell_range(rect.left, rect.top, rect.right, rect.bottom)
+        self.shape_cells[id(shape)] = (shape, cell_range)
+        self._file(shape, cell_range)
+
+    def remove(self, shape):
+        """Take a platform out of the grid"""
+        _, cell_range = self.shape_cells.pop(id(shape))
+        self._unfile(shape, cell_range)
+
+    def move(self, shape, x, y):
+        """
+        Move a platform's top-left corner to (x, y), refiling it only if it changed cells.
+
+        Args:
+            shape: A platform already in the grid.
+            x (int): New left edge.
+            y (int): New top edge.
+
+        Returns:
+            bool: True if it changed cells.
+        """
+        rect = shape_rect(shape)
+        rect.topleft = (x, y)
+        return self.update(shape)
+
+    def update(self, shape):
+        """
+        Refile a platform whose rect was changed in place (moved or resized).
+
+        Returns:
+            bool: True if it changed cells; small moves within its cells cost only the check.
+        """
+        _, old_range = self.shape_cells[id(shape)]
+        rect = shape_rect(shape)
+        new_range = self._cell_range(rect.left, rect.top, rect.right, rect.bottom)
+        if new_range == old_range:
+            return False
+        self._unfile(shape, old_range)
+        self._file(shape, new_range)
+        self.shape_cells[id(shape)] = (shape, new_range)
+        return True
+
+    def query_box(self, left, top, width, height):
+        """
+        Find platforms whose bounds overlap a box.
+
+        Args:
+            left (float): Left edge of the box.
+            top (float): Top edge of the box.
+            width (float): Width of the box.
+            height (float): Height of the box.
+
+        Returns:
+            list: Platforms overlapping the box's bounds, each listed once.
+        """
+        right = left + width
+        bottom = top + height
+        min_x, min_y, max_x, max_y = self._cell_range(left, top, right, bottom)
+        found = {}
+        cells = self.cells
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    found.update(bucket)
+
+        result = []
+        for shape in found.values():
+            rect = shape_rect(shape)
+            if rect.left < right and rect.right > left and rect.top < bottom and rect.bottom > top:
+                result.append(shape)
+        return result
+
+    def query_swept_box(self, left, top, width, height, move_x, move_y):
+        """
+        Find platforms a box could touch while moving by (move_x, move_y).
+
+        This is a broad-phase query: it returns everything overlapping the bounds of the
+        whole move, for a narrow-phase test to sort out. The bounds are padded by a
+        pixel, so rounding can't leave out a platform the move only just reaches.
+
+        Returns:
+            list: Candidate platforms, each listed once.
+        """
+        return self.query_box(min(left, left + move_x) - 1, min(top, top + move_y) - 1,
+                              width + abs(move_x) + 2, height + abs(move_y) + 2)
+
+    def query_ray(self, x0, y0, x1, y1):
+        """
+        Find platforms crossed by the segment from (x0, y0) to (x1, y1).
+
+        Walks only the cells the segment passes through (a grid DDA), so long rays
+        through empty space stay cheap.
+
+        Returns:
+            list[tuple[float, object]]: (fraction along the segment, platform) pairs, nearest first.
+        """
+        size = self.cell_size
+        dx = x1 - x0
+        dy = y1 - y0
+        cell_x = int(x0 // size)
+        cell_y = int(y0 // size)
+        end_x = int(x1 // size)
+        end_y = int(y1 // size)
+
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Fraction of the segment needed to cross one cell, and to reach the first cell boundary
+        t_delta_x = abs(size / dx) if dx else math.inf
+        t_delta_y = abs(size / dy) if dy else math.inf
+        if dx:
+            boundary = (cell_x + (1 if dx > 0 else 0)) * size
+            t_max_x = (boundary - x0) / dx
+        else:
+            t_max_x = math.inf
+        if dy:
+            boundary = (cell_y + (1 if dy > 0 else 0)) * size
+            t_max_y = (boundary - y0) / dy
+        else:
+            t_max_y = math.inf
+
+        hits = {}
+        tested = set()
+        steps = abs(end_x - cell_x) + abs(end_y - cell_y)
+        for _ in range(steps + 1):
+            for key, shape in self.cells.get((cell_x, cell_y), {}).items():
+                if key in tested:
+                    continue
+                tested.add(key)
+                t = ray_vs_rect(shape_rect(shape), x0, y0, dx, dy)
+                if t is not None:
+                    hits[key] = (t, shape)
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                cell_x += step_x
+            else:
+                t_max_y += t_delta_y
+                cell_y += step_y
+
+        return sorted(hits.values(), key=lambda hit: hit[0])
@@ -1,5 +1,4 @@
 import math
-import pygame
 
 class RollPhase:
     LEAP = 0      # Initial leap with extended arms
@@ -7,8 +6,35 @@ class RollPhase:
     TUCK = 2      # Head tucked, starting roll
     ROLLING = 3   # Rolling over shoulder
     FINISH = 4    # Getting back to feet
+    COUNT = 5
+
+# Transition table: the phase that follows each phase (indexed by phase), None where the roll ends
+NEXT_PHASE = (RollPhase.HANDS, RollPhase.TUCK, RollPhase.ROLLING, RollPhase.FINISH, None)
+
+# Ticks each phase lasts, indexed by phase
+PHASE_DURATIONS = (
+    3,  # LEAP: 3 frames for initial leap
+    3,  # HANDS: 3 frames for hands touching
+    2,  # TUCK: 2 frames for tucking
+    6,  # ROLLING: 6 frames for roll
+    3,  # FINISH: 3 frames for standing up
+)
+
+
+def phase_table(durations):
+    """Phase durations as a tuple indexed by phase, from a tuple or a {RollPhase: ticks} dict"""
+    if isinstance(durations, dict):
+        return tuple(durations[phase] for phase in range(RollPhase.COUNT))
+    if len(durations) != RollPhase.COUNT:
+        raise ValueError(f"expected {RollPhase.COUNT} phase durations, got {len(durations)}")
+    return tuple(durations)
+
 
 class RollState:
+    # Fixed slots: no per-instance dict, and updating a roll never allocates
+    __slots__ = ("is_rolling", "roll_distance", "roll_progress", "roll_speed", "roll_cooldown", "cooldown_timer",
+                 "roll_direction", "current_phase", "phase_durations", "phase_timer", "total_frames")
+
     def __init__(self):
         self.is_rolling = False
         self.roll_distance = 100  # Total distance to roll
@@ -18,15 +44,14 @@ class RollState:
         self.cooldown_timer = 0
         self.roll_direction = 1  # 1 for right, -1 for left
         self.current_phase = RollPhase.LEAP
-        self.phase_durations = {
-            RollPhase.LEAP: 3,     # 3 frames for initial leap
-            RollPhase.HANDS: 3,    # 3 frames for hands touching
-            RollPhase.TUCK: 2,     # 2 frames for tucking
-            RollPhase.ROLLING: 6,  # 6 frames for roll
-            RollPhase.FINISH: 3    # 3 frames for standing up
-        }
+        self.phase_durations = PHASE_DURATIONS
         self.phase_timer = 0
-        self.total_frames = sum(self.phase_durations.values())
+        self.total_frames = sum(self.phase_durations)
+
+    def set_phase_durations(self, durations):
+        """Use other phase durations (a tuple indexed by phase or a {RollPhase: ticks} dict)"""
+        self.phase_durations = phase_table(durations)
+        self.total_frames = sum(self.phase_durations)
 
     def start_roll(self, facing_left):
         if self.cooldown_timer == 0 and not self.is_rolling:
@@ -45,25 +70,16 @@ class RollState:
             self.roll_progress += self.roll_speed
             self.phase_timer -= 1
 
-            # Update phases
+            # Move on to the next phase when this one's time is up
             if self.phase_timer <= 0:
-                if self.current_phase == RollPhase.LEAP:
-                    self.current_phase = RollPhase.HANDS
-                    self.phase_timer = self.phase_durations[RollPhase.HANDS]
-                elif self.current_phase == RollPhase.HANDS:
-                    self.current_phase = RollPhase.TUCK
-                    self.phase_timer = self.phase_durations[RollPhase.TUCK]
-                elif self.current_phase == RollPhase.TUCK:
-                    self.current_phase = RollPhase.ROLLING
-                    self.phase_timer = self.phase_durations[RollPhase.ROLLING]
-                elif self.current_phase == RollPhase.ROLLING:
-                    self.current_phase = RollPhase.FINISH
-                    self.phase_timer = self.phase_durations[RollPhase.FINISH]
-                elif self.current_phase == RollPhase.FINISH:
+                phase = NEXT_PHASE[self.current_phase]
+                if phase is None:
                     self.is_rolling = False
                     self.roll_progress = 0
                     self.cooldown_timer = self.roll_cooldown
                     return 0
+                self.current_phase = phase
+                self.phase_timer = self.phase_durations[phase]
 
             roll_velocity = self.roll_speed * self.roll_direction
 
@@ -72,10 +88,11 @@ class RollState:
 
         return roll_velocity
 
-def handle_roll(keys, roll_state, is_walking_left, is_walking_right):
-    if keys[pygame.K_SPACE]:
+def handle_roll(roll_pressed, roll_state, is_walking_left, is_walking_right):
+    if roll_pressed and not roll_state.is_rolling and roll_state.cooldown_timer == 0:
         # Determine roll direction based on movement or facing direction
         facing_left = is_walking_left or (not is_walking_right and not is_walking_left)
         return roll_state.start_roll(facing_left)
-    
-    return roll_state.update()
\ No newline at end of file
+
+    # A press mid-roll or during the cooldown mustn't stop the roll's timers from running
+    return roll_state.update()
@@ -0,0 +1,44 @@
+import threading
+
+from player import PoseCache
+
+
+class WarmUp:
+    """
+    Fills caches on a background thread once the window is up, so the first frames don't have to.
+
+    It reads the level chunks around the start into memory (see LevelFile.prefetch)
+    and renders every walking pose into a spare PoseCache. Nothing the main thread
+    uses is touched until ready() is true; then the main thread adopts the poses
+    itself (e.g. player.pose_cache.adopt(warm_up.poses)).
+
+    Args:
+        screen (pygame.Surface): The display, for the sprites' pixel format only.
+        level_file (LevelFile): The level being played.
+        chunks (range): Chunks to prefetch.
+        player_width (int): Width of the player the poses are for.
+        player_height (int): Height of the player the poses are for.
+    """
+    def __init__(self, screen, level_file, chunks, player_width, player_height):
+        self.poses = PoseCache()
+        self.finished = threading.Event()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(screen, level_file, chunks, player_width,
+                                                               player_height), name="warm-up", daemon=True)
+        self.thread.start()
+
+    def _run(self, screen, level_file, chunks, player_width, player_height):
+        try:
+            level_file.prefetch(chunks)
+            self.poses.prerender(screen, player_width, player_height, self.cancelled)
+        finally:
+            self.finished.set()
+
+    def ready(self):
+        """Whether everything has been warmed and can be adopted"""
+        return self.finished.is_set() and not self.cancelled.is_set()
+
+    def cancel(self):
+        """Stop as soon as possible and wait for the thread (before closing the level or quitting pygame)"""
+        self.cancelled.set()
+        self.thread.join()
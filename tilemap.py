@@ -0,0 +1,198 @@
+import pygame
+
+EMPTY = 0
+TILE_COLORKEY = (255, 0, 255)  # Transparent background of baked chunks
+CHUNK_SIZE = 256
+
+
+class TileMap:
+    """
+    A grid of tile ids, one byte per tile (0 is empty).
+
+    Looking up the tile under a point is one index into the grid whatever the map's
+    size, so collision queries cost the same on a tiny level and a huge one. A
+    TileMap answers query_box and query_swept_box like a SpatialGrid, with one
+    pygame.Rect per solid tile, so it can be passed to move_box as the level.
+
+    Args:
+        width (int): Width of the map in tiles.
+        height (int): Height of the map in tiles.
+        tile_size (int): Width and height of a tile in pixels.
+        origin (tuple): World position of the map's top-left corner.
+        solid_tiles (iterable or None): Tile ids the player collides with, None for every non-empty id.
+    """
+    def __init__(self, width, height, tile_size=32, origin=(0, 0), solid_tiles=None):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.origin_x, self.origin_y = origin
+        self.tiles = bytearray(width * height)
+        self.solid = bytearray(256)  # Tile id -> 1 if solid
+        for tile in (range(1, 256) if solid_tiles is None else solid_tiles):
+            self.solid[tile] = 1
+        self.changed = set()  # Tile coordinates set since the last renderer update
+
+    @classmethod
+    def from_platforms(cls, platforms, tile=1, tile_size=32, solid_tiles=None):
+        """
+        Rasterize rect platforms into a map just big enough for them.
+
+        A tile is filled when its centre is inside a platform, so platforms that aren't
+        tile-aligned come out to the nearest whole tiles.
+        """
+        platforms = list(platforms)
+        if not platforms:
+            return cls(0, 0, tile_size, solid_tiles=solid_tiles)
+        bounds = platforms[0].unionall(platforms[1:])
+        origin = (bounds.left // tile_size * tile_size, bounds.top // tile_size * tile_size)
+        tilemap = cls(-(-(bounds.right - origin[0]) // tile_size), -(-(bounds.bottom - origin[1]) // tile_size),
+                      tile_size, origin, solid_tiles)
+        half = tile_size // 2
+        for platform in platforms:
+            # Columns/rows whose centres fall in [left, right) and [top, bottom)
+            first_x = -(-(platform.left - origin[0] - half) // tile_size)
+            first_y = -(-(platform.top - origin[1] - half) // tile_size)
+            end_x = -(-(platform.right - origin[0] - half) // tile_size)
+            end_y = -(-(platform.bottom - origin[1] - half) // tile_size)
+            tilemap.fill(first_x, first_y, end_x - first_x, end_y - first_y, tile)
+        return tilemap
+
+    def tile_at(self, x, y):
+        """Tile coordinates of the tile under world position (x, y) (may be outside the map)"""
+        return int((x - self.origin_x) // self.tile_size), int((y - self.origin_y) // self.tile_size)
+
+    def tile_rect(self, tile_x, tile_y):
+        """World rect covered by a tile"""
+        return pygame.Rect(self.origin_x + tile_x * self.tile_size, self.origin_y + tile_y * self.tile_size,
+                           self.tile_size, self.tile_size)
+
+    def get(self, tile_x, tile_y):
+        """Tile id at tile coordinates; outside the map is empty"""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.tiles[tile_y * self.width + tile_x]
+        return EMPTY
+
+    def set(self, tile_x, tile_y, tile):
+        """Change one tile (outside the map is ignored)"""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            index = tile_y * self.width + tile_x
+            if self.tiles[index] != tile:
+                self.tiles[index] = tile
+                self.changed.add((tile_x, tile_y))
+
+    def fill(self, tile_x, tile_y, width, height, tile):
+        """Set a rectangle of tiles, clipped to the map"""
+        first_x, last_x = max(0, tile_x), min(self.width, tile_x + width)
+        for row in range(max(0, tile_y), min(self.height, tile_y + height)):
+            for column in range(first_x, last_x):
+                self.set(column, row, tile)
+
+    def is_solid(self, x, y):
+        """Whether world position (x, y) is inside a solid tile"""
+        return bool(self.solid[self.get(*self.tile_at(x, y))])
+
+    def query_box(self, left, top, width, height):
+        """Rects of the solid tiles a world-space box overlaps"""
+        first_x, first_y = self.tile_at(left, top)
+        # Right and bottom edges are exclusive, like pygame.Rect
+        last_x = int(-(-(left + width - self.origin_x) // self.tile_size)) - 1
+        last_y = int(-(-(top + height - self.origin_y) // self.tile_size)) - 1
+        first_x, last_x = max(0, first_x), min(self.width - 1, last_x)
+        first_y, last_y = max(0, first_y), min(self.height - 1, last_y)
+
+        tiles, solid, map_width = self.tiles, self.solid, self.width
+        return [self.tile_rect(column, row)
+                for row in range(first_y, last_y + 1)
+                for column in range(first_x, last_x + 1)
+                if solid[tiles[row * map_width + column]]]
+
+    def query_swept_box(self, left, top, width, height, move_x, move_y):
+        """Rects of the solid tiles a box could touch while moving by (move_x, move_y)"""
+        return self.query_box(min(left, left + move_x) - 1, min(top, top + move_y) - 1,
+                              width + abs(move_x) + 2, height + abs(move_y) + 2)
+
+
+class TileRenderer:
+    """
+    Draws a TileMap from baked chunk Surfaces.
+
+    Each chunk_size square of the map is drawn once into its own Surface, the first
+    time it is on screen. After that, drawing the view is one blit per visible
+    chunk, however many tiles they hold. A chunk is rebaked only after one of its
+    tiles changes, and chunks with no tiles at all are never blitted.
+
+    Args:
+        tilemap (TileMap): The map to draw.
+        tileset (dict): Tile id -> colour tuple or pygame.Surface of tile_size x tile_size.
+        chunk_size (int): Width and height of a chunk in pixels (a multiple of the tile size).
+    """
+    def __init__(self, tilemap, tileset, chunk_size=CHUNK_SIZE):
+        self.tilemap = tilemap
+        self.tileset = tileset
+        self.chunk_tiles = max(1, chunk_size // tilemap.tile_size)  # Tiles along a chunk's edge
+        self.chunk_size = self.chunk_tiles * tilemap.tile_size
+        self.chunks = {}  # (chunk x, chunk y) -> baked Surface, or None for an empty chunk
+        self.bakes = 0  # Chunks baked so far
+
+    def _apply_changes(self):
+        changed = self.tilemap.changed
+        if changed:
+            for tile_x, tile_y in changed:
+                self.chunks.pop((tile_x // self.chunk_tiles, tile_y // self.chunk_tiles), None)
+            changed.clear()
+
+    def _bake(self, chunk_x, chunk_y):
+        tilemap = self.tilemap
+        tile_size = tilemap.tile_size
+        first_x, first_y = chunk_x * self.chunk_tiles, chunk_y * self.chunk_tiles
+        surface = None
+        for row in range(first_y, min(tilemap.height, first_y + self.chunk_tiles)):
+            for column in range(first_x, min(tilemap.width, first_x + self.chunk_tiles)):
+                tile = tilemap.tiles[row * tilemap.width + column]
+                if tile == EMPTY or tile not in self.tileset:
+                    continue
+                if surface is None:
+                    surface = pygame.Surface((self.chunk_size, self.chunk_size))
+                    surface.fill(TILE_COLORKEY)
+                position = ((column - first_x) * tile_size, (row - first_y) * tile_size)
+                look = self.tileset[tile]
+                if isinstance(look, pygame.Surface):
+                    surface.blit(look, position)
+                else:
+                    surface.fill(look, (position, (tile_size, tile_size)))
+        if surface is not None:
+            surface.set_colorkey(TILE_COLORKEY, pygame.RLEACCEL)
+        self.bakes += 1
+        return surface
+
+    def draw(self, surface, offset=(0, 0)):
+        """
+        Blit the chunks overlapping the surface.
+
+        Args:
+            surface (pygame.Surface): Where to draw (e.g. the renderer's background).
+            offset (tuple): World position of the surface's top-left corner.
+
+        Returns:
+            int: Number of chunks blitted.
+        """
+        self._apply_changes()
+        tilemap = self.tilemap
+        left = offset[0] - tilemap.origin_x
+        top = offset[1] - tilemap.origin_y
+        first_x, first_y = max(0, int(left // self.chunk_size)), max(0, int(top // self.chunk_size))
+        last_x = min((tilemap.width - 1) // self.chunk_tiles, int((left + surface.get_width() - 1) // self.chunk_size))
+        last_y = min((tilemap.height - 1) // self.chunk_tiles, int((top + surface.get_height() - 1) // self.chunk_size))
+
+        blits = 0
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                key = (chunk_x, chunk_y)
+                if key in self.chunks:
+                    chunk = self.chunks[key]
+                else:
+                    chunk = self.chunks[key] = self._bake(chunk_x, chunk_y)
+                if chunk is not None:
+                    surface.blit(chunk, (chunk_x * self.chunk_size - left, chunk_y * self.chunk_size - top))
+                    blits += 1
+        return blits
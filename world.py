@@ -0,0 +1,304 @@
+from collisions import move_box
+from movers import Movers
+from spatial import SpatialGrid
+from specialmoves import RollState, handle_roll, phase_table
+
+# Physics constants (tuned per tick, and one tick is one frame at 60 FPS)
+INITIAL_JUMP_FORCE = -15
+GRAVITY = 0.8
+PLAYER_SPEED = 5
+TICK_RATE = 60
+TICK_DT = 1 / TICK_RATE
+MAX_FRAME_TIME = 0.25  # Longest real frame we try to catch up on, so a stall can't spiral
+JUMP_DECAY = 0.9  # Jump force kept each tick while rising
+COYOTE_TICKS = 6  # Ticks after leaving the ground that a jump still works
+JUMP_BUFFER_TICKS = 6  # Ticks a jump pressed in the air is remembered, so it happens on landing
+LONG_AGO = 1 << 30  # air_ticks of a player who hasn't stood on anything yet
+
+
+class Physics:
+    """
+    The tunable movement constants one World runs with.
+
+    The defaults are the game's; tools like batch sweeps give each World its own.
+
+    Args:
+        gravity (float): Added to falling speed every tick.
+        jump_force (float): Upward speed a jump starts with (negative is up).
+        jump_decay (float): Fraction of the jump force kept each tick.
+        player_speed (float): Walking speed in pixels per tick.
+        roll_speed (float): Rolling speed in pixels per tick.
+        phase_durations (tuple, dict or None): Ticks per RollPhase (a tuple indexed by phase or a
+            {RollPhase: ticks} dict), None for RollState's own.
+        coyote_ticks (int): Ticks after leaving the ground that a jump still works.
+        jump_buffer_ticks (int): Ticks an early jump press is kept for.
+    """
+    def __init__(self, gravity=GRAVITY, jump_force=INITIAL_JUMP_FORCE, jump_decay=JUMP_DECAY,
+                 player_speed=PLAYER_SPEED, roll_speed=None, phase_durations=None, coyote_ticks=COYOTE_TICKS,
+                 jump_buffer_ticks=JUMP_BUFFER_TICKS):
+        defaults = RollState()
+        self.gravity = gravity
+        self.jump_force = jump_force
+        self.jump_decay = jump_decay
+        self.player_speed = player_speed
+        self.roll_speed = defaults.roll_speed if roll_speed is None else roll_speed
+        self.phase_durations = defaults.phase_durations if phase_durations is None else phase_table(phase_durations)
+        self.coyote_ticks = coyote_ticks
+        self.jump_buffer_ticks = jump_buffer_ticks
+
+    def key(self):
+        """A hashable value that changes whenever any constant does (for caching results per physics)"""
+        return (self.gravity, self.jump_force, self.jump_decay, self.player_speed, self.roll_speed,
+                self.phase_durations, self.coyote_ticks, self.jump_buffer_ticks)
+
+    def __eq__(self, other):
+        return isinstance(other, Physics) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return (f"Physics(gravity={self.gravity}, jump_force={self.jump_force}, jump_decay={self.jump_decay}, "
+                f"player_speed={self.player_speed}, roll_speed={self.roll_speed}, "
+                f"phase_durations={self.phase_durations}, coyote_ticks={self.coyote_ticks}, "
+                f"jump_buffer_ticks={self.jump_buffer_ticks})")
+
+    def apply_to_roll(self, roll_state):
+        """Give a RollState these roll constants"""
+        roll_state.roll_speed = self.roll_speed
+        roll_state.set_phase_durations(self.phase_durations)
+
+
+class Inputs:
+    """
+    The buttons the simulation cares about for one tick.
+
+    Args:
+        left (bool): Move left.
+        right (bool): Move right.
+        jump (bool): Jump (only does something when on the ground).
+        roll (bool): Start a roll.
+        restart (bool): Go back to the starting position.
+    """
+    __slots__ = ("left", "right", "jump", "roll", "restart")
+
+    def __init__(self, left=False, right=False, jump=False, roll=False, restart=False):
+        self.left = left
+        self.right = right
+        self.jump = jump
+        self.roll = roll
+        self.restart = restart
+
+
+class Player:
+    """Everything the simulation tracks about the stick figure"""
+    # Slots keep players small and allocation-free to update, however many there are
+    __slots__ = ("x", "y", "width", "height", "velocity_y", "jump_force", "is_jumping", "on_ground", "air_ticks",
+                 "jump_buffer", "is_walking_left", "is_walking_right", "roll_state")
+
+    def __init__(self, x, y, width=7, height=50):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.velocity_y = 0  # Vertical velocity (for gravity)
+        self.jump_force = 0
+        self.is_jumping = False
+        self.on_ground = False  # Whether the player is standing on a platform
+        self.air_ticks = LONG_AGO  # Ticks since the player last stood on something (for coyote time)
+        self.jump_buffer = 0  # Ticks left in which an early jump press still counts
+        self.is_walking_left = False
+        self.is_walking_right = False
+        self.roll_state = RollState()
+
+    def reset(self, x, y):
+        """Put the player back at (x, y) standing still, like pressing R"""
+        self.x = x
+        self.y = y
+        self.velocity_y = 0
+        self.on_ground = False
+        self.is_jumping = False
+        self.jump_force = 0
+        self.air_ticks = LONG_AGO
+        self.jump_buffer = 0
+
+
+class World:
+    """
+    Headless game simulation: the player, the level and the rules that move them.
+
+    Nothing here touches the display or the keyboard, so a World can be stepped as
+    fast as the CPU allows for tests, bots and replays, and drawn by whoever owns it.
+
+    Args:
+        platforms (iterable, SpatialGrid or TileMap): pygame.Rect platforms and/or Slope objects, or a level
+            index built already (used as it is; moving platforms need a SpatialGrid to be filed in).
+        start_x (float): Player's starting x position.
+        start_y (float): Player's starting y position.
+        ground_level (float): Lowest y the player can reach.
+        physics (Physics or None): Movement constants, None for the game's.
+    """
+    def __init__(self, platforms, start_x, start_y, ground_level, physics=None):
+        # Anything that answers query_box and query_swept_box is a level index already
+        self.level = platforms if hasattr(platforms, "query_swept_box") else SpatialGrid(platforms)
+        self.movers = Movers(self.level)  # Moving platforms, filed in the same grid as the static ones
+        self.physics = physics if physics is not None else Physics()
+        self.start_x = start_x
+        self.start_y = start_y
+        self.ground_level = ground_level
+        self.player = Player(start_x, start_y)
+        self.physics.apply_to_roll(self.player.roll_state)
+        self.time = 0  # Ticks simulated so far (also drives the walking cycle)
+
+        # Fixed timestep bookkeeping
+        self.accumulator = 0.0
+        self.prev_x = start_x
+        self.prev_y = start_y
+
+        # Buttons held last tick; rolls and jump presses count when a button goes down
+        self.jump_held = False
+        self.roll_held = False
+
+        self.recorder = None  # Gets every tick's inputs when set, see replay.InputRecorder
+
+    def tick(self, inputs):
+        """Advance the simulation by exactly one fixed tick"""
+        player = self.player
+        physics = self.physics
+        self.prev_x = player.x
+        self.prev_y = player.y
+
+        move_x = 0
+        player.is_walking_left = False
+        player.is_walking_right = False
+
+        # Moving platforms go first and take whoever stands on them along
+        if self.movers:
+            self._move_platforms()
+
+        # Reset position when restart is pressed
+        if inputs.restart:
+            player.reset(self.start_x, self.start_y)
+
+        # Horizontal movement
+        if inputs.left:
+            move_x = -physics.player_speed
+            player.is_walking_left = True
+        elif inputs.right:
+            move_x = physics.player_speed
+            player.is_walking_right = True
+
+        # Handle rolling (holding the button down rolls once)
+        roll_pressed = inputs.roll and not self.roll_held
+        self.roll_held = inputs.roll
+        move_x += handle_roll(roll_pressed, player.roll_state, player.is_walking_left, player.is_walking_right)
+
+        # Horizontal movement, stopping against walls
+        player.x, player.y, _ = move_box(player.x, player.y, player.width, player.height, move_x, 0, self.level)
+
+        # Jumping. A press just before landing is kept until the player lands (jump buffer),
+        # and a jump still works for a few ticks after walking off an edge (coyote time)
+        if inputs.jump and not self.jump_held:
+            player.jump_buffer = physics.jump_buffer_ticks
+        self.jump_held = inputs.jump
+        can_jump = player.on_ground or (player.air_ticks <= physics.coyote_ticks and not player.is_jumping)
+        if (inputs.jump or player.jump_buffer > 0) and can_jump:
+            player.jump_force = physics.jump_force
+            player.is_jumping = True
+            player.on_ground = False
+            player.jump_buffer = 0
+            player.air_ticks = LONG_AGO  # No second jump off the same ground
+        elif player.jump_buffer > 0:
+            player.jump_buffer -= 1
+
+        if player.is_jumping:
+            player.velocity_y = player.jump_force
+            player.jump_force = player.jump_force * physics.jump_decay
+            if abs(player.jump_force) < 1:
+                player.is_jumping = False
+
+        # Gravity (on the ground too: landing again each tick is what keeps the player standing)
+        if not player.is_jumping:
+            player.velocity_y += physics.gravity
+
+        # Vertical movement: the move swept is the one made, and it stops where it first touches something
+        player.x, player.y, contact = move_box(player.x, player.y, player.width, player.height, 0,
+                                               player.velocity_y, self.level)
+        if contact is None:
+            player.on_ground = False
+        elif player.velocity_y > 0:  # Landed
+            player.on_ground = True
+            player.velocity_y = 0
+        elif player.velocity_y < 0:  # Hit the ceiling
+            player.velocity_y = 0
+
+        # Ground collision
+        if player.y >= self.ground_level:
+            player.y = self.ground_level
+            player.velocity_y = 0
+            player.on_ground = True
+
+        if player.on_ground:
+            player.air_ticks = 0
+        elif player.air_ticks < LONG_AGO:
+            player.air_ticks += 1
+
+        self.time += 1
+        if self.recorder is not None:
+            self.recorder.record(self, inputs)
+
+    def _move_platforms(self):
+        """Step the moving platforms, carrying the player if they stand on one and waking crumbling ones"""
+        player = self.player
+        movers = self.movers
+        riding = None
+        if not player.is_jumping and player.velocity_y >= 0:
+            riding = movers.standing_on(player.x, player.y + player.height, player.width)
+            if riding is not None:
+                movers.touch(riding)
+        movers.update()
+        if riding is None:
+            return
+
+        # Each axis on its own, so a wall in the way stops the player without unsticking them from the
+        # platform. The platform itself is left out: it has already moved, and on the way up it overlaps their feet
+        carry_x, carry_y = movers.carry(riding)
+        width, height = player.width, player.height
+        if carry_x:
+            player.x, player.y, _ = move_box(player.x, player.y, width, height, carry_x, 0, self.level, riding.rect)
+        if carry_y:
+            player.x, player.y, _ = move_box(player.x, player.y, width, height, 0, carry_y, self.level, riding.rect)
+
+    def step(self, dt, inputs):
+        """
+        Advance the simulation by dt seconds of real time in fixed ticks.
+
+        Leftover time smaller than a tick is carried over to the next call, so the
+        game runs at the same speed whatever the frame rate is.
+
+        Args:
+            dt (float): Seconds since the last call.
+            inputs (Inputs or callable): Buttons held during this time, or a function
+                returning the Inputs for each tick in turn (e.g. a replay).
+
+        Returns:
+            int: Number of ticks simulated.
+        """
+        self.accumulator += min(dt, MAX_FRAME_TIME)
+        ticks = 0
+        while self.accumulator >= TICK_DT:
+            self.tick(inputs() if callable(inputs) else inputs)
+            self.accumulator -= TICK_DT
+            ticks += 1
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far (0 to 1) real time has got between the last tick and the next one"""
+        return self.accumulator / TICK_DT
+
+    def render_position(self):
+        """Player position blended between the last two ticks, for smooth drawing at any frame rate"""
+        alpha = self.alpha
+        return (self.prev_x + (self.player.x - self.prev_x) * alpha,
+                self.prev_y + (self.player.y - self.prev_y) * alpha)